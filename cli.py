@@ -12,20 +12,38 @@ Convention:
 
     For uniformity, each task function should 
     have the same signature as dev() in this mod.
+
+    Modules used by an arg are imported inside its
+    func (i.e on first use), so that e.g '-neo4j ..
+    -link' doesn't pay for importing the fetch stack.
+    Args also declare which state keys they read and
+    write (see cli_actions()); start() uses that to
+    run independent args concurrently.
 '''
 
 import sys
 import os
+import asyncio
 
+from src.pipeline.dag import stage_deps
+from src.pipeline.dag import run_stages
+from src.pipeline.dag import StageError
 from src.typehelpers import ArticleData
 from src.typehelpers import db_spec_wikidata_label
 from src.typehelpers import db_spec_fulltext_index
+from src.typehelpers import db_spec_wikidata_link
+from src.typehelpers import db_spec_pending_label
+from src.typehelpers import db_spec_pending_link
+from src.typehelpers import db_spec_html_label
+
 
-from src.data_gen.titles import load_titles
-from src.data_gen.wikiapi import pull_articles
-from src.neo4j_tools.comm import Neo4jComm
+# // Amount of ArticleData pushed per db transaction
+# // by -createdb.
+CREATEDB_BATCH = 50
 
-from src.linking.hyperlinks.linker import link as hyperlinked_link
+# // Amount of nodes updated per db transaction
+# // by -searchindex.
+SEARCHINDEX_BATCH = 500
 
 # // Acts as documentation -- also used as 
 # // 'help' printout for CLI
@@ -39,12 +57,36 @@ Baic usage:
     if arg2 needs data from arg1, then it will work
     as long as arg1 comes before arg2, even with an
     arbitrary amount args in-between.
+    Args which don't depend on each other (e.g
+    -searchindex and -previews) run concurrently;
+    all args are checked before any of them runs.
+    Writes which deadlock with each other (e.g
+    -link and -similar) are retried by Neo4jComm.
+    With -profile, args run one at a time.
 
 
 Arguments:
+    -profile        Profile all args after this one
+                    (CPU with cProfile, memory with
+                    tracemalloc); per-arg pstats, top
+                    allocation sites and peak RSS are
+                    written to the specified dir. Work
+                    in lazy data (e.g -wikiapi, done
+                    while -createdb runs) counts for
+                    the arg which made it.
+
     -titles         Specify path where article
                     names are listed.
 
+    -plan           Dry run; estimates API requests,
+                    GB, hours, db transactions & edges
+                    of fetching titles from -titles for
+                    each subsearch depth up to val. Uses
+                    articles stored by previous runs
+                    (with -neo4j/-sqlite before this),
+                    else fetches <samples> titles:
+                        -plan <depth>[,<samples>]
+
     -wikiapi        Uses data generated from 
                     <-titles> arg to pull data
                     from wikipedia. This arg
@@ -54,20 +96,189 @@ Arguments:
                     are based on hyperlinks in each
                     article. 0 = None.
 
+    -wikiraw        Like -wikiapi, but only pulls the
+                    html of articles (fewer API calls);
+                    content & links are parsed from it
+                    by -parse, which has to follow.
+
+    -parse          Parses data from -wikiraw into the
+                    same data as -wikiapi makes, on a
+                    pool of processes. Vals:
+                        <workers>[,unordered]
+                    0 workers = one per CPU. Unordered
+                    gives articles as they are done.
+
+    -trace          Record all queries sent by -neo4j
+                    (has to come before it) and print
+                    the slowest shapes when done. Vals:
+                        <slow ms>[,<log>[,<n>]]
+                    Queries slower than <slow ms> are
+                    logged (JSONL) to <log>, and PROFILE
+                    plans of the <n> slowest shapes are
+                    captured (see neo4j_tools/trace.py).
+
+    -changefeed     Record keys of all writes made via
+                    -neo4j, -sqlite or -neo4jasync (has
+                    to come before them) as JSONL
+                    segments in the specified dir, for
+                    downstream caches to invalidate only
+                    what changed (see
+                    src/sinks/changefeed.py).
+
+    -readcache      Cache up to val results of node
+                    reads (pull_node/pull_node_prop) in
+                    the -neo4j obj (has to come before
+                    it); writes through it invalidate
+                    affected entries. Hit rate is
+                    printed when done.
+
     -neo4j          Prepare a neo4j interface obj.
                     Arg vals are expected to be:
                         -neo4j uri,usr,pwd
     
+    -sqlite         Use an embedded SQLite db (file
+                    path as val) instead of Neo4j. Can
+                    be used in place of -neo4j for all
+                    args except -neo4jasync/-createdbasync.
+
+    -neo4jasync     Like -neo4j, but prepares an
+                    asyncio based interface obj, used
+                    by -createdbasync. Optional 4th
+                    val is max concurrent transactions:
+                        -neo4jasync uri,usr,pwd,4
+
+    -clear          Deletes all wiki nodes (and their
+                    relationships, placeholders & html
+                    side nodes of -compact) from
+                    the db, in chunks of val items per
+                    transaction (0 = all at once). Needs
+                    -neo4j (or -sqlite) before this one.
+
+    -dedup          Drops near-duplicate articles (by
+                    MinHash of content) from -wikiapi
+                    (or -parse) data; val is the min
+                    similarity, e.g 0.9. -createdb then
+                    stores titles of dropped ones in
+                    'aliases' of the kept node, which
+                    -link, -pagelinks & placeholders of
+                    -linkonload resolve.
+
+    -linkonload     Makes -createdb link nodes while
+                    they are pushed (same transaction),
+                    so -link is not needed afterwards.
+                    Links to articles which weren't
+                    loaded are kept as placeholders, so
+                    later (linked) loads of them are
+                    linked too. Has to come before
+                    -createdb.
+
+    -droppending    Makes -createdb/-createdbasync (with
+                    -linkonload) drop the placeholders
+                    which are left when done, e.g for a
+                    last load. Has to come before
+                    -createdb.
+
+    -deferindex     Makes -createdb/-createdbasync
+                    skip creating the fulltext index
+                    (build it later with -searchindex).
+                    Has to come before -createdb.
+
+    -writers        Makes -createdb write with val
+                    concurrent workers; nodes are split
+                    between them by title, and deadlocks
+                    are retried (by Neo4jComm, once per
+                    write). With -linkonload, the
+                    (linked) writes are done by one
+                    worker. Has to come before
+                    -createdb.
+
     -createdb       Pushes data created with
-                    -wikiapi into the neo4j db.
+                    -wikiapi into the neo4j db, then
+                    creates the fulltext index (unless
+                    it exists) and waits for it.
                     This arg has to come after
                         -wikiapi (for data)
                         -neo4j (for db connection).
                     
+    -createdbasync  Same as -createdb, but writes
+                    batches concurrently (while still
+                    fetching). With -linkonload, batches
+                    are written one at a time (still
+                    while fetching). Needs -wikiapi and
+                    -neo4jasync before this one.
+
+    -searchindex   (Re)builds the fulltext index on
+                   wiki nodes and waits until it is
+                   online. If val > 0, the index is on
+                   a cleaned copy of content, cut to
+                   val chars ('search_content'); 0 =
+                   raw content. Needs -neo4j (or
+                   -sqlite) before this one.
+
     -link          Try linking wiki nodes in neo4j.
                    Note: expects -neo4j arg to be
                    used before this one.
 
+    -pagelinks     Like -link, but reads links from
+                   Wikipedia SQL dumps instead of the
+                   'links' prop (no API calls). Vals:
+                       <page.sql.gz>,<pagelinks.sql.gz>
+                   ..plus ',<linktarget.sql.gz>' for
+                   dumps from 2024 on (pagelinks rows
+                   without titles). Needs -neo4j (or
+                   -sqlite) before this one.
+
+    -previews      Once linked, sets a short cleaned
+                   'snippet' on wiki nodes, plus titles
+                   & snippets of up to val linked nodes
+                   (most linked first), so a node can be
+                   shown with its neighbours without
+                   reading them. Needs -neo4j (or
+                   -sqlite) before this one.
+
+    -compact       Shrinks wiki nodes once linked;
+                   removes 'links' and moves 'html' to
+                   separate WikiDataHtml nodes (keyed
+                   by title). Val is nodes per
+                   transaction. Refuses while nodes
+                   aren't linked yet (-link/-pagelinks
+                   first); -link can't be (re)done
+                   afterwards. Needs -neo4j (or
+                   -sqlite) before this one.
+
+    -similar       Link wiki nodes in neo4j with
+                   SIMILAR relationships, by TF-IDF
+                   of article content. Arg val is the
+                   amount (k) of similar articles per
+                   node. Needs -neo4j before this one,
+                   and numpy & scipy.
+
+    -communities   Once linked, groups wiki nodes into
+                   communities by label propagation over
+                   HYPERLINKS, and sets 'community' (id,
+                   largest first) & 'community_rank'
+                   (0 = most linked within it) on them.
+                   Val is max passes. Needs -neo4j (or
+                   -sqlite) before this one, and numpy.
+
+    -snapshot      Export linked wiki nodes into a
+                   compact, memory-mappable file set
+                   in the specified dir (see
+                   src/snapshot/adjacency.py). Needs
+                   -neo4j before this one.
+
+    -benchread     Benchmarks read queries (node by
+                   title, links prop, neighbours and
+                   fulltext search); prints p50/p95/p99
+                   latency & throughput. Vals:
+                       <nodes>[,<queries>[,<threads>]]
+                   With 1+ nodes, a synthetic graph of
+                   that size is built (BenchData label,
+                   removed afterwards); with 0, loaded
+                   wiki nodes are queried. Defaults are
+                   1000 queries on 4 threads. Needs
+                   -neo4j (or -sqlite) before this one.
+
 Examples:
     Use data in './data/titles_min.txt' to fetch article
     names and use that to retrieve data from wikipedia:
@@ -83,9 +294,39 @@ Examples:
     Link nodes in db.
     > -neo4j neo4j://localhost:7687,neo4j,neo4j -link
 
+    Same as the second example, but parse articles
+    on 4 processes:
+    >   -titles ./data/titles_min.txt
+        -wikiraw 0
+        -parse 4
+        -neo4j neo4j://localhost:7687,neo4j,neo4j
+        -createdb
+
+    Push data into Neo4j and link while loading:
+    >   -titles ./data/titles_min.txt
+        -wikiapi 0
+        -neo4j neo4j://localhost:7687,neo4j,neo4j
+        -linkonload
+        -createdb
+
 '''
 
 
+# // State keys of graph backends (see _graph_sink).
+_SINK = ['-neo4j', '-sqlite']
+# // Parts of the db, used as state keys in cli_actions()
+# // for ordering args which use the same db (they don't
+# // exist in state).
+_DB = [
+    'db:titles', 'db:content', 'db:links', 'db:html', 'db:aliases',
+    'db:edges', 'db:index', 'db:search', 'db:previews', 'db:similar',
+    'db:communities'
+]
+# // Written by loading args (-createdb, -createdbasync).
+_DB_LOAD = [k for k in _DB if k not in
+                ('db:search', 'db:previews', 'db:similar', 'db:communities')]
+
+
 def cli_actions()-> dict:
     ''' Binds CLI arguments to funcs. 
         Keys are CLI argument identifiers,
@@ -96,17 +337,76 @@ def cli_actions()-> dict:
                 another arg.
 
             [1] associated function.
+
+            [2] state keys the func reads.
+
+            [3] state keys the func writes (or
+                consumes, like generators).
+
+        An arg runs after all earlier args it shares
+        keys with (unless both only read), so [2] and
+        [3] have to be complete. '*' means all keys.
     '''
     return {
         # // reserved for development     # // 
-        '-inspect'  : [False, inspect],
-        '-devhook'  : [False, devhook],
+        '-inspect'  : [False, inspect, ['*'], ['*']],
+        '-devhook'  : [False, devhook, ['*'], ['*']],
         # // ---------------------------- # //
-        '-titles' : [True, titles],
-        '-wikiapi'  : [True, wikiapi],
-        '-neo4j'    : [True, neo4j],
-        '-createdb': [False, createdb],
-        '-link'     : [False, link]
+        '-profile'  : [True, profile, [], ['-profile']],
+        '-titles' : [True, titles, [], ['-titles']],
+        '-plan'     : [True, plan,
+                        ['-titles', *_SINK, 'db:titles', 'db:links',
+                            'db:content', 'db:html'],
+                        ['-titles']],
+        '-wikiapi'  : [True, wikiapi, ['-titles'], ['-titles', '-wikiapi']],
+        '-wikiraw'  : [True, wikiraw, ['-titles'], ['-titles', '-wikiraw']],
+        '-parse'    : [True, parse, ['-wikiraw'], ['-wikiraw', '-wikiapi']],
+        '-trace'    : [True, trace, [], ['-trace']],
+        '-changefeed': [True, changefeed, [], ['-changefeed']],
+        '-readcache': [True, readcache, [], ['-readcache']],
+        '-neo4j'    : [True, neo4j,
+                        ['-trace', '-changefeed', '-readcache'], ['-neo4j']],
+        '-sqlite'   : [True, sqlite, ['-changefeed'], ['-sqlite']],
+        '-neo4jasync': [True, neo4jasync, ['-changefeed'],
+                        ['-neo4jasync']],
+        '-clear'    : [True, clear, _SINK, _DB],
+        '-dedup'    : [True, dedup, ['-wikiapi'], ['-wikiapi', '-dedup']],
+        '-linkonload': [False, linkonload, [], ['-linkonload']],
+        '-droppending': [False, droppending, [], ['-droppending']],
+        '-deferindex': [False, deferindex, [], ['-deferindex']],
+        '-writers'  : [True, writers, [], ['-writers']],
+        '-createdb': [False, createdb,
+                        ['-linkonload', '-droppending', '-deferindex',
+                            '-writers', '-dedup', *_SINK],
+                        ['-wikiapi', *_DB_LOAD]],
+        '-createdbasync': [False, createdbasync,
+                        ['-linkonload', '-droppending', '-deferindex'],
+                        ['-wikiapi', '-neo4jasync', *_DB_LOAD]],
+        '-searchindex': [True, searchindex,
+                        [*_SINK, 'db:titles', 'db:content'],
+                        ['db:search', 'db:index']],
+        '-link'     : [False, link,
+                        [*_SINK, 'db:titles', 'db:links', 'db:aliases'],
+                        ['db:edges']],
+        '-pagelinks': [True, pagelinks,
+                        [*_SINK, 'db:titles', 'db:aliases'],
+                        ['db:edges']],
+        '-previews' : [True, previews,
+                        [*_SINK, 'db:titles', 'db:content', 'db:edges'],
+                        ['db:previews']],
+        '-compact'  : [True, compact,
+                        [*_SINK, 'db:titles', 'db:aliases', 'db:edges'],
+                        ['db:links', 'db:html']],
+        '-similar'  : [True, similar,
+                        [*_SINK, 'db:titles', 'db:content'],
+                        ['db:similar']],
+        '-communities': [True, communities,
+                        [*_SINK, 'db:titles', 'db:edges'],
+                        ['db:communities']],
+        '-snapshot' : [True, snapshot,
+                        [*_SINK, 'db:titles', 'db:edges'],
+                        []],
+        '-benchread': [True, benchread, _SINK + _DB, ['db:bench']]
     }
 
 
@@ -125,7 +425,17 @@ def devhook(arg_id, arg_val, state):
     '''
    
 
+def profile(arg_id, arg_val, state):
+    from src.profiling.stages import StageProfiler
+
+    # // Read by start(), which runs all args after
+    # // this one through the profiler.
+    state[arg_id] = StageProfiler(path=arg_val)
+
+
 def titles(arg_id, arg_val, state):
+    from src.data_gen.titles import load_titles
+
     # // Handle file doesn't exist.
     assert os.path.exists(arg_val), f'''
         Used the following:
@@ -138,6 +448,8 @@ def titles(arg_id, arg_val, state):
 
 
 def wikiapi(arg_id, arg_val, state):
+    from src.data_gen.wikiapi import pull_articles
+
     try:
         arg_val = int(arg_val)
     except: 
@@ -177,7 +489,173 @@ def wikiapi(arg_id, arg_val, state):
     )
 
 
+def plan(arg_id, arg_val, state):
+    from src.data_gen import plan as planner
+
+    arg_val = arg_val.split(',')
+    try:
+        depth = int(arg_val[0])
+        samples = int(arg_val[1]) if len(arg_val) > 1 else 0
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the value was not in the format:
+            <depth>[,<samples>]
+        Got: '{','.join(arg_val)}'
+        ''')
+    gen_titles = state.get('-titles')
+    assert gen_titles is not None, '''
+        Tried planning but could not access a state
+        which contains valid wikipedia article titles.
+        Use -titles argument before this one.
+    '''
+    # // Titles are put back, so args after this one
+    # // still get all of them.
+    titles_list = list(gen_titles)
+    state['-titles'] = iter(titles_list)
+
+    # // Prefer stats of previous runs, then sampling.
+    # // Vals of the keys refer to props of ArticleData.
+    stats = None
+    n4jc = _graph_sink(state)
+    if n4jc is not None:
+        stats = planner.stats_from_db(
+            n4jcomm=n4jc,
+            label=db_spec_wikidata_label,
+            title_key='title',
+            links_key='links',
+            content_key='content',
+            html_key='html'
+        )
+    if stats is None and samples > 0:
+        stats = planner.stats_from_api(titles=titles_list[:samples])
+    stats = stats or planner.DEFAULT_STATS
+
+    print(f'Plan for {len(titles_list)} titles:')
+    print(planner.fmt_plan(
+        plan=planner.estimate(
+            n_titles=len(titles_list),
+            depth=depth,
+            stats=stats,
+            batch_size=CREATEDB_BATCH
+        ),
+        stats=stats
+    ))
+
+
+def wikiraw(arg_id, arg_val, state):
+    from src.data_gen.wikiapi import pull_raw
+
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Try accessing necessary state data.
+    gen_titles = state.get('-titles')
+    assert gen_titles is not None, '''
+        Tried pulling raw articles but could not
+        access a state which contains valid
+        wikipedia article titles. Use -titles
+        argument before this one.
+    '''
+    # // Same piping as -wikiapi, but yields raw
+    # // (title, url, html) for -parse.
+    g = (
+        pull_raw(titles=[title], subsearch=arg_val)
+        for title in gen_titles
+    )
+    state[arg_id] = (
+        sub for sub in g for sub in sub
+    )
+
+
+def parse(arg_id, arg_val, state):
+    from src.data_gen.parse import parse_stream
+
+    arg_val = arg_val.split(',')
+    try:
+        workers = int(arg_val[0])
+        assert arg_val[1:] in ([], ['unordered'])
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the value was not in the format:
+            <workers>[,unordered]
+        Got: '{','.join(arg_val)}'
+        ''')
+    gen_raw = state.get('-wikiraw')
+    assert gen_raw is not None, '''
+        Tried parsing articles but raw data is
+        missing. Use -wikiraw arg before this.
+    '''
+    # // Stored as -wikiapi data, so that -createdb
+    # // (and the like) can be used as usual.
+    state['-wikiapi'] = parse_stream(
+        pages=gen_raw,
+        workers=workers or None,
+        ordered=len(arg_val) == 1
+    )
+
+
+def trace(arg_id, arg_val, state):
+    from src.neo4j_tools.trace import QueryTracer
+
+    arg_val = arg_val.split(',')
+    try:
+        slow_ms = float(arg_val[0])
+        log_path = arg_val[1] if len(arg_val) > 1 and arg_val[1] else None
+        top = int(arg_val[2]) if len(arg_val) > 2 else 0
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the value was not in the format:
+            <slow ms>[,<log path>[,<profiled shapes>]]
+        Got: '{','.join(arg_val)}'
+        ''')
+    # // Read by -neo4j; report is printed by start().
+    state[arg_id] = QueryTracer(
+        slow_ms=slow_ms, log_path=log_path, profile_top=top)
+
+
+def changefeed(arg_id, arg_val, state):
+    from src.sinks.changefeed import ChangeFeed
+
+    # // Read by -neo4j/-sqlite/-neo4jasync; closed by start().
+    state[arg_id] = ChangeFeed(path=arg_val)
+
+
+def readcache(arg_id, arg_val, state):
+    from src.neo4j_tools.readcache import ReadCache
+
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Read by -neo4j; stats are printed by start().
+    state[arg_id] = ReadCache(capacity=arg_val)
+
+
 def neo4j(arg_id, arg_val, state):
+    from src.neo4j_tools.comm import Neo4jComm
+
     arg_val = arg_val.split(',')
     assert len(arg_val) == 3, f'''
         Used the following:
@@ -194,7 +672,8 @@ def neo4j(arg_id, arg_val, state):
     # // Safety for pesky connection issues.
     try:
         state[arg_id] = Neo4jComm(
-            uri=uri, usr=usr, pwd=pwd)
+            uri=uri, usr=usr, pwd=pwd, tracer=state.get('-trace'),
+            feed=state.get('-changefeed'), cache=state.get('-readcache'))
     except Exception as e:
         raise ValueError(f'''
             Error while setting up Neo4j interface.
@@ -203,7 +682,156 @@ def neo4j(arg_id, arg_val, state):
             Msg: {e}
         ''')
 
+def sqlite(arg_id, arg_val, state):
+    from src.sinks.sqlite import SQLiteSink
+
+    state[arg_id] = SQLiteSink(path=arg_val, feed=state.get('-changefeed'))
+
+
+def _graph_sink(state):
+    ''' Graph backend set up by a previous arg; -neo4j
+        or -sqlite (preferring the former if both).
+    '''
+    return state.get('-neo4j') or state.get('-sqlite')
+
+
+def neo4jasync(arg_id, arg_val, state):
+    from src.neo4j_tools.comm_async import AsyncNeo4jComm
+
+    arg_val = arg_val.split(',')
+    assert len(arg_val) in (3, 4), f'''
+        Used the following:
+                Arg: '{arg_id}'
+        .. but the following value did not 
+        contain the right amount of into.
+        Should be: 
+            <uri>,<usr>,<pwd>[,<max transactions>]
+        Got:
+            {','.join(arg_val)}
+    '''
+    uri, usr, pwd = arg_val[:3]
+    inflight = int(arg_val[3]) if len(arg_val) == 4 else 4
+    # // Doesn't connect until first used.
+    state[arg_id] = AsyncNeo4jComm(
+        uri=uri, usr=usr, pwd=pwd, max_inflight=inflight,
+        feed=state.get('-changefeed'))
+
+
+def clear(arg_id, arg_val, state):
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried to clear the database but the
+        object used for neo4j communication
+        is missing. Use -neo4j (or -sqlite)
+        arg before this.
+    '''
+
+    def progress(phase, deleted):
+        print(f'\r\tdeleted {phase}: {deleted}', end='', flush=True)
+
+    # // Side nodes of -compact (html) are wiki nodes too.
+    for label in [db_spec_wikidata_label, db_spec_pending_label,
+                    db_spec_html_label]:
+        print(f'Clearing {label}:')
+        n4jc.clear(
+            label=label,
+            batch_size=arg_val or None,
+            progress=progress
+        )
+        print()
+
+
+def dedup(arg_id, arg_val, state):
+    from src.data_gen.dedup import DedupFilter
+
+    try:
+        arg_val = float(arg_val)
+        assert 0 < arg_val <= 1
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a number in (0, 1]. Got: '{arg_val}'
+        ''')
+    gen_article_data = state.get('-wikiapi')
+    assert gen_article_data is not None, '''
+        Tried filtering duplicates but data is
+        missing. Use -wikiapi (or -parse) arg
+        before this.
+    '''
+    # // Filter is kept; createdb writes its aliases.
+    state[arg_id] = DedupFilter(threshold=arg_val)
+    state['-wikiapi'] = state[arg_id].filter(gen_article_data)
+
+
+def linkonload(arg_id, arg_val, state):
+    # // Only a switch; read by createdb.
+    state[arg_id] = True
+
+
+def droppending(arg_id, arg_val, state):
+    # // Only a switch; read by createdb/createdbasync.
+    state[arg_id] = True
+
+
+def writers(arg_id, arg_val, state):
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Read by createdb.
+    state[arg_id] = arg_val
+
+
+def _resolve_pending(n4jc, drop:bool)-> None:
+    ''' Links what -linkonload left as placeholders although
+        the node got stored, also through stored 'aliases' (see
+        -dedup). The rest (links to articles which weren't
+        loaded) is kept for later loads, unless <drop> (see
+        -droppending); see resolve_pending.
+    '''
+    from src.linking.hyperlinks.linker import aliases_of
+
+    def progress(seen, made):
+        print(f'\r\tplaceholders: {seen}, linked: {made}',
+                end='', flush=True)
+
+    print('Resolving placeholders:')
+    n4jc.resolve_pending(
+        label=db_spec_wikidata_label,
+        e_label=db_spec_wikidata_link,
+        p_label=db_spec_pending_label,
+        p_e_label=db_spec_pending_link,
+        key='title',
+        drop=drop,
+        progress=progress,
+        aliases=aliases_of(n4jc, title_key='title', alias_key='aliases')
+    )
+    print()
+
+
 def createdb(arg_id, arg_val, state):
+    from src.neo4j_tools.buffer import WriteBuffer
+
     # // Try fetch data.
     gen_article_data = state.get('-wikiapi')
     assert gen_article_data is not None, '''
@@ -211,53 +839,573 @@ def createdb(arg_id, arg_val, state):
         is missing. Use -wikiapi arg before this.
     '''
     # // Try retrieve neo4j obj
-    n4jc = state.get('-neo4j')
+    n4jc = _graph_sink(state)
     assert n4jc != None, '''
         Tried to create a database but the
         object used for neo4j communication
-        is missing. Use -neo4j arg before this.
+        is missing. Use -neo4j (or -sqlite)
+        arg before this.
     '''
-    try:
-        n4jc.create_ftindex(
-            name=db_spec_fulltext_index,
+    # // Nodes are merged on title. Lookups by title on
+    # // placeholder nodes are what makes online linking cheap.
+    n4jc.create_index(label=db_spec_wikidata_label, prop='title')
+    linked = state.get('-linkonload', False)
+    if linked:
+        n4jc.create_index(label=db_spec_pending_label, prop='title')
+
+    # // Coalesces repeats (common with subsearch, where
+    # // hub articles are yielded many times) and batches.
+    # // Vals of <key> and <hlink_key> refer to properties
+    # // of ArticleData (in typehelpers.py).
+    # // Concurrent writers, partitioned by title (linked
+    # // writes go to one of them; see neo4j_tools/writers.py).
+    target = n4jc
+    if state.get('-writers'):
+        from src.neo4j_tools.writers import PartitionedWriter
+        target = PartitionedWriter(
+            n4jcomm=n4jc,
+            writers=state['-writers'],
+            batch_size=CREATEDB_BATCH
+        )
+    buf = WriteBuffer(
+        n4jcomm=target,
+        batch_size=CREATEDB_BATCH,
+        link=None if not linked else {
+            'e_label': db_spec_wikidata_link,
+            'p_label': db_spec_pending_label,
+            'p_e_label': db_spec_pending_link,
+            'hlink_key': 'links'
+        }
+    )
+    for article_data in gen_article_data:
+        assert type(article_data) is ArticleData, '''
+            Tried to create a db but the type inside
+            generator (made with -wikiapi) is unexpected.
+        '''
+        # // Load everything from ArticleData
+        # // into the database.
+        buf.push_node(
             label=db_spec_wikidata_label,
-            # // Refers to the content property of
-            # // ArticleData (in typehelpers.py).
-            prop='content'
+            props=article_data.__dict__,
+            key='title'
         )
-    except:
-        pass
+    # // Remainder.
+    buf.flush()
+    if target is not n4jc:
+        target.close()
 
-    for article_data in gen_article_data:
+    # // Titles of duplicates dropped by -dedup, so that
+    # // linkers (and placeholders of -linkonload) can resolve
+    # // links to them. Merged with the aliases stored by
+    # // earlier loads (into the same db).
+    filt = state.get('-dedup')
+    if filt and filt.aliases():
+        new = filt.aliases()
+        merged = {}
+        for title, stored in n4jc.pull_props(
+                label=db_spec_wikidata_label, props=['title', 'aliases']):
+            if title in new:
+                stored = stored or []
+                merged[title] = stored + [
+                    a for a in new[title] if a not in stored]
+        n4jc.update_nodes(
+            label=db_spec_wikidata_label,
+            props_list=[
+                {'title': k, 'aliases': v} for k, v in merged.items()
+            ],
+            key='title'
+        )
+    if linked:
+        _resolve_pending(n4jc, drop=state.get('-droppending', False))
+
+    # // Built once, after the load, so that writes above don't
+    # // pay for incremental fulltext indexing. An existing index
+    # // (e.g made by -searchindex) is left as-is.
+    if not state.get('-deferindex', False):
+        _build_ftindex(n4jc=n4jc, prop='content', rebuild=False)
+
+
+def createdbasync(arg_id, arg_val, state):
+    # // Try fetch data.
+    gen_article_data = state.get('-wikiapi')
+    assert gen_article_data is not None, '''
+        Tried to create a database but data
+        is missing. Use -wikiapi arg before this.
+    '''
+    # // Try retrieve async neo4j obj
+    an4jc = state.get('-neo4jasync')
+    assert an4jc != None, '''
+        Tried to create a database but the
+        object used for async neo4j communication
+        is missing. Use -neo4jasync arg before this.
+    '''
+    linked = state.get('-linkonload', False)
+
+    def check(article_data):
         assert type(article_data) is ArticleData, '''
             Tried to create a db but the type inside
             generator (made with -wikiapi) is unexpected.
         '''
+        return article_data.__dict__
 
-        n4jc.push_node(
+    async def push(batch):
+        batch = [check(article_data) for article_data in batch]
+        if not linked:
+            await an4jc.push_nodes(
+                label=db_spec_wikidata_label, props_list=batch)
+            return
+        # // See createdb.
+        await an4jc.push_nodes_linked(
             label=db_spec_wikidata_label,
-            # // Load everything from ArticleData
-            # // into the database.
-            props=article_data.__dict__
+            e_label=db_spec_wikidata_link,
+            p_label=db_spec_pending_label,
+            p_e_label=db_spec_pending_link,
+            props_list=batch,
+            key='title',
+            hlink_key='links'
         )
 
+    async def run():
+        if linked:
+            await an4jc.create_index(
+                label=db_spec_wikidata_label, prop='title')
+            await an4jc.create_index(
+                label=db_spec_pending_label, prop='title')
+        try:
+            await an4jc.push_stream(
+                gen=gen_article_data,
+                batch_size=CREATEDB_BATCH,
+                push=push
+            )
+            # // See createdb; linked batches are written one at
+            # // a time, so there's only something to do when
+            # // dropping placeholders.
+            if linked and state.get('-droppending', False):
+                await an4jc.resolve_pending(
+                    label=db_spec_wikidata_label,
+                    e_label=db_spec_wikidata_link,
+                    p_label=db_spec_pending_label,
+                    p_e_label=db_spec_pending_link,
+                    key='title',
+                    drop=True
+                )
+            # // See createdb (_build_ftindex); waits until the
+            # // index is populated, so it's usable afterwards.
+            deferred = state.get('-deferindex', False)
+            if not deferred and await an4jc.ftindex_state(
+                    name=db_spec_fulltext_index) is None:
+                await an4jc.create_ftindex(
+                    name=db_spec_fulltext_index,
+                    label=db_spec_wikidata_label,
+                    prop='content'
+                )
+
+                def progress(pct):
+                    print(f'\r\tindex populated: {pct:.1f}%',
+                            end='', flush=True)
+
+                print('Building fulltext index:')
+                await an4jc.await_ftindex(
+                    name=db_spec_fulltext_index, progress=progress)
+                print()
+        finally:
+            await an4jc.close()
+
+    asyncio.run(run())
+
+
+def deferindex(arg_id, arg_val, state):
+    # // Only a switch; read by createdb/createdbasync.
+    state[arg_id] = True
+
+
+def _build_ftindex(n4jc, prop:str, rebuild:bool)-> None:
+    ''' Creates the fulltext index on wiki nodes (on <prop>)
+        and waits until it is populated. With <rebuild>, an
+        existing index is dropped first; otherwise it's kept.
+    '''
+    if rebuild:
+        n4jc.drop_ftindex(name=db_spec_fulltext_index)
+    elif n4jc.ftindex_state(name=db_spec_fulltext_index) is not None:
+        return
+    n4jc.create_ftindex(
+        name=db_spec_fulltext_index,
+        label=db_spec_wikidata_label,
+        prop=prop
+    )
+
+    def progress(pct):
+        print(f'\r\tindex populated: {pct:.1f}%', end='', flush=True)
+
+    print('Building fulltext index:')
+    n4jc.await_ftindex(name=db_spec_fulltext_index, progress=progress)
+    print()
+
+
+def searchindex(arg_id, arg_val, state):
+    from src.data_gen.textclean import clean_content
+
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried building a search index but the
+        object used for neo4j communication is
+        missing. Use -neo4j (or -sqlite) arg
+        before this.
+    '''
+    # // Drop first, so the bulk update below isn't indexed.
+    n4jc.drop_ftindex(name=db_spec_fulltext_index)
+    # // Refers to the content property of ArticleData
+    # // (in typehelpers.py).
+    prop = 'content'
+    if arg_val > 0:
+        prop = 'search_content'
+        buf = []
+        for title, content in n4jc.pull_props(
+                label=db_spec_wikidata_label, props=['title', 'content']):
+            buf.append({
+                'title': title,
+                prop: clean_content(text=content, max_chars=arg_val)
+            })
+            if len(buf) >= SEARCHINDEX_BATCH:
+                n4jc.update_nodes(
+                    label=db_spec_wikidata_label, props_list=buf, key='title')
+                buf = []
+        # // Remainder.
+        n4jc.update_nodes(
+            label=db_spec_wikidata_label, props_list=buf, key='title')
+    _build_ftindex(n4jc=n4jc, prop=prop, rebuild=True)
+
    
 def link(arg_id, arg_val, state):
+    from src.linking.hyperlinks.linker import link as hyperlinked_link
+
     # // Try retrieve neo4j obj
-    n4jc = state.get('-neo4j')
+    n4jc = _graph_sink(state)
     assert n4jc != None, '''
         Tried to create a database but the
         object used for neo4j communication
-        is missing. Use -neo4j arg before this.
+        is missing. Use -neo4j (or -sqlite)
+        arg before this.
     '''
     # // Call linking routine; vals of <title_key> and
     # // <hlink_key> refer to properties of ArticleData
-    # // found in typehelpers.py.
+    # // found in typehelpers.py, <alias_key> to the
+    # // prop set by -createdb when -dedup is used.
     hyperlinked_link(
             n4jcomm=n4jc,
             title_key='title',
-            hlink_key='links'
+            hlink_key='links',
+            alias_key='aliases'
+    )
+
+
+def pagelinks(arg_id, arg_val, state):
+    from src.linking.pagelinks.linker import link as pagelinks_link
+
+    arg_val = arg_val.split(',')
+    assert len(arg_val) in (2, 3), f'''
+        Used the following:
+                Arg: '{arg_id}'
+        .. but the following value did not 
+        contain the right amount of into.
+        Should be: 
+            <page dump path>,<pagelinks dump path>
+            (,<linktarget dump path>)
+        Got:
+            {','.join(arg_val)}
+    '''
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried linking but the object used
+        for neo4j communication is missing.
+        Use -neo4j (or -sqlite) arg before this.
+    '''
+
+    def progress(read, found):
+        print(f'\r\tlinks read: {read}, edges: {found}',
+                end='', flush=True)
+
+    # // Val of <title_key> refers to ArticleData.title.
+    n4jc.create_index(label=db_spec_wikidata_label, prop='title')
+    page_path, pagelinks_path, *linktarget_path = arg_val
+    pagelinks_link(
+        n4jcomm=n4jc,
+        title_key='title',
+        page_path=page_path,
+        pagelinks_path=pagelinks_path,
+        progress=progress,
+        alias_key='aliases',
+        linktarget_path=linktarget_path[0] if linktarget_path else None
+    )
+    print()
+
+
+def previews(arg_id, arg_val, state):
+    from src.previews.build import build as build_previews
+
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried building previews but the object
+        used for neo4j communication is missing.
+        Use -neo4j (or -sqlite) arg before this.
+    '''
+
+    def progress(done):
+        print(f'\r\tupdated nodes: {done}', end='', flush=True)
+
+    # // Vals of <title_key> and <content_key> refer to
+    # // properties of ArticleData found in typehelpers.py.
+    n4jc.create_index(label=db_spec_wikidata_label, prop='title')
+    print('Building previews:')
+    build_previews(
+        n4jcomm=n4jc,
+        title_key='title',
+        content_key='content',
+        k=arg_val,
+        progress=progress
     )
+    print()
+
+
+def compact(arg_id, arg_val, state):
+    from src.linking.hyperlinks.linker import unlinked
+
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried compacting but the object used
+        for neo4j communication is missing.
+        Use -neo4j (or -sqlite) arg before this.
+    '''
+
+    # // 'links' is what -link (& -previews, -plan) read, so
+    # // it's only removed once HYPERLINKS exist. Vals of the
+    # // keys refer to properties of ArticleData found in
+    # // typehelpers.py.
+    missing = unlinked(n4jcomm=n4jc, title_key='title',
+                        hlink_key='links', alias_key='aliases')
+    assert not missing, f'''
+        Tried compacting, but {len(missing)} wiki nodes (e.g
+        '{missing[0] if missing else ''}') link to stored
+        articles without being linked; removing 'links'
+        would lose those links for good. Use -link (or
+        -pagelinks) before this.
+    '''
+
+    def progress(done):
+        print(f'\r\tupdated nodes: {done}', end='', flush=True)
+
+    n4jc.create_index(label=db_spec_html_label, prop='title')
+    print('Moving html:')
+    n4jc.move_props(
+        label=db_spec_wikidata_label,
+        key='title',
+        props=['html'],
+        side_label=db_spec_html_label,
+        batch_size=arg_val,
+        progress=progress
+    )
+    print('\nRemoving links:')
+    n4jc.remove_props(
+        label=db_spec_wikidata_label,
+        key='title',
+        props=['links'],
+        batch_size=arg_val,
+        progress=progress
+    )
+    print()
+
+
+def similar(arg_id, arg_val, state):
+    # // Imported here since numpy & scipy are only
+    # // needed for this arg.
+    from src.linking.similar.linker import link as similar_link
+
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried linking but the object used
+        for neo4j communication is missing.
+        Use -neo4j (or -sqlite) arg before this.
+    '''
+    # // Vals of <title_key> and <content_key> refer to
+    # // properties of ArticleData found in typehelpers.py.
+    similar_link(
+        n4jcomm=n4jc,
+        title_key='title',
+        content_key='content',
+        k=arg_val
+    )
+
+
+def communities(arg_id, arg_val, state):
+    # // Imported here since numpy is only needed
+    # // for this arg.
+    from src.communities.detect import detect
+
+    try:
+        arg_val = int(arg_val)
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the following value was not
+        a integer. Got: '{arg_val}'
+        ''')
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried detecting communities but the object
+        used for neo4j communication is missing.
+        Use -neo4j (or -sqlite) arg before this.
+    '''
+
+    def progress(done):
+        print(f'\r\tupdated nodes: {done}', end='', flush=True)
+
+    # // Val of <title_key> refers to ArticleData.title.
+    n4jc.create_index(label=db_spec_wikidata_label, prop='title')
+    print('Detecting communities:')
+    stats = detect(
+        n4jcomm=n4jc,
+        title_key='title',
+        max_iter=arg_val,
+        progress=progress
+    )
+    print(f"\n\t{stats['communities']} communities in "
+            f"{stats['nodes']} nodes ({stats['passes']} passes).")
+
+
+def snapshot(arg_id, arg_val, state):
+    from src.snapshot.adjacency import write_snapshot
+
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried to create a snapshot but the
+        object used for neo4j communication
+        is missing. Use -neo4j (or -sqlite)
+        arg before this.
+    '''
+    # // Vals of <key>/<prop> refer to ArticleData.title.
+    meta = write_snapshot(
+        path=arg_val,
+        titles=n4jc.pull_node_prop(
+            label=db_spec_wikidata_label,
+            props={},
+            prop='title'
+        ),
+        edges=n4jc.pull_edges(
+            v_label=db_spec_wikidata_label,
+            w_label=db_spec_wikidata_label,
+            e_label=db_spec_wikidata_link,
+            key='title'
+        )
+    )
+    print(f"Snapshot: {meta['nodes']} nodes, {meta['edges']} edges.")
+
+
+def benchread(arg_id, arg_val, state):
+    from src.bench import read as bench
+
+    arg_val = arg_val.split(',')
+    try:
+        nodes, requests, threads = [
+            int(v) for v in arg_val + ['1000', '4'][len(arg_val) - 1:]]
+    except:
+        raise ValueError(f'''
+        Used the following:
+            Arg: '{arg_id}'
+
+        ..but the value was not in the format:
+            <nodes>[,<queries>[,<threads>]]
+        Got: '{','.join(arg_val)}'
+        ''')
+    # // Try retrieve neo4j obj
+    n4jc = _graph_sink(state)
+    assert n4jc != None, '''
+        Tried benchmarking reads but the object
+        used for neo4j communication is missing.
+        Use -neo4j (or -sqlite) arg before this.
+    '''
+
+    def progress(n_nodes, n_rels):
+        print(f'\r\tnodes: {n_nodes}, rels: {n_rels}', end='', flush=True)
+
+    if nodes > 0:
+        print(f'Building benchmark graph ({nodes} nodes):')
+        titles = bench.build_graph(n4jc, nodes=nodes, progress=progress)
+        print()
+        target = {}
+    else:
+        # // Vals of the keys refer to props of ArticleData.
+        titles = n4jc.pull_node_prop(
+            label=db_spec_wikidata_label, props={}, prop='title')
+        target = {
+            'label': db_spec_wikidata_label,
+            'e_label': db_spec_wikidata_link,
+            'index': db_spec_fulltext_index,
+        }
+        if n4jc.ftindex_state(db_spec_fulltext_index) is None:
+            # // No -createdb index; can't search.
+            target['mix'] = {k: v for k, v in bench.DEFAULT_MIX.items()
+                                if k != 'search'}
+    assert titles, '''
+        Tried benchmarking reads but there are
+        no wiki nodes to query. Use a val of 1+
+        nodes for a synthetic graph.
+    '''
+    try:
+        print(f'Benchmarking {requests} queries on {threads} threads:')
+        print(bench.fmt_report(bench.run(
+            n4jc, titles, requests=requests, concurrency=threads, **target)))
+    finally:
+        if nodes > 0:
+            bench.drop_graph(n4jc)
 
 
 def start():
@@ -276,9 +1424,10 @@ def start():
     # // Odd looping because it enables argument jumping.
     # // Some arguments don't accept values, while others
     # // do, so having flexibility in iteration is good.
+    # // Args are only collected here; they run below.
+    stages = []
     i = 0
     while i < len(args):
-        step = 1
         try:
             # // Assumed to be a recognised arg.
             current_arg = args[i]
@@ -286,23 +1435,82 @@ def start():
             arg_targets = cli_actions().get(current_arg)
             assert arg_targets, f'Unrecognised arg: {current_arg}'
             # // Unpack vals for readability.
-            next_is_val, func = arg_targets
+            next_is_val, func, reads, writes = arg_targets
             # // Optional val for current arg.
             arg_val = args[i+1] if next_is_val else None
-            # // Use task func of current arg&val.
-            func(current_arg, arg_val, state)
-            # // Adding potential step.
-            step += 1 if next_is_val else 0
-
+            assert not next_is_val or i + 1 < len(args), \
+                f'Missing val of arg: {current_arg}'
         except Exception as e:
             print(f'issue on arg "{args[i]}": '+ 
                     f'\n\tException: {e}')
 
             print("\n\n", CLI_HELP)
-            # // Failed; no point in continuing
             return
-        finally:
-            # // In either case; increment counter.
-            i += step
+        stages.append((current_arg, arg_val, func, reads, writes))
+        # // Adding potential step.
+        i += 2 if next_is_val else 1
+
+    def run(idx:int):
+        current_arg, arg_val, func, _, _ = stages[idx]
+        # // Use task func of current arg&val.
+        profiler = state.get('-profile')
+        if profiler:
+            profiler.run(current_arg, func, arg_val, state)
+        else:
+            func(current_arg, arg_val, state)
+
+    # // Independent args run concurrently, except when
+    # // profiling (profilers can't overlap).
+    profiled = any(stage[0] == '-profile' for stage in stages)
+    try:
+        run_stages(
+            deps=stage_deps([stage[3:] for stage in stages]),
+            run=run,
+            workers=1 if profiled else None
+        )
+    except StageError as e:
+        idx, exc = e.args
+        print(f'issue on arg "{stages[idx][0]}": '+ 
+                f'\n\tException: {exc}')
+
+        print("\n\n", CLI_HELP)
+        # // Failed; no point in continuing
+        return
+
+    # // Stage stats from -profile, if used.
+    profiler = state.get('-profile')
+    if profiler:
+        for stage in profiler.finish():
+            print(f"{stage['stage']}: {stage['wall_sec']}s "
+                    f"(+{stage['lazy_sec']}s lazy), "
+                    f"rss: {stage['rss_kb_before']} -> "
+                    f"{stage['rss_kb_after']}KB, max rss (so far): "
+                    f"{stage['max_rss_kb']}KB")
+
+    # // Query stats from -trace, if used.
+    tracer = state.get('-trace')
+    if tracer:
+        print('Query trace (slowest shapes):')
+        print(tracer.report())
+        tracer.close()
+
+    # // Read cache stats from -readcache, if used.
+    cache = state.get('-readcache')
+    if cache:
+        stats = cache.stats()
+        print(f"Read cache: {stats['hit_rate']:.1%} hit rate "
+                f"({stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['invalidations']} invalidated, "
+                f"{stats['evictions']} evicted)")
+
+    # // Change feed from -changefeed, if used.
+    feed = state.get('-changefeed')
+    if feed:
+        feed.close()
+        print(f'Change feed: {feed.path} (last offset: '
+                f'{feed.last_offset()})')
 
-start()
+# // Guarded since -parse starts worker processes, which
+# // re-import this module on platforms that spawn them.
+if __name__ == '__main__':
+    start()
@@ -0,0 +1,196 @@
+import cli
+from src.sinks.sqlite import SQLiteSink
+from src.typehelpers import ArticleData
+from src.typehelpers import db_spec_wikidata_label
+from src.typehelpers import db_spec_html_label
+from src.typehelpers import db_spec_wikidata_link
+from src.typehelpers import db_spec_pending_label
+
+# !! This test doesn't need Neo4j; args run against
+# !! an in-memory SQLite sink (see src/sinks/sqlite.py).
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def articles(links:dict)-> list:
+    'ArticleData for {title: [links]}.'
+    return [
+        ArticleData(title=t, url=f'url/{t}', content=f'content of {t}',
+                    links=l, html=f'<p>{t}</p>')
+        for t, l in links.items()
+    ]
+
+
+def loaded(links:dict, linked:bool=False, writers:int=None,
+                sink:SQLiteSink=None, drop:bool=False)-> dict:
+    'State with a sink (new or <sink>) holding <links> (see articles).'
+    state = {
+        '-sqlite': sink or SQLiteSink(':memory:'),
+        '-wikiapi': iter(articles(links)),
+        '-linkonload': linked,
+        '-droppending': drop,
+        '-deferindex': True,
+        '-writers': writers,
+    }
+    cli.createdb('-createdb', None, state)
+    return state
+
+
+def count(sink, label:str)-> int:
+    return len(sink.pull_node(label=label, props={}))
+
+
+def pending(sink)-> int:
+    'Placeholders of a SQLite sink (rows, not nodes).'
+    return sink._SQLiteSink__conn.execute(
+        'SELECT count(*) FROM pending').fetchone()[0]
+
+
+def edges(sink)-> set:
+    return set(sink.pull_edges(v_label=db_spec_wikidata_label,
+                w_label=db_spec_wikidata_label,
+                e_label=db_spec_wikidata_link, key='title'))
+
+
+def test_clear():
+    state = loaded({'a': ['b'], 'b': ['a']})
+    sink = state['-sqlite']
+    sink.move_props(label=db_spec_wikidata_label, key='title',
+                    props=['html'], side_label=db_spec_html_label)
+    before = count(sink, db_spec_html_label)
+    cli.clear('-clear', '1', state)
+    return fmt_msg(
+        func=test_clear,
+        status=(
+            before == 2 and
+            count(sink, db_spec_wikidata_label) == 0 and
+            count(sink, db_spec_html_label) == 0
+        )
+    )
+
+
+def test_compact_unlinked():
+    state = loaded({'a': ['b'], 'b': ['a']})
+    sink = state['-sqlite']
+    try:
+        cli.compact('-compact', '1', state)
+        refused = False
+    except AssertionError:
+        refused = True
+    kept = all(n['links'] for n in
+                sink.pull_node(label=db_spec_wikidata_label, props={}))
+    # // Fine once linked.
+    cli.link('-link', '1', state)
+    cli.compact('-compact', '1', state)
+    nodes = sink.pull_node(label=db_spec_wikidata_label, props={})
+    return fmt_msg(
+        func=test_compact_unlinked,
+        status=(
+            refused and kept and
+            all(not n.get('links') for n in nodes) and
+            count(sink, db_spec_html_label) == 2
+        )
+    )
+
+
+def test_writers_linked():
+    links = {f't{i}': [f't{j}' for j in (i - 1, i + 1, 99)
+                        if 0 <= j < 40 or j == 99]
+                for i in range(40)}
+    sink = loaded(links, linked=True, writers=4)['-sqlite']
+    expected = {(v, w) for v, ls in links.items() for w in ls
+                if w in links}
+    # // Only placeholders of 't99' (never loaded) are left;
+    # // SQLite keeps them as rows, not nodes.
+    targets = {r[0] for r in sink._SQLiteSink__conn.execute(
+        'SELECT target FROM pending')}
+    return fmt_msg(
+        func=test_writers_linked,
+        status=(
+            edges(sink) == expected and
+            pending(sink) == 40 and targets == {'t99'}
+        )
+    )
+
+
+def test_dedup_aliases_merged():
+    text = 'the omphalos hypothesis says the world was made old ' * 4
+    sink = SQLiteSink(':memory:')
+    # // Two loads into one db; each drops a duplicate of 'a'.
+    for dup in ['a2', 'a3']:
+        state = {
+            '-sqlite': sink,
+            '-wikiapi': iter([
+                ArticleData(title=t, url='', content=text, links=[],
+                            html='') for t in ['a', dup]]),
+            '-deferindex': True,
+        }
+        cli.dedup('-dedup', '0.9', state)
+        cli.createdb('-createdb', None, state)
+    return fmt_msg(
+        func=test_dedup_aliases_merged,
+        status=sink.pull_node_prop(label=db_spec_wikidata_label,
+                    props={'title': 'a'}, prop='aliases') == [['a2', 'a3']]
+    )
+
+
+def test_linkonload_incremental():
+    # // 'b' is loaded by a later run; 'a' links to it.
+    sink = loaded({'a': ['b', 'c']}, linked=True)['-sqlite']
+    kept = pending(sink)
+    loaded({'b': []}, linked=True, sink=sink)
+    linked = edges(sink)
+    # // Opt-in; placeholder of 'c' is dropped.
+    loaded({'d': []}, linked=True, sink=sink, drop=True)
+    return fmt_msg(
+        func=test_linkonload_incremental,
+        status=(
+            kept == 2 and linked == {('a', 'b')} and
+            pending(sink) == 0 and edges(sink) == {('a', 'b')}
+        )
+    )
+
+
+def test_dedup_linkonload():
+    text = 'the omphalos hypothesis says the world was made old ' * 4
+    # // 'b' links to 'a2', which is dropped as a duplicate of 'a'.
+    state = {
+        '-sqlite': SQLiteSink(':memory:'),
+        '-wikiapi': iter([
+            ArticleData(title='b', url='', content='b', links=['a2'],
+                        html=''),
+            ArticleData(title='a', url='', content=text, links=[],
+                        html=''),
+            ArticleData(title='a2', url='', content=text, links=[],
+                        html=''),
+        ]),
+        '-linkonload': True,
+        '-deferindex': True,
+    }
+    cli.dedup('-dedup', '0.9', state)
+    cli.createdb('-createdb', None, state)
+    sink = state['-sqlite']
+    return fmt_msg(
+        func=test_dedup_linkonload,
+        status=edges(sink) == {('b', 'a')} and pending(sink) == 0
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_clear,
+    test_linkonload_incremental,
+    test_compact_unlinked,
+    test_writers_linked,
+    test_dedup_aliases_merged,
+    test_dedup_linkonload,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
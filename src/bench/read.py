@@ -0,0 +1,218 @@
+'''
+Read-path benchmark for the queries the wikinodes server
+makes, run against any GraphSink (Neo4jComm, SQLiteSink)
+so schema, index and compaction changes can be judged on
+read cost, not just ingest speed.
+
+The graph is either a synthetic one (build_graph), under
+its own labels so real data is left alone, or an already
+loaded WikiData graph.
+
+Queries (see QUERIES):
+    node        pull_node by title.
+    prop        pull_node_prop of 'links' by title.
+    neighbours  pull_neighbours; nodes linked from a title
+                (one hop from the title lookup).
+    search      query_ftindex on the content index.
+
+Titles are drawn with a skew towards low ids (popular
+articles get most reads, like on the server), and all
+draws are seeded so runs are comparable.
+
+Impl:
+    -   build_graph: writes the synthetic graph.
+    -   drop_graph: removes it again.
+    -   run: replays a mix of queries on a thread pool
+        and returns latency percentiles & throughput.
+    -   fmt_report: printable table of run() output.
+'''
+
+import math
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+# // Labels & index of the synthetic graph.
+BENCH_LABEL = 'BenchData'
+BENCH_LINK = 'BENCHLINKS'
+BENCH_INDEX = 'BenchContentIndex'
+
+QUERIES = ['node', 'prop', 'neighbours', 'search']
+# // Share of each query in a run; roughly what serving
+# // article pages looks like.
+DEFAULT_MIX = {'node': 0.4, 'prop': 0.2, 'neighbours': 0.3, 'search': 0.1}
+
+# // Vocabulary of synthetic content (and searches).
+_WORDS = (
+    'graph node article link history science music city river '
+    'theory war language species film king church island school '
+    'planet energy market library bridge mountain painting engine'
+).split()
+
+
+def _skewed(rng:random.Random, n:int)-> int:
+    'Id in 0..n-1, low ids being (much) more likely.'
+    return int(n * rng.random() ** 3)
+
+
+def build_graph(n4jcomm, nodes:int, degree:int=10, words:int=100,
+                    batch_size:int=500, seed:int=0,
+                    progress=None)-> list:
+    ''' Replaces the synthetic graph with <nodes> nodes of
+        <words> words of content, each linking to <degree>
+        others (skewed, so in-degrees are uneven). Indexes and
+        the fulltext index are created like for WikiData.
+        <progress> is an optional func, called as progress(
+        <nodes written>, <rels written>). Returns the titles.
+    '''
+    rng = random.Random(seed)
+    n4jcomm.clear(label=BENCH_LABEL, batch_size=10000)
+    n4jcomm.create_index(label=BENCH_LABEL, prop='title')
+    titles = [f'Bench article {i}' for i in range(nodes)]
+
+    def links_of(i:int)-> list:
+        links = {titles[_skewed(rng, nodes)] for _ in range(degree)}
+        links.discard(titles[i])
+        return sorted(links)
+
+    links = {}
+    for start in range(0, nodes, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, nodes)):
+            links[i] = links_of(i)
+            batch.append({
+                'title': titles[i],
+                'content': ' '.join(rng.choices(_WORDS, k=words)),
+                'links': links[i],
+            })
+        n4jcomm.push_nodes(label=BENCH_LABEL, props_list=batch, key='title')
+        if progress:
+            progress(start + len(batch), 0)
+
+    rels, written = [], 0
+    for i in range(nodes):
+        rels += [{'v': titles[i], 'w': w} for w in links.pop(i)]
+        if len(rels) >= batch_size or (i == nodes - 1 and rels):
+            n4jcomm.push_rels(v_label=BENCH_LABEL, w_label=BENCH_LABEL,
+                                e_label=BENCH_LINK, key='title', rels=rels)
+            written += len(rels)
+            rels = []
+            if progress:
+                progress(nodes, written)
+
+    if n4jcomm.ftindex_state(BENCH_INDEX) is None:
+        n4jcomm.create_ftindex(
+            name=BENCH_INDEX, label=BENCH_LABEL, prop='content')
+    n4jcomm.await_ftindex(BENCH_INDEX)
+    return titles
+
+
+def drop_graph(n4jcomm)-> None:
+    'Removes the synthetic graph and its fulltext index.'
+    n4jcomm.drop_ftindex(BENCH_INDEX)
+    n4jcomm.clear(label=BENCH_LABEL, batch_size=10000)
+
+
+def _query(n4jcomm, kind:str, arg:str, label:str, e_label:str,
+                index:str)-> int:
+    'Runs one query; returns amount of rows (nodes) read.'
+    if kind == 'node':
+        return len(n4jcomm.pull_node(label=label, props={'title': arg}))
+    if kind == 'prop':
+        return len(n4jcomm.pull_node_prop(
+            label=label, props={'title': arg}, prop='links') or [])
+    if kind == 'neighbours':
+        return len(n4jcomm.pull_neighbours(
+            v_label=label, w_label=label, e_label=e_label,
+            key='title', v=arg))
+    if kind == 'search':
+        return len(n4jcomm.query_ftindex(name=index, text=arg, limit=10))
+    raise ValueError(f'Unknown benchmark query: {kind}')
+
+
+def percentile(vals:list, q:float)-> float:
+    'Nearest-rank <q> (0..100) percentile of sorted <vals>.'
+    if not vals:
+        return 0.0
+    i = max(0, min(len(vals), math.ceil(q / 100 * len(vals))) - 1)
+    return vals[i]
+
+
+def summary(latencies:list)-> dict:
+    'Count, mean, p50/p95/p99 & max (ms) of <latencies> (sec).'
+    vals = sorted(l * 1000 for l in latencies)
+    return {
+        'n': len(vals),
+        'mean': sum(vals) / len(vals) if vals else 0.0,
+        'p50': percentile(vals, 50),
+        'p95': percentile(vals, 95),
+        'p99': percentile(vals, 99),
+        'max': vals[-1] if vals else 0.0,
+    }
+
+
+def run(n4jcomm, titles:list, requests:int=1000, concurrency:int=4,
+            mix:dict=None, label:str=BENCH_LABEL, e_label:str=BENCH_LINK,
+            index:str=BENCH_INDEX, seed:int=0,
+            clock=time.perf_counter)-> dict:
+    ''' Replays <requests> queries, drawn by the weights of
+        <mix> (default DEFAULT_MIX), from <concurrency>
+        threads against nodes of <label> with titles <titles>.
+        Returns a dict with:
+            queries     {kind: summary()} per query kind.
+            all         summary() of all queries.
+            rows        Rows (nodes) read in total.
+            wall        Sec, start to end.
+            throughput  Queries per sec.
+        Errors of queries are raised.
+    '''
+    assert titles, 'Benchmark needs 1+ titles to query.'
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    ops = [
+        (kind, rng.choice(_WORDS) if kind == 'search'
+                else titles[_skewed(rng, len(titles))])
+        for kind in kinds
+    ]
+
+    def timed(op:tuple): # -> (str, float, int)
+        start = clock()
+        rows = _query(n4jcomm, *op, label=label,
+                        e_label=e_label, index=index)
+        return op[0], clock() - start, rows
+
+    latencies = {kind: [] for kind in mix}
+    rows = 0
+    start = clock()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for kind, latency, n in pool.map(timed, ops):
+            latencies[kind].append(latency)
+            rows += n
+    wall = clock() - start
+    return {
+        'queries': {k: summary(v) for k, v in latencies.items() if v},
+        'all': summary([l for v in latencies.values() for l in v]),
+        'rows': rows,
+        'wall': wall,
+        'throughput': requests / wall if wall > 0 else 0.0,
+    }
+
+
+def fmt_report(res:dict)-> str:
+    'Printable table of run() output.'
+    lines = [
+        f"{'query':<11} {'n':>7} {'mean':>8} {'p50':>8} "
+        f"{'p95':>8} {'p99':>8} {'max':>8}   (ms)"
+    ]
+    rows = list(res['queries'].items()) + [('all', res['all'])]
+    for kind, s in rows:
+        lines.append(
+            f"{kind:<11} {s['n']:>7} {s['mean']:>8.2f} {s['p50']:>8.2f} "
+            f"{s['p95']:>8.2f} {s['p99']:>8.2f} {s['max']:>8.2f}"
+        )
+    lines.append(
+        f"{res['throughput']:.1f} queries/sec over {res['wall']:.2f}s, "
+        f"{res['rows']} rows read."
+    )
+    return '\n'.join(lines)
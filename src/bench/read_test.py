@@ -0,0 +1,68 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.sinks.sqlite import SQLiteSink
+from src.bench import read
+
+# !! Runs against an in-memory SQLite db
+# !! (no services needed).
+
+SINK = SQLiteSink(':memory:')
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_percentile():
+    vals = list(range(1, 101))
+    return fmt_msg(
+        func=test_percentile,
+        status=(
+            read.percentile(vals, 50) == 50 and
+            read.percentile(vals, 99) == 99 and
+            read.percentile(vals, 100) == 100 and
+            read.percentile([7], 95) == 7 and
+            read.percentile([], 50) == 0.0
+        )
+    )
+
+
+def test_build_run():
+    # // Real data under other labels is left alone.
+    SINK.push_node(label='WikiData', props={'title': 'kept'})
+    titles = read.build_graph(SINK, nodes=50, degree=5, batch_size=7)
+    nodes = SINK.pull_node(label=read.BENCH_LABEL, props={})
+    res = read.run(SINK, titles, requests=200, concurrency=4)
+    all_kinds = set(res['queries']) == set(read.QUERIES)
+    counted = sum(s['n'] for s in res['queries'].values()) == 200
+    read.drop_graph(SINK)
+    return fmt_msg(
+        func=test_build_run,
+        status=(
+            len(nodes) == 50 and
+            all_kinds and counted and
+            res['all']['p50'] <= res['all']['p99'] and
+            res['rows'] > 0 and
+            res['throughput'] > 0 and
+            SINK.pull_node(label=read.BENCH_LABEL, props={}) == [] and
+            SINK.ftindex_state(read.BENCH_INDEX) is None and
+            len(SINK.pull_node(label='WikiData', props={})) == 1
+        )
+    )
+
+
+# ------------------test all------------------ #
+tests = [
+    test_percentile,
+    test_build_run,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
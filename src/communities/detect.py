@@ -0,0 +1,182 @@
+from src.sinks.base import GraphSink
+from src.snapshot.titledict import TitleDict
+# // Namings
+import src.typehelpers as typehelpers
+
+from array import array
+
+import numpy as np
+
+'''
+Module for finding communities (clusters of densely
+linked articles) among wiki nodes, so the server can
+prefetch a whole community with one indexed query.
+
+Specifically; For all wiki nodes N, set
+    N.community         id of the community of N; ids
+                        are 0.. by size, largest first.
+    N.community_rank    rank of N within its community
+                        (0 = most links to other members).
+
+HYPERLINKS are read as undirected edges into an integer
+CSR structure (titles -> ids through a TitleDict), then
+label propagation runs vectorised with numpy; a pass is
+a few sorts over all edges, so memory is O(edges).
+Needs numpy; runs on CPU only. Run after linking.
+'''
+
+
+def load_csr(n4jcomm:GraphSink, title_key:str): # -> (TitleDict, ..)
+    ''' Reads WikiData nodes & HYPERLINKS into an undirected
+        CSR graph without self loops or repeated edges.
+        Returns (titles, indptr, indices); node ids are
+        those of the TitleDict <titles>.
+    '''
+    label = typehelpers.db_spec_wikidata_label
+    titles = TitleDict.from_titles(n4jcomm.pull_node_prop(
+        label=label, props={}, prop=title_key))
+    vs, ws = array('I'), array('I')
+    for v, w in n4jcomm.pull_edges(
+            v_label=label, w_label=label,
+            e_label=typehelpers.db_spec_wikidata_link, key=title_key):
+        vi, wi = titles.id(v), titles.id(w)
+        if vi is None or wi is None or vi == wi:
+            continue
+        vs.append(vi)
+        ws.append(wi)
+    n = len(titles)
+    v = np.frombuffer(vs, dtype=np.uint32).astype(np.int64)
+    w = np.frombuffer(ws, dtype=np.uint32).astype(np.int64)
+    del vs, ws
+    # // Both directions, deduplicated & sorted by row.
+    pairs = np.unique(np.concatenate([v * n + w, w * n + v]))
+    rows, indices = pairs // max(n, 1), pairs % max(n, 1)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return titles, indptr, indices
+
+
+def label_propagation(indptr, indices, max_iter:int=20, tol:float=0.001,
+                        seed:int=0): # -> (np.ndarray, int)
+    ''' Label propagation over the undirected CSR graph
+        (<indptr>, <indices>). Each pass, a random half of
+        the nodes take the label most common among their
+        neighbours and themselves (ties go to the smallest
+        label); updating half at a time stops labels from
+        flipping back & forth on bipartite structures.
+        Stops after <max_iter> passes, or once fewer than a
+        <tol> fraction of nodes would change.
+        Returns (label per node, passes made).
+    '''
+    n = len(indptr) - 1
+    labels = np.arange(n, dtype=np.int64)
+    if n == 0:
+        return labels, 0
+    rng = np.random.default_rng(seed)
+    # // Votes; every edge plus one self vote per node.
+    rows = np.concatenate([
+        np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr)),
+        np.arange(n, dtype=np.int64)
+    ])
+    cols = np.concatenate([np.asarray(indices, dtype=np.int64),
+                            np.arange(n, dtype=np.int64)])
+    passes = 0
+    for passes in range(1, max_iter + 1):
+        # // Count (row, label) votes; unique sorts by row,
+        # // then label.
+        keys, counts = np.unique(rows * n + labels[cols],
+                                    return_counts=True)
+        vote_rows, vote_labels = keys // n, keys % n
+        # // Per row; most votes first, then smallest label.
+        order = np.lexsort((vote_labels, -counts, vote_rows))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = vote_rows[order][1:] != vote_rows[order][:-1]
+        best = np.empty(n, dtype=np.int64)
+        best[vote_rows[order][first]] = vote_labels[order][first]
+
+        pending = best != labels
+        if pending.sum() < max(tol * n, 1):
+            break
+        changed = pending & (rng.random(n) < 0.5)
+        labels[changed] = best[changed]
+    return labels, passes
+
+
+def rank(indptr, indices, labels): # -> (np.ndarray, np.ndarray)
+    ''' Relabels communities 0.. by size (largest first, ties
+        by smallest member id) and ranks nodes within their
+        community by links to other members (most first, ties
+        by id). Returns (community per node, rank per node).
+    '''
+    n = len(labels)
+    if n == 0:
+        return labels, labels
+    _, inverse, sizes = np.unique(
+        labels, return_inverse=True, return_counts=True)
+    # // Smallest member id per community, for stable ties.
+    first = np.full(len(sizes), n, dtype=np.int64)
+    np.minimum.at(first, inverse, np.arange(n))
+    by_size = np.lexsort((first, -sizes))
+    community = np.empty(len(sizes), dtype=np.int64)
+    community[by_size] = np.arange(len(sizes))
+    community = community[inverse]
+
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    cols = np.asarray(indices, dtype=np.int64)
+    inside = community[rows] == community[cols]
+    degree = np.bincount(rows[inside], minlength=n)
+    order = np.lexsort((np.arange(n), -degree, community))
+    starts = np.searchsorted(community[order], community[order])
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[order] = np.arange(n) - starts
+    return community, ranks
+
+
+def detect(n4jcomm:GraphSink, title_key:str, max_iter:int=20,
+            batch_size:int=500, seed:int=0, progress=None)-> dict:
+    ''' Computes & writes communities (see mod docstring) for
+        all WikiData nodes, with update_nodes in batches of
+        <batch_size>, and indexes 'community' so a community
+        can be read with one indexed query. <progress> is an
+        optional func, called as progress(<updated so far>).
+        Returns counts of nodes, edges (undirected),
+        communities & passes made.
+    '''
+    assert isinstance(n4jcomm, GraphSink), '''
+        Tried detecting communities but did not get a valid
+        graph comminication object <n4jcomm> (see
+        src/sinks/base.py).
+    '''
+    label = typehelpers.db_spec_wikidata_label
+    titles, indptr, indices = load_csr(n4jcomm, title_key)
+    labels, passes = label_propagation(
+        indptr, indices, max_iter=max_iter, seed=seed)
+    community, ranks = rank(indptr, indices, labels)
+    del labels, indices
+
+    n4jcomm.create_index(label=label, prop='community')
+    batch, done = [], 0
+    for i in range(len(titles)):
+        batch.append({
+            title_key: titles.title(i),
+            'community': int(community[i]),
+            'community_rank': int(ranks[i]),
+        })
+        if len(batch) >= batch_size:
+            n4jcomm.update_nodes(label=label, props_list=batch, key=title_key)
+            done += len(batch)
+            batch = []
+            if progress:
+                progress(done)
+    # // Remainder.
+    if batch:
+        n4jcomm.update_nodes(label=label, props_list=batch, key=title_key)
+        done += len(batch)
+    if progress:
+        progress(done)
+    return {
+        'nodes': len(titles),
+        'edges': int(indptr[-1]) // 2,
+        'communities': int(community.max()) + 1 if len(titles) else 0,
+        'passes': passes,
+    }
@@ -0,0 +1,75 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from itertools import combinations
+
+from src.sinks.sqlite import SQLiteSink
+from src.communities.detect import detect
+
+# !! Runs against an in-memory SQLite db
+# !! (no services needed).
+
+SINK = SQLiteSink(':memory:')
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_two_cliques():
+    SINK.clear()
+    # // Cliques a0..a4 & b0..b3, joined by a4->b0, plus
+    # // a node without links.
+    a = [f'a{i}' for i in range(5)]
+    b = [f'b{i}' for i in range(4)]
+    SINK.push_nodes(label='WikiData', key='title', props_list=[
+        {'title': t} for t in a + b + ['lone']])
+    rels = [{'v': v, 'w': w} for c in (a, b) for v, w in combinations(c, 2)]
+    SINK.push_rels(v_label='WikiData', w_label='WikiData',
+        e_label='HYPERLINKS', key='title',
+        rels=rels + [{'v': 'a4', 'w': 'b0'}, {'v': 'b0', 'w': 'a4'}])
+    stats = detect(SINK, title_key='title', batch_size=3)
+    nodes = {
+        n['title']: (n['community'], n['community_rank'])
+        for n in SINK.pull_node(label='WikiData', props={})
+    }
+    return fmt_msg(
+        func=test_two_cliques,
+        status=(
+            stats['nodes'] == 10 and
+            stats['edges'] == 10 + 6 + 1 and
+            stats['communities'] == 3 and
+            # // Largest community first.
+            {nodes[t][0] for t in a} == {0} and
+            {nodes[t][0] for t in b} == {1} and
+            nodes['lone'] == (2, 0) and
+            sorted(nodes[t][1] for t in a) == [0, 1, 2, 3, 4] and
+            sorted(nodes[t][1] for t in b) == [0, 1, 2, 3]
+        )
+    )
+
+
+def test_empty():
+    SINK.clear()
+    stats = detect(SINK, title_key='title')
+    return fmt_msg(
+        func=test_empty,
+        status=stats == {
+            'nodes': 0, 'edges': 0, 'communities': 0, 'passes': 0}
+    )
+
+
+# ------------------test all------------------ #
+tests = [
+    test_two_cliques,
+    test_empty,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -0,0 +1,165 @@
+'''
+Used for dropping near-duplicate articles from an
+ArticleData stream (e.g the same page pulled under
+different titles, through redirects, disambiguation
+fallbacks or subsearch) before they are written.
+
+Impl:
+    -   signature: MinHash signature of a text, using
+        one permutation hashing (one hash per shingle,
+        <num_perm> bins) so it's cheap in pure python.
+    -   DedupFilter: LSH index over signatures of the
+        most recent <capacity> articles; see class.
+'''
+
+import re
+import hashlib
+from array import array
+from collections import OrderedDict
+
+_WORD = re.compile(r'\w+')
+# // Marks an empty bin of a signature.
+_EMPTY = 2**64 - 1
+
+
+def _hash64(data:bytes)-> int:
+    return int.from_bytes(
+        hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def signature(text:str, num_perm:int=64, shingle:int=5)-> array:
+    ''' MinHash signature (<num_perm> uint64) of word
+        <shingle>-grams of <text>. The fraction of equal
+        positions of two signatures estimates the Jaccard
+        similarity of their shingle sets.
+    '''
+    words = _WORD.findall((text or '').lower())
+    sig = array('Q', [_EMPTY]) * num_perm
+    for i in range(max(1, len(words) - shingle + 1)):
+        h = _hash64(' '.join(words[i:i + shingle]).encode())
+        b, v = h % num_perm, h // num_perm
+        if v < sig[b]:
+            sig[b] = v
+    # // Densify; empty bins borrow the next filled one, so
+    # // that short texts still compare position-wise.
+    filled = [b for b in range(num_perm) if sig[b] != _EMPTY]
+    if filled and len(filled) < num_perm:
+        for b in range(num_perm):
+            if sig[b] == _EMPTY:
+                src = next((f for f in filled if f > b), filled[0])
+                sig[b] = sig[src] + (src - b) % num_perm
+    return sig
+
+
+def similarity(a:array, b:array)-> float:
+    'Estimated Jaccard similarity of two signatures.'
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class DedupFilter:
+    ''' Near-duplicate filter over texts, with LSH banding
+        (<bands> bands of num_perm/bands rows) for finding
+        candidates and estimated similarity >= <threshold>
+        for confirming them.
+
+        Memory is bounded; only the <capacity> most recently
+        kept texts (signature & bucket keys) are remembered,
+        so duplicates further apart than that are missed.
+
+        Titles of dropped duplicates are collected as aliases
+        of the kept one; see aliases().
+    '''
+    def __init__(self, threshold:float=0.9, num_perm:int=64,
+                    bands:int=16, shingle:int=5, capacity:int=100000):
+        assert num_perm % bands == 0, '''
+            DedupFilter: <num_perm> has to be a multiple
+            of <bands>.
+        '''
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle = shingle
+        self.capacity = capacity
+        # // title -> signature; oldest first.
+        self.__kept = OrderedDict()
+        # // band key -> titles.
+        self.__buckets = {}
+        # // kept title -> [dropped titles]
+        self.__aliases = {}
+        self.__counts = {'seen': 0, 'dropped': 0}
+
+
+    def __band_keys(self, sig:array)-> list:
+        rows = self.num_perm // self.bands
+        return [
+            _hash64(i.to_bytes(2, 'little') + sig[i*rows:(i+1)*rows]
+                    .tobytes())
+            for i in range(self.bands)
+        ]
+
+
+    def __forget_oldest(self)-> None:
+        title, sig = self.__kept.popitem(last=False)
+        for key in self.__band_keys(sig):
+            titles = self.__buckets.get(key)
+            if titles:
+                titles.discard(title)
+                if not titles:
+                    del self.__buckets[key]
+
+
+    def check(self, title:str, text:str): # -> str or None
+        ''' Returns the title of a kept text which <text> is a
+            near-duplicate of, or None; in which case <text> is
+            kept (remembered) under <title>.
+        '''
+        self.__counts['seen'] += 1
+        sig = signature(text, self.num_perm, self.shingle)
+        keys = self.__band_keys(sig)
+        candidates = set()
+        for key in keys:
+            candidates |= self.__buckets.get(key, set())
+        candidates.discard(title)
+        best = max(
+            candidates,
+            key=lambda c: similarity(sig, self.__kept[c]),
+            default=None
+        )
+        if best is not None and \
+                similarity(sig, self.__kept[best]) >= self.threshold:
+            self.__counts['dropped'] += 1
+            aliases = self.__aliases.setdefault(best, [])
+            if title not in aliases:
+                aliases.append(title)
+            return best
+
+        if title not in self.__kept:
+            self.__kept[title] = sig
+            for key in keys:
+                self.__buckets.setdefault(key, set()).add(title)
+            while len(self.__kept) > self.capacity:
+                self.__forget_oldest()
+        return None
+
+
+    def filter(self, gen, title_key:str='title',
+                    content_key:str='content'): # -> gen
+        ''' Yields objs (e.g ArticleData) of <gen> which aren't
+            near-duplicates of earlier ones, compared by the
+            attributes <content_key>, named by <title_key>.
+        '''
+        for obj in gen:
+            dup = self.check(
+                getattr(obj, title_key), getattr(obj, content_key))
+            if dup is None:
+                yield obj
+
+
+    def aliases(self)-> dict:
+        'Kept title -> titles of its dropped duplicates.'
+        return {k: list(v) for k, v in self.__aliases.items()}
+
+
+    def stats(self)-> dict:
+        'Counters of seen & dropped texts.'
+        return dict(self.__counts)
@@ -0,0 +1,83 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import random
+
+from src.data_gen.dedup import DedupFilter
+from src.data_gen.dedup import signature
+from src.data_gen.dedup import similarity
+from src.typehelpers import ArticleData
+
+RNG = random.Random(7)
+WORDS = [f'w{i}' for i in range(2000)]
+
+
+def text(n:int=400)-> str:
+    return ' '.join(RNG.choice(WORDS) for _ in range(n))
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_signature():
+    a = text()
+    # // Small edit near the end.
+    b = a[:-20] + ' extra words'
+    return fmt_msg(
+        func=test_signature,
+        status=(
+            similarity(signature(a), signature(a)) == 1 and
+            similarity(signature(a), signature(b)) > 0.8 and
+            similarity(signature(a), signature(text())) < 0.2
+        )
+    )
+
+
+def test_filter():
+    a, b = text(), text()
+    arts = [
+        ArticleData('A', 'u', a, [], ''),
+        ArticleData('B', 'u', b, [], ''),
+        ArticleData('A (alias)', 'u', a, [], ''),
+        # // Same title again isn't an alias of itself.
+        ArticleData('A', 'u', a, [], ''),
+        ArticleData('B2', 'u', b[:-10], [], ''),
+    ]
+    filt = DedupFilter(threshold=0.8)
+    kept = [x.title for x in filt.filter(iter(arts))]
+    return fmt_msg(
+        func=test_filter,
+        status=(
+            kept == ['A', 'B', 'A'] and
+            filt.aliases() == {'A': ['A (alias)'], 'B': ['B2']} and
+            filt.stats() == {'seen': 5, 'dropped': 2}
+        )
+    )
+
+
+def test_capacity():
+    filt = DedupFilter(threshold=0.8, capacity=2)
+    a = text()
+    filt.check('a', a)
+    filt.check('b', text())
+    filt.check('c', text())
+    # // 'a' is forgotten, so its copy is kept.
+    return fmt_msg(func=test_capacity, status=filt.check('a2', a) is None)
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_signature,
+    test_filter,
+    test_capacity,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
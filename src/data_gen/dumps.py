@@ -0,0 +1,193 @@
+import re
+import gzip
+from array import array
+from bisect import bisect_left
+
+'''
+Module for streaming rows out of Wikipedia SQL dumps
+(https://dumps.wikimedia.org/), e.g
+    enwiki-latest-page.sql.gz
+    enwiki-latest-pagelinks.sql.gz
+    enwiki-latest-linktarget.sql.gz
+..without loading them into MySQL. Dumps are read line
+by line (each INSERT statement is one line), so memory
+is bounded by the longest statement, not the dump.
+
+Impl:
+    -   iter_rows:  all value tuples of a table.
+    -   iter_pages: (page_id, title) of articles.
+    -   iter_linktargets: (lt_id, title) of articles.
+    -   iter_pagelinks: (from page_id, to title) of
+        article to article links.
+    -   PageIdMap: compact page_id -> int map.
+
+NOTE: pagelinks dumps from before 2024 have the target
+title (pl_title) in every row; newer ones only have an id
+into the linktarget table (pl_target_id), so those need
+the linktarget dump as well (see iter_pagelinks).
+'''
+
+# // Namespace of articles.
+ARTICLE_NS = 0
+
+# // One value; quoted string (with escapes), or anything
+# // up to the next comma (numbers, NULL).
+_FIELD = re.compile(r"'((?:[^'\\]|\\.)*)'|([^,]+)")
+# // One tuple; quoted parts may contain parentheses.
+_TUPLE = re.compile(r"\(((?:'(?:[^'\\]|\\.)*'|[^'()])*)\)")
+# // MySQL escapes, as written by mysqldump.
+_ESCAPE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'0': '\0', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+
+def _unescape(s:str)-> str:
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), s)
+
+
+def _parse_tuple(body:str)-> tuple:
+    ''' Values of one tuple (without parentheses). Strings are
+        unescaped, ints converted and NULL becomes None;
+        anything else is kept as str.
+    '''
+    vals = []
+    for quoted, raw in _FIELD.findall(body):
+        if raw == '':
+            vals.append(_unescape(quoted))
+        elif raw == 'NULL':
+            vals.append(None)
+        else:
+            try:
+                vals.append(int(raw))
+            except ValueError:
+                vals.append(raw)
+    return tuple(vals)
+
+
+def _open(path:str):
+    'Text handle of a (maybe gzipped) dump.'
+    opener = gzip.open if path.endswith('.gz') else open
+    return opener(path, 'rt', encoding='utf-8', errors='replace')
+
+
+def iter_rows(path:str, table:str): # -> gen
+    'Yields every value tuple INSERTed into <table> in dump <path>.'
+    prefix = f'INSERT INTO `{table}` VALUES '
+    with _open(path) as f:
+        for line in f:
+            if not line.startswith(prefix):
+                continue
+            for m in _TUPLE.finditer(line, len(prefix)):
+                yield _parse_tuple(m.group(1))
+
+
+def _title(raw:str)-> str:
+    'Dump titles use underscores; article titles use spaces.'
+    return raw.replace('_', ' ')
+
+
+def iter_pages(path:str): # -> gen
+    ''' Yields (page_id, title) of all articles (namespace 0)
+        in the page dump at <path>.
+    '''
+    for row in iter_rows(path, 'page'):
+        # // page_id, page_namespace, page_title, ..
+        if row[1] == ARTICLE_NS:
+            yield row[0], _title(row[2])
+
+
+def iter_linktargets(path:str): # -> gen
+    ''' Yields (lt_id, title) of all link targets which are
+        articles (namespace 0) in the linktarget dump at <path>.
+    '''
+    for row in iter_rows(path, 'linktarget'):
+        # // lt_id, lt_namespace, lt_title
+        if len(row) != 3 or not isinstance(row[2], str):
+            raise ValueError(f'''
+            Tried reading linktarget but rows don't have the
+            expected (lt_id, lt_namespace, lt_title) schema.
+            Got: {row}
+            ''')
+        if row[1] == ARTICLE_NS:
+            yield row[0], _title(row[2])
+
+
+def iter_pagelinks(path:str, targets=None): # -> gen
+    ''' Yields (from page_id, to) of all links between articles
+        in the pagelinks dump at <path>; <to> is the title.
+        Newer dumps (2024+) only have link target ids; those
+        need <targets>, a map (anything with .get, e.g a
+        PageIdMap) of the lt_ids of article targets (see
+        iter_linktargets) to what is yielded as <to> (e.g a
+        title). Once given, <targets> is used for any row with
+        a target id, and links to unmapped ids are skipped.
+    '''
+    for row in iter_rows(path, 'pagelinks'):
+        if len(row) in (4, 5) and isinstance(row[2], str):
+            # // pl_from, pl_namespace, pl_title, pl_from_namespace
+            # // (, pl_target_id while migrating to linktarget)
+            if row[1] != ARTICLE_NS or row[3] != ARTICLE_NS:
+                continue
+            if targets is None:
+                yield row[0], _title(row[2])
+                continue
+            if len(row) == 4:
+                raise ValueError(f'''
+            Tried reading pagelinks through linktarget, but
+            rows have no pl_target_id. Got: {row}
+            ''')
+            from_id, target_id = row[0], row[4]
+        elif len(row) == 3:
+            # // pl_from, pl_from_namespace, pl_target_id
+            if targets is None:
+                raise ValueError('''
+            Tried reading pagelinks, but rows only have link
+            target ids (2024+ schema); the linktarget dump
+            is needed to resolve them.
+            ''')
+            if row[1] != ARTICLE_NS:
+                continue
+            from_id, target_id = row[0], row[2]
+        else:
+            raise ValueError(f'''
+            Tried reading pagelinks but rows have neither the
+            pre 2024 (pl_title) nor the linktarget schema.
+            Got: {row}
+            ''')
+        to = targets.get(target_id)
+        if to is not None:
+            yield from_id, to
+
+
+class PageIdMap:
+    ''' Compact map of page ids to ints (e.g indexes into a
+        list of titles), as two sorted arrays of uint32 (8
+        bytes per page) with binary search lookups.
+    '''
+    def __init__(self, pairs):
+        'Builds the map from an iterable of (page_id, val).'
+        self.__ids, self.__vals = array('I'), array('I')
+        ordered = True
+        for page_id, val in pairs:
+            ordered = ordered and (
+                not self.__ids or self.__ids[-1] < page_id)
+            self.__ids.append(page_id)
+            self.__vals.append(val)
+        # // Dumps are in page_id order (primary key), so
+        # // this is usually skipped.
+        if not ordered:
+            order = sorted(range(len(self.__ids)),
+                            key=self.__ids.__getitem__)
+            self.__ids = array('I', (self.__ids[i] for i in order))
+            self.__vals = array('I', (self.__vals[i] for i in order))
+
+
+    def __len__(self)-> int:
+        return len(self.__ids)
+
+
+    def get(self, page_id:int, default=None):
+        'Val of <page_id>, or <default> if not mapped.'
+        i = bisect_left(self.__ids, page_id)
+        if i < len(self.__ids) and self.__ids[i] == page_id:
+            return self.__vals[i]
+        return default
@@ -0,0 +1,138 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import os
+import gzip
+import tempfile
+
+from src.data_gen.dumps import iter_rows
+from src.data_gen.dumps import iter_pages
+from src.data_gen.dumps import iter_pagelinks
+from src.data_gen.dumps import iter_linktargets
+from src.data_gen.dumps import PageIdMap
+
+# !! Dumps are small stand-ins with the same
+# !! format as the mysqldump files.
+
+PAGE_SQL = '''-- MySQL dump
+CREATE TABLE `page` (
+  `page_id` int(8) unsigned NOT NULL AUTO_INCREMENT,
+  ...
+);
+INSERT INTO `page` VALUES (1,0,'Last_Thursdayism','',0,0,0.1,'2020',NULL,1,2,'wikitext',NULL),(2,0,'Omphalos_(theology)','',0,0,0.2,'2020',NULL,1,2,'wikitext',NULL),(3,1,'Talk:It\\'s_x','',0,0,0.3,'2020',NULL,1,2,'wikitext',NULL);
+INSERT INTO `page` VALUES (4,0,'It\\'s,_a_(test)','',0,0,0.1,'2020',NULL,1,2,'wikitext',NULL);
+'''
+
+PAGELINKS_SQL = '''INSERT INTO `pagelinks` VALUES (1,0,'Omphalos_(theology)',0),(1,0,'Missing',0),(2,0,'Last_Thursdayism',0),(4,0,'Last_Thursdayism',0),(3,0,'Last_Thursdayism',1),(2,2,'User',0);
+'''
+
+# // 2024+ schema; pl_from, pl_from_namespace, pl_target_id.
+PAGELINKS_LT_SQL = '''INSERT INTO `pagelinks` VALUES (1,0,2),(1,0,9),(2,0,1),(3,1,1),(4,0,3),(4,0,99);
+'''
+
+# // lt_id, lt_namespace, lt_title
+LINKTARGET_SQL = '''INSERT INTO `linktarget` VALUES (1,0,'Last_Thursdayism'),(2,0,'Omphalos_(theology)'),(3,2,'User'),(9,0,'Missing');
+'''
+
+
+def write_dump(name:str, text:str)-> str:
+    path = os.path.join(tempfile.mkdtemp(), name)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_iter_rows():
+    rows = list(iter_rows(write_dump('page.sql.gz', PAGE_SQL), 'page'))
+    return fmt_msg(
+        func=test_iter_rows,
+        status=(
+            len(rows) == 4 and
+            rows[0][:3] == (1, 0, 'Last_Thursdayism') and
+            rows[0][8] is None and
+            rows[3][2] == "It's,_a_(test)"
+        )
+    )
+
+
+def test_iter_pages_links():
+    pages = list(iter_pages(write_dump('page.sql.gz', PAGE_SQL)))
+    links = list(iter_pagelinks(write_dump('pl.sql.gz', PAGELINKS_SQL)))
+    return fmt_msg(
+        func=test_iter_pages_links,
+        status=(
+            pages == [
+                (1, 'Last Thursdayism'), (2, 'Omphalos (theology)'),
+                (4, "It's, a (test)")
+            ] and
+            links == [
+                (1, 'Omphalos (theology)'), (1, 'Missing'),
+                (2, 'Last Thursdayism'), (4, 'Last Thursdayism')
+            ]
+        )
+    )
+
+
+def test_linktarget():
+    targets = dict(iter_linktargets(write_dump('lt.sql.gz', LINKTARGET_SQL)))
+    path = write_dump('pl.sql.gz', PAGELINKS_LT_SQL)
+    links = list(iter_pagelinks(path, targets))
+    # // Rows of the old schema with pl_target_id (while
+    # // migrating) go through <targets> too.
+    moving = list(iter_pagelinks(write_dump('pl.sql.gz',
+        "INSERT INTO `pagelinks` VALUES (1,0,'Omphalos_(theology)',0,2);"),
+        {2: 'x'}))
+    errors = 0
+    for p, t in [(path, None),
+                 (write_dump('pl.sql.gz', PAGELINKS_SQL), {}),
+                 (write_dump('pl.sql.gz',
+                    "INSERT INTO `pagelinks` VALUES (1,2);"), None)]:
+        try:
+            list(iter_pagelinks(p, t))
+        except ValueError:
+            errors += 1
+    return fmt_msg(
+        func=test_linktarget,
+        status=(
+            targets == {1: 'Last Thursdayism', 2: 'Omphalos (theology)',
+                        9: 'Missing'} and
+            links == [
+                (1, 'Omphalos (theology)'), (1, 'Missing'),
+                (2, 'Last Thursdayism')
+            ] and
+            moving == [(1, 'x')] and errors == 3
+        )
+    )
+
+
+def test_page_id_map():
+    ids = PageIdMap([(30, 0), (10, 1), (20, 2)])
+    return fmt_msg(
+        func=test_page_id_map,
+        status=(
+            len(ids) == 3 and ids.get(10) == 1 and ids.get(30) == 0 and
+            ids.get(15) is None and ids.get(99, -1) == -1
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_iter_rows,
+    test_iter_pages_links,
+    test_linktarget,
+    test_page_id_map,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -0,0 +1,167 @@
+import os
+from collections import deque
+from html.parser import HTMLParser
+from urllib.parse import unquote
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from src.typehelpers import ArticleData
+
+'''
+Module for turning raw article html (as pulled by
+data_gen/wikiapi.py pull_raw) into ArticleData, on
+a pool of processes so that parsing isn't bound to
+the single thread which fetches.
+
+Impl:
+    -   parse_html: html -> (content, links); pure and
+        picklable, runs in the worker processes.
+    -   parse_stream: fans a stream of raw pages out to
+        a ProcessPoolExecutor in chunks and yields
+        ArticleData, ordered or as they complete.
+
+Transfer is kept small: workers get only the html
+per page (pickled as is; pickle already stores str as
+utf-8, so encoding first would only add a copy) and
+only send (content, links) back. The html is then
+re-attached from the parent's copy.
+'''
+
+# // Tags whose text isn't article content.
+_SKIP = {'script', 'style', 'table', 'sup', 'math', 'figure', 'noscript'}
+# // Block tags which end a line of content.
+_BLOCK = {'p', 'div', 'li', 'ul', 'ol', 'dl', 'dd', 'dt', 'br', 'blockquote'}
+_HEADINGS = {'h2': '==', 'h3': '===', 'h4': '===='}
+# // Article links; other namespaces have a ':'.
+_WIKI = '/wiki/'
+
+
+class _ArticleParser(HTMLParser):
+    ''' Collects plain text (with '== heading ==' lines, like
+        the content of the wikipedia module) and article
+        links from article html.
+    '''
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.links = {}
+        self.__skip = 0
+        self.__heading = None
+
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP:
+            self.__skip += 1
+        elif tag in _HEADINGS and not self.__skip:
+            self.__heading = _HEADINGS[tag]
+            self.parts.append(f'\n\n{self.__heading} ')
+        elif tag in _BLOCK:
+            self.parts.append('\n')
+        if tag == 'a':
+            href = dict(attrs).get('href') or ''
+            if href.startswith(_WIKI):
+                title = unquote(href[len(_WIKI):].split('#')[0])
+                if title and ':' not in title:
+                    self.links[title.replace('_', ' ')] = None
+
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP:
+            self.__skip = max(0, self.__skip - 1)
+        elif tag in _HEADINGS and self.__heading and not self.__skip:
+            self.parts.append(f' {self.__heading}\n')
+            self.__heading = None
+
+
+    def handle_data(self, data):
+        # // Line breaks in html source are just spaces;
+        # // lines are made by block tags only.
+        if not self.__skip:
+            self.parts.append(data.replace('\n', ' '))
+
+
+def parse_html(html:str): # -> (str, list)
+    ''' Returns (content, links) of article <html>; content is
+        plain text, links are unique article titles in order
+        of appearance.
+    '''
+    parser = _ArticleParser()
+    parser.feed(html or '')
+    parser.close()
+    # // Edit links ('[edit]') are inside headings.
+    text = ''.join(parser.parts).replace('[edit]', '')
+    lines = (' '.join(line.split()) for line in text.split('\n'))
+    content = '\n'.join(line for line in lines if line)
+    return content, list(parser.links)
+
+
+def _parse_chunk(chunk:list)-> list:
+    'Worker side; [html, ..] -> [(content, links), ..]'
+    return [parse_html(html) for html in chunk]
+
+
+def _chunks(pages, size:int): # -> gen
+    'Groups the iterable <pages> into lists of <size>.'
+    chunk = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_stream(pages, workers:int=None, chunk_size:int=32,
+                    max_pending:int=None, ordered:bool=True): # -> gen
+    ''' Yields ArticleData for the iterable <pages> of
+        (title, url, html), parsed by <workers> processes
+        (default os.cpu_count()). Pages are submitted in
+        chunks of <chunk_size>, with at most <max_pending>
+        (default 2 * workers) chunks in flight, so memory
+        stays bounded while <pages> is pulled lazily. With
+        <ordered>, output follows the order of <pages>;
+        otherwise chunks are yielded as they complete.
+    '''
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    chunks = _chunks(pages, chunk_size)
+
+    def submit(pool, pending:deque)-> bool:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        payload = [html or '' for _, _, html in chunk]
+        pending.append((chunk, pool.submit(_parse_chunk, payload)))
+        return True
+
+    def build(chunk:list, parsed:list): # -> gen
+        for (title, url, html), (content, links) in zip(chunk, parsed):
+            yield ArticleData(
+                title=title,
+                url=url,
+                content=content,
+                links=links,
+                html=html
+            )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        more = True
+        while more and len(pending) < max_pending:
+            more = submit(pool, pending)
+        while pending:
+            if ordered:
+                chunk, fut = pending.popleft()
+            else:
+                done, _ = wait([f for _, f in pending],
+                                return_when=FIRST_COMPLETED)
+                i = next(i for i, p in enumerate(pending) if p[1] in done)
+                chunk, fut = pending[i]
+                del pending[i]
+            # // Refill before yielding, so workers stay busy
+            # // while the consumer handles this chunk.
+            parsed = fut.result()
+            while more and len(pending) < max_pending:
+                more = submit(pool, pending)
+            yield from build(chunk, parsed)
@@ -0,0 +1,71 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.data_gen.parse import parse_html
+from src.data_gen.parse import parse_stream
+
+# !! Html is a trimmed down stand-in for what
+# !! wikipedia.page(..).html() gives.
+
+HTML = \
+'''<div class="mw-parser-output"><p>The <b>omphalos</b> hypothesis, see
+<a href="/wiki/Last_Thursdayism" title="x">last thursdayism</a><sup>[1]</sup>
+and <a href="/wiki/Philip_Henry_Gosse#Omphalos">Gosse</a>.</p>
+<h2><span class="mw-headline">History</span><span class="mw-editsection">
+<span>[</span><a href="/w/index.php?action=edit">edit</a><span>]</span></span></h2>
+<p>Again <a href="/wiki/Last_Thursdayism">it</a>,
+<a href="/wiki/File:X.png">img</a> &amp; <a href="/wiki/Caf%C3%A9">cafe</a>.</p>
+<style>.x{}</style><table><tr><td>skipped</td></tr></table></div>'''
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_parse_html():
+    content, links = parse_html(HTML)
+    return fmt_msg(
+        func=test_parse_html,
+        status=(
+            content == (
+                'The omphalos hypothesis, see last thursdayism and Gosse.\n'
+                '== History ==\n'
+                'Again it, img & cafe.'
+            ) and
+            links == ['Last Thursdayism', 'Philip Henry Gosse', 'Café']
+        )
+    )
+
+
+def test_parse_stream():
+    pages = [(f't{i}', f'u{i}', HTML.replace('omphalos', f'n{i}'))
+                for i in range(50)]
+    ordered = list(parse_stream(iter(pages), workers=2, chunk_size=4))
+    unordered = list(parse_stream(
+        iter(pages), workers=2, chunk_size=4, ordered=False))
+    return fmt_msg(
+        func=test_parse_stream,
+        status=(
+            [a.title for a in ordered] == [p[0] for p in pages] and
+            ordered[7].html == pages[7][2] and
+            'n7 hypothesis' in ordered[7].content and
+            sorted(a.title for a in unordered) == sorted(p[0] for p in pages)
+        )
+    )
+
+
+# // --------------Run all--------------// #
+if __name__ == '__main__':
+    tests = [
+        test_parse_html,
+        test_parse_stream,
+    ]
+
+    print('Running all tests:')
+    for t in tests:
+        print(t())
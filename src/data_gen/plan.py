@@ -0,0 +1,168 @@
+'''
+Dry-run cost estimates for crawl & load jobs, i.e
+what '-titles X -wikiapi N -createdb -link' will
+cost before any API quota is spent.
+
+Crawls (see wikiapi.pull_articles) are DFS without
+a visited set, so every fetched article at depth d
+fetches all of its links at depth d+1; the amount of
+fetched articles per seed is sum(L^d for d in 0..N),
+with L as the mean amount of links per article.
+
+L and the other rates come from (see Stats):
+    -   stats_from_db: articles stored by previous
+        runs (no API calls).
+    -   stats_from_api: fetching a few sample titles.
+    -   DEFAULT_STATS otherwise.
+
+Impl:
+    -   estimate: cost per depth, see func docstring.
+'''
+
+import math
+import time
+
+from src.data_gen import wikiapi
+
+# // Rough rates of English Wikipedia articles; used
+# // when there's nothing better.
+DEFAULT_STATS = {
+    'source': 'defaults',
+    'samples': 0,
+    # // Links per article.
+    'mean_links': 300.0,
+    # // Bytes of content + html per article.
+    'mean_bytes': 250000.0,
+    # // Fraction of titles which resolve to an article.
+    'success': 0.95,
+    # // Fraction of links of a leaf article (last depth)
+    # // pointing to another fetched article.
+    'link_hit_rate': 0.05,
+    # // Sec per API request, not counting the throttle.
+    'latency': 0.3,
+}
+
+# // Upper bound on distinct (English) articles.
+MAX_ARTICLES = 7000000
+# // The wikipedia mod fetches links in pages of this size.
+_LINKS_PER_REQUEST = 500
+
+
+def requests_per_article(mean_links:float)-> float:
+    ''' API requests per article by pull_articles; page
+        lookup, content, html & paged links.
+    '''
+    return 3 + max(1, math.ceil(mean_links / _LINKS_PER_REQUEST))
+
+
+def stats_from_db(n4jcomm, label:str, title_key:str, links_key:str,
+                    content_key:str, html_key:str, sample:int=1000): # -> dict
+    ''' Stats from up to <sample> stored articles, or None if
+        there are none (or they've been compacted). The link
+        hit rate is the fraction of their links which point
+        to stored titles.
+    '''
+    titles = set(n4jcomm.pull_node_prop(label=label, props={}, prop=title_key))
+    n = links = hits = size = 0
+    for _, hlinks, content, html in n4jcomm.pull_props(
+            label=label, props=[title_key, links_key, content_key, html_key]):
+        if hlinks is None:
+            continue
+        n += 1
+        links += len(hlinks)
+        hits += sum(link in titles for link in hlinks)
+        size += len((content or '').encode()) + len((html or '').encode())
+        if n >= sample:
+            break
+    if n == 0:
+        return None
+    return {
+        **DEFAULT_STATS,
+        'source': 'db',
+        'samples': n,
+        'mean_links': links / n,
+        'mean_bytes': size / n,
+        'link_hit_rate': hits / links if links else 0.0,
+    }
+
+
+def stats_from_api(titles:list, clock=time.monotonic): # -> dict
+    ''' Stats from fetching <titles> (no subsearch). Latency is
+        measured per request, minus the configured pause.
+    '''
+    n = links = size = requests = 0
+    start = clock()
+    for data in wikiapi.pull_articles(titles=titles, subsearch=0):
+        n += 1
+        links += len(data.links)
+        size += len(data.content.encode()) + len(data.html.encode())
+        requests += requests_per_article(len(data.links))
+    elapsed = clock() - start
+    if n == 0:
+        return None
+    return {
+        **DEFAULT_STATS,
+        'source': 'api',
+        'samples': n,
+        'mean_links': links / n,
+        'mean_bytes': size / n,
+        'success': n / len(titles),
+        'latency': max(0.0, elapsed / requests - wikiapi.API_PAUSE_SEC),
+    }
+
+
+def estimate(n_titles:int, depth:int, stats:dict,
+                pause:float=wikiapi.API_PAUSE_SEC,
+                batch_size:int=50)-> list:
+    ''' Estimates per subsearch depth 0..<depth> for <n_titles>
+        seed titles, as a list of dicts with:
+            depth, articles (fetched, with repeats), nodes
+            (distinct, bounded), requests, bytes, hours (at
+            <pause> sec between requests), node_tx (createdb
+            transactions of <batch_size>) & edges.
+    '''
+    links, ok = stats['mean_links'], stats['success']
+    per_article = requests_per_article(links)
+    res = []
+    for d in range(depth + 1):
+        # // Fetched articles per depth level, per seed.
+        levels = [(links * ok) ** i * ok for i in range(d + 1)]
+        articles = n_titles * sum(levels)
+        # // Failed lookups still cost one request.
+        lookups = n_titles * sum(levels) / ok
+        requests = articles * per_article + (lookups - articles)
+        nodes = min(articles, MAX_ARTICLES)
+        # // Links of inner articles are all fetched; leaves
+        # // only hit what happens to be fetched too.
+        leaves = n_titles * levels[-1]
+        edges = (articles - leaves) * links * ok + \
+                    leaves * links * stats['link_hit_rate']
+        res.append({
+            'depth': d,
+            'articles': round(articles),
+            'nodes': round(nodes),
+            'requests': round(requests),
+            'bytes': round(articles * stats['mean_bytes']),
+            'hours': requests * (pause + stats['latency']) / 3600,
+            'node_tx': math.ceil(articles / batch_size),
+            'edges': round(min(edges, nodes * links)),
+        })
+    return res
+
+
+def fmt_plan(plan:list, stats:dict)-> str:
+    'Printable table of estimate() output.'
+    lines = [
+        f"Based on: {stats['source']} ({stats['samples']} samples), "
+        f"{stats['mean_links']:.0f} links & "
+        f"{stats['mean_bytes'] / 1e3:.0f}KB per article.",
+        f"{'depth':>5} {'articles':>12} {'requests':>12} "
+        f"{'GB':>9} {'hours':>10} {'node tx':>10} {'edges':>14}",
+    ]
+    for p in plan:
+        lines.append(
+            f"{p['depth']:>5} {p['articles']:>12} {p['requests']:>12} "
+            f"{p['bytes'] / 1e9:>9.2f} {p['hours']:>10.1f} "
+            f"{p['node_tx']:>10} {p['edges']:>14}"
+        )
+    return '\n'.join(lines)
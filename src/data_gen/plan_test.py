@@ -0,0 +1,74 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.data_gen import plan
+from src.sinks.sqlite import SQLiteSink
+
+# !! No API calls; stats come from a stand-in
+# !! dict or an in-memory SQLite db.
+
+STATS = {
+    **plan.DEFAULT_STATS,
+    'mean_links': 10.0, 'mean_bytes': 1000.0, 'success': 1.0,
+    'link_hit_rate': 0.5, 'latency': 0.0,
+}
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_estimate():
+    res = plan.estimate(n_titles=2, depth=2, stats=STATS,
+                            pause=1.0, batch_size=50)
+    d0, d1, d2 = res
+    return fmt_msg(
+        func=test_estimate,
+        status=(
+            [r['articles'] for r in res] == [2, 22, 222] and
+            # // 3 + 1 page of links per article.
+            d1['requests'] == 22 * 4 and
+            d1['hours'] == 22 * 4 / 3600 and
+            d2['node_tx'] == 5 and
+            d0['edges'] == 10 and
+            # // 2 inner articles (all 20 links) + 20 leaves.
+            d1['edges'] == 20 + 100 and
+            d2['bytes'] == 222000
+        )
+    )
+
+
+def test_stats_from_db():
+    sink = SQLiteSink(':memory:')
+    sink.push_nodes(label='UTest', key='title', props_list=[
+        {'title': 'a', 'links': ['b', 'x'], 'content': 'ab', 'html': 'cd'},
+        {'title': 'b', 'links': ['a', 'y'], 'content': 'ef', 'html': ''},
+    ])
+    stats = plan.stats_from_db(sink, label='UTest', title_key='title',
+        links_key='links', content_key='content', html_key='html')
+    none = plan.stats_from_db(sink, label='UTestNone', title_key='title',
+        links_key='links', content_key='content', html_key='html')
+    return fmt_msg(
+        func=test_stats_from_db,
+        status=(
+            stats['samples'] == 2 and stats['mean_links'] == 2 and
+            stats['mean_bytes'] == 3 and stats['link_hit_rate'] == 0.5 and
+            none is None
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_estimate,
+    test_stats_from_db,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
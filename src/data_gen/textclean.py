@@ -0,0 +1,32 @@
+'''
+Used for cleaning up article content (as given by
+the wikipedia module) into compact plain text, e.g
+for search indexing or short previews.
+
+Impl:
+    -   clean_content: strips section headings and
+        collapses whitespace, optionally bounded.
+'''
+
+import re
+
+# // Section headings, e.g '== History =='.
+_HEADING = re.compile(r'^\s*=+[^=\n]*=+\s*$', re.MULTILINE)
+_SPACE = re.compile(r'\s+')
+
+
+def clean_content(text:str, max_chars:int=0)-> str:
+    ''' Returns <text> without section headings and with all
+        whitespace collapsed to single spaces. If <max_chars>
+        is > 0, the result is cut to at most that many chars,
+        at a word boundary where possible.
+    '''
+    text = _SPACE.sub(' ', _HEADING.sub(' ', text or '')).strip()
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # // Don't cut words in half (unless it's one huge word).
+    if text[max_chars] == ' ':
+        return cut
+    space = cut.rfind(' ')
+    return cut[:space] if space > 0 else cut
@@ -0,0 +1,186 @@
+'''
+Adaptive request throttle used by the wiki fetch layer.
+
+Instead of a static worst-case pause between requests, the
+pause is adjusted AIMD-style (additive increase of request
+rate, multiplicative decrease):
+    - Healthy calls (low latency, low error rate) shave
+      a small step off the pause, so the crawl speeds up.
+    - Transient failures (timeouts, 429/5xx, ..) multiply
+      the pause, with jitter, or use a server-provided
+      'Retry-After' value if that is larger.
+    - Sustained failures open a circuit breaker, which
+      blocks all requests for a cooldown period before a
+      single (half-open) probe is let through.
+
+Impl:
+    -   AdaptiveThrottle: throttle + circuit breaker.
+        See class docstring for more details.
+    -   CircuitOpenError: raised when the circuit has
+        tripped too many times in a row (i.e the remote
+        is considered down and waiting is pointless).
+'''
+
+import time
+import random
+
+
+class CircuitOpenError(Exception):
+    'Raised when the circuit breaker gives up.'
+
+
+class AdaptiveThrottle:
+    ''' AIMD throttle with exponential backoff and a circuit
+        breaker. Usage pattern (per request):
+            throttle.wait()
+            ... do request, time it ...
+            throttle.success(latency) or throttle.failure()
+
+        <pause> is the starting pause (seconds) between requests
+        and is kept within [<min_pause>, <max_pause>]. <step> is
+        subtracted on healthy calls and <backoff> multiplies the
+        pause on failures. A call is healthy if its latency is
+        below <target_latency> and the smoothed error rate is
+        below <max_error_rate>. After <fail_threshold> failures
+        in a row the circuit opens for <cooldown> seconds (doubled
+        for each consecutive trip); <max_trips> consecutive trips
+        without any success raises CircuitOpenError.
+    '''
+    def __init__(
+            self,
+            pause:float=1.0,
+            min_pause:float=0.1,
+            max_pause:float=60.0,
+            step:float=0.05,
+            backoff:float=2.0,
+            jitter:float=0.25,
+            target_latency:float=1.5,
+            max_error_rate:float=0.1,
+            fail_threshold:int=5,
+            cooldown:float=30.0,
+            max_trips:int=5,
+            sleep=time.sleep,
+            clock=time.monotonic
+    ):
+        self.pause = pause
+        self.min_pause = min_pause
+        self.max_pause = max_pause
+        self.step = step
+        self.backoff = backoff
+        self.jitter = jitter
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.fail_threshold = fail_threshold
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        # // Injectable for testing.
+        self.__sleep = sleep
+        self.__clock = clock
+
+        # // Exponentially weighted error rate (0..1).
+        self.error_rate = 0.0
+        # // Circuit breaker state.
+        self.__fails_in_row = 0
+        self.__trips_in_row = 0
+        self.__open_until = None
+        # // Earliest time the next request may start.
+        self.__next_at = 0.0
+        # // Simple counters, see stats().
+        self.__calls = 0
+        self.__failures = 0
+
+
+    def __clamp(self, pause:float)-> float:
+        return max(self.min_pause, min(self.max_pause, pause))
+
+
+    def wait(self)-> None:
+        ''' Blocks until the next request is allowed. If the
+            circuit is open, this sleeps out the cooldown and
+            lets the next call through as a half-open probe.
+        '''
+        now = self.__clock()
+        if self.__open_until is not None:
+            if now < self.__open_until:
+                self.__sleep(self.__open_until - now)
+                now = self.__clock()
+            # // Half-open; the next outcome decides.
+            self.__open_until = None
+
+        if now < self.__next_at:
+            self.__sleep(self.__next_at - now)
+            now = self.__clock()
+        self.__next_at = now + self.pause
+
+
+    def success(self, latency:float=0.0)-> None:
+        'Records a successful call which took <latency> sec.'
+        self.__calls += 1
+        self.__fails_in_row = 0
+        self.__trips_in_row = 0
+        self.error_rate *= 0.9
+        # // Additive increase (of rate), only when healthy.
+        healthy = (
+            latency < self.target_latency and
+            self.error_rate < self.max_error_rate
+        )
+        if healthy:
+            self.pause = self.__clamp(self.pause - self.step)
+        elif latency >= self.target_latency:
+            # // Remote is slowing down; ease off a bit.
+            self.pause = self.__clamp(self.pause + self.step)
+
+
+    def failure(self, retry_after:float=None)-> None:
+        ''' Records a transient failure. <retry_after> is an
+            optional server-provided minimum delay (seconds).
+            Raises CircuitOpenError if the breaker gives up.
+        '''
+        self.__calls += 1
+        self.__failures += 1
+        self.__fails_in_row += 1
+        self.error_rate = self.error_rate * 0.9 + 0.1
+
+        # // Multiplicative decrease (of rate), with jitter
+        # // so that parallel clients don't synchronise.
+        pause = self.pause * self.backoff
+        pause *= 1 + random.uniform(-self.jitter, self.jitter)
+        if retry_after is not None:
+            pause = max(pause, retry_after)
+        self.pause = self.__clamp(pause)
+        # // Retry-After is a hard minimum, even above max_pause.
+        delay = max(self.pause, retry_after or 0)
+        self.__next_at = self.__clock() + delay
+
+        if self.__fails_in_row < self.fail_threshold:
+            return
+
+        # // Trip the breaker.
+        self.__fails_in_row = 0
+        self.__trips_in_row += 1
+        if self.__trips_in_row > self.max_trips:
+            raise CircuitOpenError(f'''
+                Circuit breaker tripped {self.max_trips} times
+                in a row without any successful request.
+            ''')
+        cooldown = self.cooldown * 2 ** (self.__trips_in_row - 1)
+        self.__open_until = self.__clock() + max(cooldown, delay)
+
+
+    def is_open(self)-> bool:
+        'Whether the circuit breaker is currently open.'
+        return (
+            self.__open_until is not None and
+            self.__clock() < self.__open_until
+        )
+
+
+    def stats(self)-> dict:
+        'Snapshot of throttle state, meant for logging.'
+        return {
+            'pause': self.pause,
+            'error_rate': self.error_rate,
+            'calls': self.__calls,
+            'failures': self.__failures,
+            'open': self.is_open(),
+        }
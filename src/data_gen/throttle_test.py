@@ -0,0 +1,93 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.data_gen.throttle import AdaptiveThrottle
+from src.data_gen.throttle import CircuitOpenError
+
+
+class FakeClock:
+    'Stand-in for time, so tests do not sleep.'
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.now += sec
+        self.slept += sec
+
+
+def new_throttle(**kwargs):
+    fc = FakeClock()
+    t = AdaptiveThrottle(sleep=fc.sleep, clock=fc.clock, **kwargs)
+    return t, fc
+
+
+def msg_fmt(func, status, extra='')-> str:
+    'Formatter for err msg'
+    msg = f"\tstatus: {'ok' if status else 'fail'} {extra}."
+    return msg + f' (func: {func.__name__})'
+
+
+def test_speeds_up_when_healthy():
+    t, _ = new_throttle(pause=1.0, step=0.1, min_pause=0.2)
+    for _ in range(100):
+        t.wait()
+        t.success(latency=0.1)
+    return msg_fmt(
+        func=test_speeds_up_when_healthy,
+        status=abs(t.pause - 0.2) < 1e-9
+    )
+
+
+def test_backs_off_on_failure():
+    t, _ = new_throttle(pause=1.0, backoff=2.0, jitter=0.0)
+    t.wait()
+    t.failure()
+    ok = abs(t.pause - 2.0) < 1e-9
+    # // Retry-After overrides a smaller backoff.
+    t.failure(retry_after=10)
+    ok = ok and t.pause >= 10
+    return msg_fmt(func=test_backs_off_on_failure, status=ok)
+
+
+def test_circuit_opens_and_half_opens():
+    t, fc = new_throttle(
+        pause=0.1, jitter=0.0, fail_threshold=3, cooldown=30)
+    for _ in range(3):
+        t.wait()
+        t.failure()
+    ok = t.is_open()
+    # // Waiting sleeps out the cooldown.
+    before = fc.now
+    t.wait()
+    ok = ok and fc.now - before >= 30 and not t.is_open()
+    t.success(latency=0.1)
+    return msg_fmt(func=test_circuit_opens_and_half_opens, status=ok)
+
+
+def test_circuit_gives_up():
+    t, _ = new_throttle(fail_threshold=1, max_trips=2, jitter=0.0)
+    try:
+        for _ in range(10):
+            t.wait()
+            t.failure()
+    except CircuitOpenError:
+        return msg_fmt(func=test_circuit_gives_up, status=True)
+    return msg_fmt(func=test_circuit_gives_up, status=False)
+
+
+# ------------------test all------------------ #
+tests = [
+    test_speeds_up_when_healthy,
+    test_backs_off_on_failure,
+    test_circuit_opens_and_half_opens,
+    test_circuit_gives_up,
+]
+
+for t in tests:
+    print(t())
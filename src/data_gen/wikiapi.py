@@ -5,17 +5,24 @@ wikipedia python module.
     - pull_articles():  Fetches data from wiki, using
                         a list of article names, and
                         returns a list of ArticleData
+    - pull_raw():       Like pull_articles, but only
+                        fetches html (one call less per
+                        article); see data_gen/parse.py
 
+All API calls go through an adaptive throttle (see
+src/data_gen/throttle.py) which is shared on mod lvl.
 '''
 
 
 import time
+import requests
 import wikipedia
 # // Convenience.
 from wikipedia.wikipedia import WikipediaPage
 #
 # // What this module should ultimately generate.
 from src.typehelpers import ArticleData
+from src.data_gen.throttle import AdaptiveThrottle
 
 # !! NOTE: Due to vague documentation of <wikipedia>,
 # !! some notes are added in this comment block.
@@ -29,10 +36,82 @@ from src.typehelpers import ArticleData
 
 # // Used for pausing API requests to avoid spamming.
 # // Relying on this more than the wikipedia (mod)
-# // ratelimit setting.
+# // ratelimit setting. This is the starting pause;
+# // THROTTLE adapts it at runtime.
 API_PAUSE_SEC = 1
+# // How many times a single API call is retried on
+# // transient errors before the article is skipped.
+API_RETRIES = 3
 
+# // Shared by all API calls in this module.
+THROTTLE = AdaptiveThrottle(pause=API_PAUSE_SEC)
 
+# // HTTP statuses which are worth retrying.
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def __transient(e:Exception): # // -> (bool, float|None)
+    ''' Classifies <e>. Returns whether it is a transient
+        error (worth retrying) and an optional Retry-After
+        value (sec) if the server provided one.
+    '''
+    # // Errors raised by <requests>. The wikipedia mod
+    # // doesn't call raise_for_status(), but keep this
+    # // in case it (or a fork) does.
+    resp = getattr(e, 'response', None)
+    if resp is not None:
+        if resp.status_code not in _RETRY_STATUS:
+            return False, None
+        retry_after = resp.headers.get('Retry-After')
+        try:
+            return True, float(retry_after)
+        except (TypeError, ValueError):
+            return True, None
+
+    # // The wikipedia mod doesn't expose responses, and
+    # // fails when decoding 429/5xx pages (html) as json.
+    # // Only those count; other decode or value errors are
+    # // bad data or bugs, which retrying won't fix.
+    if isinstance(e, ValueError):
+        doc = getattr(e, 'doc', None)
+        return isinstance(doc, str) and doc.lstrip().startswith('<'), None
+
+    transient = (
+        requests.exceptions.Timeout,
+        requests.exceptions.ConnectionError,
+        wikipedia.exceptions.HTTPTimeoutError,
+    )
+    return isinstance(e, transient), None
+
+
+def __call(func, *args, **kwargs):
+    ''' Calls <func> through THROTTLE, retrying transient
+        errors up to API_RETRIES times. Non-transient errors
+        (including wikipedia lookup errors) are re-raised.
+    '''
+    for attempt in range(API_RETRIES + 1):
+        THROTTLE.wait()
+        start = time.monotonic()
+        try:
+            res = func(*args, **kwargs)
+        # // Lookup errors are answers, not failures.
+        except (wikipedia.exceptions.DisambiguationError,
+                wikipedia.exceptions.PageError):
+            THROTTLE.success(time.monotonic() - start)
+            raise
+        except Exception as e:
+            transient, retry_after = __transient(e)
+            if not transient:
+                raise
+            # // Recorded before giving up too, so the last
+            # // failure counts. Can raise CircuitOpenError,
+            # // intended.
+            THROTTLE.failure(retry_after=retry_after)
+            if attempt == API_RETRIES:
+                raise
+            continue
+        THROTTLE.success(time.monotonic() - start)
+        return res
 
 
 def __pull(title:str, ttl=5)-> WikipediaPage:
@@ -45,15 +124,19 @@ def __pull(title:str, ttl=5)-> WikipediaPage:
     if ttl <= 0:
         return None
     try:
-        # // Impose voluntary hard rate-limit.
-        time.sleep(API_PAUSE_SEC)
-        return wikipedia.page(title, auto_suggest=False)
+        return __call(wikipedia.page, title, auto_suggest=False)
     except wikipedia.exceptions.DisambiguationError as e:
         opt = e.options # // Brevity.
         # // Recursive attempt.
         return __pull(title=opt[0], ttl=ttl-1) if opt else None
     except wikipedia.exceptions.PageError as e:
         return None
+    except wikipedia.exceptions.WikipediaException as e:
+        return None
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # // Retries exhausted; skip article instead of
+        # // killing the whole run.
+        return None
 
 
 
@@ -73,13 +156,20 @@ def pull_articles(titles:list, subsearch:int=0): # // -> Gen
         if not data:
             continue
 
-        article_data = ArticleData(
-            title=title,
-            url=data.url,
-            content=data.content,
-            links=data.links,
-            html=data.html()
-        )
+        # // Props below are lazy and cause more API
+        # // requests, so they are throttled as well.
+        try:
+            article_data = ArticleData(
+                title=title,
+                url=data.url,
+                content=__call(lambda: data.content),
+                links=__call(lambda: data.links),
+                html=__call(data.html)
+            )
+        except (wikipedia.exceptions.WikipediaException,
+                requests.exceptions.RequestException,
+                ValueError) as e:
+            continue
 
         yield article_data
         
@@ -88,3 +178,33 @@ def pull_articles(titles:list, subsearch:int=0): # // -> Gen
                 titles=data.links,
                 subsearch=subsearch-1
             )
+
+
+def pull_raw(titles:list, subsearch:int=0): # // -> Gen
+    ''' Like pull_articles, but yields raw (title, url, html)
+        tuples; content & links are left to be parsed from
+        the html (see data_gen/parse.py), which saves the two
+        API calls pull_articles makes for them. Links are
+        only fetched (from the API) for <subsearch> > 0.
+    '''
+    for title in titles:
+        data = __pull(title=title)
+        # // Negate empty yield.
+        if not data:
+            continue
+        # // See pull_articles.
+        try:
+            html = __call(data.html)
+            links = __call(lambda: data.links) if subsearch > 0 else []
+        except (wikipedia.exceptions.WikipediaException,
+                requests.exceptions.RequestException,
+                ValueError) as e:
+            continue
+
+        yield title, data.url, html
+
+        if subsearch > 0:
+            yield from pull_raw(
+                titles=links,
+                subsearch=subsearch-1
+            )
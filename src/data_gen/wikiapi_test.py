@@ -4,8 +4,11 @@ import sys
 sys.path.append('../../')
 
 import os
+import json
+import requests
 from src.data_gen import wikiapi
 from src.data_gen import titles
+from src.data_gen.throttle import AdaptiveThrottle
 
 
 # // Sime to check basic usage
@@ -138,8 +141,49 @@ def test_recursive_pull_articles():
             extra='Empty generator.'
         )
 
+def test_retries_recorded():
+    # // Abbreviation.
+    f = test_retries_recorded
+    # // Offline; a fast throttle which never trips.
+    wikiapi.THROTTLE = AdaptiveThrottle(
+        pause=0.001, min_pause=0.0, max_pause=0.002, fail_threshold=100)
+    calls = []
+
+    def failing(exc):
+        def func():
+            calls.append(exc)
+            raise exc
+        return func
+
+    def run(exc):
+        calls.clear()
+        try:
+            wikiapi.__call(failing(exc))
+        except type(exc):
+            pass
+        return len(calls)
+
+    timeouts = run(requests.exceptions.Timeout())
+    # // All attempts count, including the last one.
+    failures = wikiapi.THROTTLE.stats()['failures']
+    html = run(json.JSONDecodeError('x', '<html>503</html>', 0))
+    bad_json = run(json.JSONDecodeError('x', '{"a": ', 6))
+    bug = run(ValueError('not a request error'))
+    ok = (
+        timeouts == wikiapi.API_RETRIES + 1 and
+        failures == wikiapi.API_RETRIES + 1 and
+        html == wikiapi.API_RETRIES + 1 and
+        bad_json == 1 and bug == 1
+    )
+    return msg_fmt(
+        func=f,
+        status=ok,
+        extra=f'Calls: {timeouts}, {html}, {bad_json}, {bug}'
+    )
+
 # ------------------test all------------------ # 
 tests = [
+    test_retries_recorded,
     test_simple_pull_articles,
     test_realistic_pull_articles,
     test_recursive_pull_articles
@@ -1,5 +1,9 @@
-# // Only used for typehinting in this module.
-from src.neo4j_tools.comm import Neo4jComm
+import tempfile
+from contextlib import contextmanager
+
+from src.sinks.base import GraphSink
+from src.neo4j_tools.buffer import WriteBuffer
+from src.snapshot.titledict import TitleDict
 # // Namings
 import src.typehelpers as typehelpers
 
@@ -12,55 +16,122 @@ titles T representing hyperlinks in N,
 then connect (N)-[HYPERLINKS]->(all in T)
 '''
 
-def link(n4jcomm:Neo4jComm, title_key:str, hlink_key:str):
+def aliases_of(n4jcomm:GraphSink, title_key:str, alias_key:str)-> dict:
+    'Maps alias titles (in prop <alias_key>) to node titles.'
+    return {
+        alias: title
+        for title, aliases in n4jcomm.pull_props(
+            label=typehelpers.db_spec_wikidata_label,
+            props=[title_key, alias_key])
+        for alias in aliases or []
+    }
+
+
+@contextmanager
+def title_dict(n4jcomm:GraphSink, title_key:str, path:str=None):
+    ''' Titles of all WikiData nodes as a TitleDict, streamed in
+        order from <n4jcomm> (see GraphSink.pull_sorted_prop)
+        into dir <path> (a temp dir if None), then memory-mapped
+        from there; closed on exit. Files are those of a
+        snapshot dir (see snapshot/titledict.py).
+    '''
+    with tempfile.TemporaryDirectory() as tmp:
+        titles = TitleDict.from_sorted(n4jcomm.pull_sorted_prop(
+            label=typehelpers.db_spec_wikidata_label, prop=title_key),
+            path=path or tmp)
+        try:
+            yield titles
+        finally:
+            titles.close()
+
+
+def unlinked(n4jcomm:GraphSink, title_key:str, hlink_key:str,
+                alias_key:str=None, titles_path:str=None)-> list:
+    ''' Titles of WikiData nodes which have hyperlinks (in
+        <hlink_key>) to other stored nodes (or their aliases),
+        but no HYPERLINKS relationships at all; i.e nodes which
+        weren't linked (yet). Empty once link() (or pagelinks)
+        has been run. <titles_path>, see title_dict.
+    '''
+    label = typehelpers.db_spec_wikidata_label
+    aliases = aliases_of(n4jcomm, title_key, alias_key) if alias_key else {}
+    # // Edges aren't sorted by source, so this one is built
+    # // in memory.
+    linked = TitleDict.from_titles(v for v, _ in n4jcomm.pull_edges(
+        v_label=label, w_label=label,
+        e_label=typehelpers.db_spec_wikidata_link, key=title_key))
+    res = []
+    with title_dict(n4jcomm, title_key, titles_path) as titles:
+        for title, hlinks in n4jcomm.pull_props(
+                label=label, props=[title_key, hlink_key]):
+            if not hlinks or title in linked:
+                continue
+            hlinks = [aliases.get(t, t) for t in hlinks]
+            if any(known and t != title for t, known in
+                    zip(hlinks, titles.contains(hlinks))):
+                res.append(title)
+    linked.close()
+    return res
+
+
+def link(n4jcomm:GraphSink, title_key:str, hlink_key:str,
+                    batch_size:int=500, alias_key:str=None,
+                    titles_path:str=None):
     ''' Linker strategy for linking WikiData V to other
         WikiData W if W.<title_key> is in V.<hlink_key>.
-        Relationship is (V)-[HYPERLINKS]->(W).
+        Relationship is (V)-[HYPERLINKS]->(W). Relationships
+        are written in batches of <batch_size>, repeats
+        (e.g duplicate hyperlinks) are only written once.
+        With <alias_key>, hyperlinks to any of the titles
+        listed in W.<alias_key> (see data_gen/dedup.py)
+        are linked to W as well. The title dict of all
+        WikiData nodes is kept in dir <titles_path> (a temp
+        dir if None), see title_dict.
     '''
-    assert type(n4jcomm) is Neo4jComm, '''
+    assert isinstance(n4jcomm, GraphSink), '''
         Tried linking(hyperlinks) but did not get a valid
-        neo4j comminication object <n4jcomm>.
+        graph comminication object <n4jcomm> (see
+        src/sinks/base.py).
     '''
-    # // Get titles of all WikiData nodes.
-    titles = n4jcomm.pull_node_prop(
-        label=typehelpers.db_spec_wikidata_label,
-        props={},
-        prop=title_key
-    )
-    
-    # // [1] Set for quick searches of titles.
-    # // Useful because a potential (a)->(b) 
-    # // relationship can be cancelled before, 
-    # // it reaches the DB.
-    titles = set(titles)
-
-    for title in titles:
-        # // Get all hyperlinks.
-        hlinks = n4jcomm.pull_node_prop(
-            label=typehelpers.db_spec_wikidata_label,
-            props={title_key:title},
-            prop=hlink_key
-        )
-        # // The property is a list, and every
-        # // WikiData node has only one hyperlink
-        # // list.
-        hlinks = hlinks[0]
-        # // Link current node with <title> as title
-        # // to any other node which has <title_other>
-        # // as title.
-        for title_other in hlinks:
-            if title == title_other:
-                continue
+    aliases = aliases_of(n4jcomm, title_key, alias_key) if alias_key else {}
+    buf = WriteBuffer(n4jcomm=n4jcomm, batch_size=batch_size)
 
-            # // Quick drop, explained further up [1].
-            if title_other not in titles:
-                continue
-            
-            n4jcomm.push_rel(
-                v_label=typehelpers.db_spec_wikidata_label,
-                w_label=typehelpers.db_spec_wikidata_label,
-                e_label=typehelpers.db_spec_wikidata_link,
-                v_props={title_key:title},
-                w_props={title_key:title_other},
-                e_props={}
+    # // [1] Title dict (of all WikiData nodes) for quick
+    # // searches of titles. Useful because a potential
+    # // (a)->(b) relationship can be cancelled before,
+    # // it reaches the DB. Compact, unlike a set, and
+    # // memory-mapped (see snapshot/titledict.py).
+    with title_dict(n4jcomm, title_key, titles_path) as titles:
+        for title in titles:
+            # // Get all hyperlinks.
+            hlinks = n4jcomm.pull_node_prop(
+                label=typehelpers.db_spec_wikidata_label,
+                props={title_key:title},
+                prop=hlink_key
             )
+            # // The property is a list, and every
+            # // WikiData node has only one hyperlink
+            # // list (None if compacted, see -compact).
+            hlinks = hlinks[0] or []
+            # // Link current node with <title> as title
+            # // to any other node which has <title_other>
+            # // as title.
+            hlinks = [aliases.get(t, t) for t in hlinks]
+            for title_other, known in zip(hlinks, titles.contains(hlinks)):
+                if title == title_other:
+                    continue
+
+                # // Quick drop, explained further up [1].
+                if not known:
+                    continue
+
+                buf.push_rel(
+                    v_label=typehelpers.db_spec_wikidata_label,
+                    w_label=typehelpers.db_spec_wikidata_label,
+                    e_label=typehelpers.db_spec_wikidata_link,
+                    key=title_key,
+                    v=title,
+                    w=title_other
+                )
+    # // Remainder.
+    buf.flush()
@@ -0,0 +1,112 @@
+from src.sinks.base import GraphSink
+from src.neo4j_tools.buffer import WriteBuffer
+from src.data_gen.dumps import iter_pages
+from src.data_gen.dumps import iter_pagelinks
+from src.data_gen.dumps import iter_linktargets
+from src.data_gen.dumps import PageIdMap
+from src.linking.hyperlinks.linker import aliases_of
+from src.linking.hyperlinks.linker import title_dict
+# // Namings
+import src.typehelpers as typehelpers
+
+'''
+Module containing a linker function which links
+wiki nodes in Neo4j by hyperlinks, like the one in
+linking/hyperlinks, but reads the links from the
+Wikipedia page & pagelinks (and for dumps from 2024 on,
+linktarget) SQL dumps instead of
+the 'links' prop (i.e no API calls are needed).
+
+Specifically; For all wiki nodes N, find titles T
+of pages which N links to according to the dumps,
+then connect (N)-[HYPERLINKS]->(all in T which
+are wiki nodes)
+'''
+
+
+def link(n4jcomm:GraphSink, title_key:str, page_path:str,
+            pagelinks_path:str, batch_size:int=500,
+            progress=None, alias_key:str=None,
+            titles_path:str=None, linktarget_path:str=None)-> int:
+    ''' Linker strategy for linking WikiData V to other
+        WikiData W if the pagelinks dump has a link from V
+        to W. Dumps are streamed (see data_gen/dumps.py);
+        memory is bounded by titles of wiki nodes plus 8
+        bytes per mapped page (and link target) id (titles
+        are kept in a TitleDict, memory-mapped from dir
+        <titles_path>, see hyperlinks/linker.py title_dict).
+        Relationships are written in batches of <batch_size>. <progress> is an
+        optional func, called as progress(<links read>,
+        <edges found>) every 1M links. Returns edges found.
+        With <alias_key>, alias titles (see data_gen/dedup.py)
+        count as their node, both as source and target.
+        Pagelinks dumps from 2024 on need <linktarget_path>,
+        the path of the linktarget dump (see data_gen/dumps.py).
+    '''
+    assert isinstance(n4jcomm, GraphSink), '''
+        Tried linking(pagelinks) but did not get a valid
+        graph comminication object <n4jcomm> (see
+        src/sinks/base.py).
+    '''
+    # // Only titles of existing wiki nodes are of interest;
+    # // both ends of every edge have to be one of these.
+    with title_dict(n4jcomm, title_key, titles_path) as titles:
+        # // Alias title -> id of its node; few, so a dict.
+        aliases = {}
+        if alias_key:
+            for alias, title in aliases_of(
+                    n4jcomm, title_key, alias_key).items():
+                if alias not in titles:
+                    aliases[alias] = titles.id(title)
+
+        def index(title:str): # -> int or None
+            i = titles.id(title)
+            return aliases.get(title) if i is None else i
+
+        # // page_id -> id of title, for wiki nodes only.
+        ids = PageIdMap(
+            (page_id, i)
+            for page_id, i in (
+                (page_id, index(title))
+                for page_id, title in iter_pages(page_path))
+            if i is not None
+        )
+        # // lt_id -> id of title, likewise; only read for the
+        # // linktarget schema.
+        targets = None
+        if linktarget_path:
+            targets = PageIdMap(
+                (lt_id, i)
+                for lt_id, i in (
+                    (lt_id, index(title))
+                    for lt_id, title in iter_linktargets(linktarget_path))
+                if i is not None
+            )
+
+        buf = WriteBuffer(n4jcomm=n4jcomm, batch_size=batch_size)
+        read = found = 0
+        for page_id, to in iter_pagelinks(pagelinks_path, targets):
+            read += 1
+            if progress and read % 1000000 == 0:
+                progress(read, found)
+            # // <to> is a title, or (through <targets>) an id.
+            w = index(to) if targets is None else to
+            if w is None:
+                continue
+            v = ids.get(page_id)
+            if v is None or v == w:
+                continue
+            found += 1
+            buf.push_rel(
+                v_label=typehelpers.db_spec_wikidata_label,
+                w_label=typehelpers.db_spec_wikidata_label,
+                e_label=typehelpers.db_spec_wikidata_link,
+                key=title_key,
+                v=titles.title(v),
+                w=titles.title(w)
+            )
+        # // Remainder.
+        buf.flush()
+    if progress:
+        progress(read, found)
+    return found
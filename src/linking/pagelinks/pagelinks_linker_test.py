@@ -0,0 +1,145 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../../')
+
+import os
+import gzip
+import tempfile
+
+from src.linking.pagelinks.linker import link
+from src.sinks.sqlite import SQLiteSink
+# // Namings
+import src.typehelpers as typehelpers
+
+# !! This test doesn't need Neo4j; links are written to
+# !! an in-memory SQLite sink. Dumps are small stand-ins
+# !! with the same format as the mysqldump files (see
+# !! data_gen/dumps_test.py).
+
+PAGE_SQL = '''-- MySQL dump
+INSERT INTO `page` VALUES (1,0,'Last_Thursdayism','',0,0,0.1,'2020',NULL,1,2,'wikitext',NULL),(2,0,'Omphalos_(theology)','',0,0,0.2,'2020',NULL,1,2,'wikitext',NULL),(3,1,'Talk:Last_Thursdayism','',0,0,0.3,'2020',NULL,1,2,'wikitext',NULL);
+INSERT INTO `page` VALUES (4,0,'It\\'s,_a_(test)','',0,0,0.1,'2020',NULL,1,2,'wikitext',NULL),(5,0,'Not_stored','',0,0,0.1,'2020',NULL,1,2,'wikitext',NULL);
+'''
+
+# // Self links, links to/from pages which aren't stored
+# // and other namespaces are dropped (the latter aren't
+# // even read, so 6 links are read).
+PAGELINKS_SQL = '''INSERT INTO `pagelinks` VALUES (1,0,'Omphalos_(theology)',0),(1,0,'Missing',0),(1,0,'Last_Thursdayism',0),(2,0,'Last_Thursdayism',0);
+INSERT INTO `pagelinks` VALUES (4,0,'Last_Thursdayism',0),(3,0,'Omphalos_(theology)',1),(5,0,'Last_Thursdayism',0),(4,2,'Omphalos_(theology)',0);
+'''
+
+# // Same links as PAGELINKS_SQL, in the 2024+ schema (targets
+# // through linktarget; 'Missing' has no linktarget row).
+PAGELINKS_LT_SQL = '''INSERT INTO `pagelinks` VALUES (1,0,2),(1,0,9),(1,0,1),(2,0,1);
+INSERT INTO `pagelinks` VALUES (4,0,1),(3,1,2),(5,0,1),(4,2,3);
+'''
+
+LINKTARGET_SQL = '''INSERT INTO `linktarget` VALUES (1,0,'Last_Thursdayism'),(2,0,'Omphalos_(theology)'),(3,0,'It\\'s,_a_(test)');
+'''
+
+LABEL = typehelpers.db_spec_wikidata_label
+LINK = typehelpers.db_spec_wikidata_link
+
+
+def write_dump(name:str, text:str)-> str:
+    path = os.path.join(tempfile.mkdtemp(), name)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def linked(nodes:list, pagelinks:str=PAGELINKS_SQL,
+                **kwargs): # -> (int, set)
+    'Runs link on a sink with <nodes>; (found, edges).'
+    sink = SQLiteSink(':memory:')
+    sink.push_nodes(label=LABEL, key='title', props_list=nodes)
+    found = link(
+        n4jcomm=sink,
+        title_key='title',
+        page_path=write_dump('page.sql.gz', PAGE_SQL),
+        pagelinks_path=write_dump('pl.sql.gz', pagelinks),
+        batch_size=2,
+        **kwargs
+    )
+    return found, set(sink.pull_edges(
+        v_label=LABEL, w_label=LABEL, e_label=LINK, key='title'))
+
+
+def test_link():
+    progress = []
+    found, edges = linked([
+        {'title': 'Last Thursdayism'},
+        {'title': 'Omphalos (theology)'},
+        {'title': "It's, a (test)"},
+    ], progress=lambda *p: progress.append(p))
+    return fmt_msg(
+        func=test_link,
+        status=(
+            found == 3 and progress == [(6, 3)] and
+            edges == {
+                ('Last Thursdayism', 'Omphalos (theology)'),
+                ('Omphalos (theology)', 'Last Thursdayism'),
+                ("It's, a (test)", 'Last Thursdayism'),
+            }
+        )
+    )
+
+
+def test_link_aliases():
+    # // Page 'Omphalos (theology)' is stored as 'Omphalos'.
+    found, edges = linked([
+        {'title': 'Last Thursdayism', 'aliases': []},
+        {'title': 'Omphalos', 'aliases': ['Omphalos (theology)']},
+        {'title': "It's, a (test)", 'aliases': []},
+    ], alias_key='aliases')
+    return fmt_msg(
+        func=test_link_aliases,
+        status=(
+            found == 3 and
+            edges == {
+                ('Last Thursdayism', 'Omphalos'),
+                ('Omphalos', 'Last Thursdayism'),
+                ("It's, a (test)", 'Last Thursdayism'),
+            }
+        )
+    )
+
+
+def test_link_linktarget():
+    found, edges = linked([
+        {'title': 'Last Thursdayism', 'aliases': []},
+        {'title': 'Omphalos', 'aliases': ['Omphalos (theology)']},
+        {'title': "It's, a (test)", 'aliases': []},
+    ], pagelinks=PAGELINKS_LT_SQL, alias_key='aliases',
+        linktarget_path=write_dump('lt.sql.gz', LINKTARGET_SQL))
+    return fmt_msg(
+        func=test_link_linktarget,
+        status=(
+            found == 3 and
+            edges == {
+                ('Last Thursdayism', 'Omphalos'),
+                ('Omphalos', 'Last Thursdayism'),
+                ("It's, a (test)", 'Last Thursdayism'),
+            }
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_link,
+    test_link_aliases,
+    test_link_linktarget,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
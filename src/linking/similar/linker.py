@@ -0,0 +1,147 @@
+from src.sinks.base import GraphSink
+from src.neo4j_tools.buffer import WriteBuffer
+# // Namings
+import src.typehelpers as typehelpers
+
+import re
+import math
+from array import array
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+
+'''
+Module containing a linker function which links
+wiki nodes in Neo4j by textual similarity.
+
+Specifically; For all wiki nodes N, find the <k>
+nodes M with the highest TF-IDF cosine similarity
+to N, then connect (N)-[SIMILAR {score}]->(all in M)
+
+Needs numpy & scipy; runs on CPU only. Memory is
+bounded by the sparse TF-IDF matrix plus one dense
+block of similarities (<block_cells> floats).
+'''
+
+# // Tokens are lowercase alphanumeric runs.
+_TOKEN = re.compile(r'[a-z0-9]{2,}')
+
+
+def _tfidf(docs, min_df:int, max_df:float): # -> csr_matrix
+    ''' Builds an L2-normalised TF-IDF matrix (docs x terms)
+        from the iterable of strings <docs>, streaming; only
+        the sparse triplets are kept, never the texts. Terms
+        in fewer than <min_df> docs, or more than a <max_df>
+        fraction of docs, are dropped.
+    '''
+    vocab = {}
+    indptr, indices, data = array('q', [0]), array('i'), array('f')
+    for doc in docs:
+        counts = Counter(
+            vocab.setdefault(tok, len(vocab))
+            for tok in _TOKEN.findall((doc or '').lower())
+        )
+        for term, count in counts.items():
+            indices.append(term)
+            # // Sublinear tf.
+            data.append(1 + math.log(count))
+        indptr.append(len(indices))
+
+    n_docs, n_terms = len(indptr) - 1, len(vocab)
+    del vocab
+    x = sp.csr_matrix(
+        (
+            np.frombuffer(data, dtype=np.float32),
+            np.frombuffer(indices, dtype=np.int32),
+            np.frombuffer(indptr, dtype=np.int64)
+        ),
+        shape=(n_docs, n_terms)
+    )
+    df = np.bincount(x.indices, minlength=n_terms)
+    keep = (df >= min_df) & (df <= max_df * n_docs)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    x = x @ sp.diags(np.where(keep, idf, 0).astype(np.float32))
+    x.eliminate_zeros()
+
+    norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sp.diags(1 / norms).astype(np.float32) @ x
+
+
+def _topk(x, k:int, min_score:float, block_cells:int): # -> gen
+    ''' Yields (row, [(col, score), ..]) with the <k> most
+        similar rows of <x> (L2-normalised) for every row,
+        computed in blocks of rows such that a dense block
+        of similarities has at most <block_cells> cells.
+    '''
+    n = x.shape[0]
+    xt = x.T.tocsr()
+    block = max(1, block_cells // max(n, 1))
+    k = min(k, n - 1)
+    if k <= 0:
+        return
+    for start in range(0, n, block):
+        stop = min(n, start + block)
+        sims = (x[start:stop] @ xt).toarray()
+        # // Exclude self-similarity.
+        rows = np.arange(stop - start)
+        sims[rows, rows + start] = -1
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        for i in rows:
+            yield start + int(i), [
+                (int(j), float(s))
+                for j, s in zip(top[i], scores[i])
+                if s > min_score
+            ]
+
+
+def link(n4jcomm:GraphSink, title_key:str, content_key:str,
+            k:int=10, min_score:float=0.05, min_df:int=2,
+            max_df:float=0.5, block_cells:int=2**25,
+            batch_size:int=500):
+    ''' Linker strategy for linking WikiData V to the <k>
+        WikiData W which are most similar to V, by cosine
+        similarity of TF-IDF vectors of <content_key>, and
+        above <min_score>. Relationship is
+        (V)-[SIMILAR {score}]->(W), written in batches of
+        <batch_size>. See _tfidf and _topk for the rest.
+
+        NOTE: Existing SIMILAR relationships are updated but
+        not removed, so clear them first when rebuilding.
+    '''
+    assert isinstance(n4jcomm, GraphSink), '''
+        Tried linking(similar) but did not get a valid
+        graph comminication object <n4jcomm> (see
+        src/sinks/base.py).
+    '''
+    titles = []
+
+    def docs():
+        for title, content in n4jcomm.pull_props(
+                label=typehelpers.db_spec_wikidata_label,
+                props=[title_key, content_key]):
+            titles.append(title)
+            yield content
+
+    x = _tfidf(docs(), min_df=min_df, max_df=max_df)
+
+    buf = WriteBuffer(n4jcomm=n4jcomm, batch_size=batch_size)
+    for i, similar in _topk(x, k=k, min_score=min_score,
+                                    block_cells=block_cells):
+        for j, score in similar:
+            buf.push_rel(
+                v_label=typehelpers.db_spec_wikidata_label,
+                w_label=typehelpers.db_spec_wikidata_label,
+                e_label=typehelpers.db_spec_wikidata_similar,
+                key=title_key,
+                v=titles[i],
+                w=titles[j],
+                e_props={'score': score}
+            )
+    # // Remainder.
+    buf.flush()
@@ -0,0 +1,103 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../../')
+
+import math
+
+import numpy as np
+
+from src.linking.similar.linker import _tfidf
+from src.linking.similar.linker import _topk
+
+# !! This test doesn't need Neo4j; only the numeric
+# !! parts of the linker are tested.
+
+# // 'the' is in half of the docs, so max_df=0.4 drops it
+# // and docs 0 & 2 share nothing. Doc 5 has no terms.
+DOCS = [
+    'the cat dog',
+    'the cat dog fish',
+    'the car bus',
+    'car bus train',
+    'zebra',
+    None,
+]
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def idf(df:int)-> float:
+    'Smoothed idf, as in _tfidf, for the 6 docs of DOCS.'
+    return math.log((1 + len(DOCS)) / (1 + df)) + 1
+
+
+def test_tfidf():
+    x = _tfidf(iter(DOCS), min_df=1, max_df=0.4)
+    norms = np.sqrt(np.asarray(x.multiply(x).sum(axis=1)).ravel())
+    sims = (x @ x.T).toarray()
+    # // Docs 0 & 1; cat & dog (df 2) shared, fish (df 1) not.
+    i2, i1 = idf(2), idf(1)
+    expected = 2 * i2 ** 2 / (
+        math.sqrt(2) * i2 * math.sqrt(2 * i2 ** 2 + i1 ** 2))
+    return fmt_msg(
+        func=test_tfidf,
+        status=(
+            x.shape == (6, 8) and
+            np.allclose(norms, [1, 1, 1, 1, 1, 0], atol=1e-6) and
+            math.isclose(sims[0, 1], expected, rel_tol=1e-5) and
+            sims[0, 2] == 0 and sims[4, :4].sum() == 0
+        )
+    )
+
+
+def test_topk():
+    x = _tfidf(iter(DOCS), min_df=1, max_df=0.4)
+    sims = (x @ x.T).toarray()
+    # // One row per block.
+    res = dict(_topk(x, k=2, min_score=0.0, block_cells=len(DOCS)))
+    ok = sorted(res) == list(range(len(DOCS)))
+    for i, top in res.items():
+        scores = [s for _, s in top]
+        ok = (
+            ok and
+            # // Best first, no self links, scores as computed.
+            scores == sorted(scores, reverse=True) and
+            all(j != i for j, _ in top) and
+            all(math.isclose(s, sims[i, j], rel_tol=1e-5) for j, s in top)
+        )
+    return fmt_msg(
+        func=test_topk,
+        status=(
+            ok and
+            res[0][0][0] == 1 and res[1][0][0] == 0 and
+            res[2][0][0] == 3 and res[3][0][0] == 2 and
+            # // Nothing in common; nothing above min_score.
+            len(res[0]) == 1 and res[4] == [] and res[5] == []
+        )
+    )
+
+
+def test_topk_small():
+    x = _tfidf(iter(['cat dog']), min_df=1, max_df=1.0)
+    return fmt_msg(
+        func=test_topk_small,
+        status=list(_topk(x, k=5, min_score=0.0, block_cells=10)) == []
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_tfidf,
+    test_topk,
+    test_topk_small,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
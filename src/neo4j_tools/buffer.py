@@ -0,0 +1,177 @@
+'''
+Write-behind buffer which sits in front of Neo4jComm
+(or anything with the same push_nodes/push_rels methods).
+
+Writes are held back and coalesced by key before they
+are flushed in batches:
+    - Nodes are keyed by (label, props[key]); a later
+      write of the same node replaces the pending one.
+    - Edges are keyed by (labels, v key, w key); likewise.
+    - Writes which are identical to what was last flushed
+      for the same key (with nothing pending for it) are
+      dropped entirely. Identity is
+      remembered for the <window> most recent keys only,
+      so memory stays bounded on long runs.
+
+Impl:
+    -   WriteBuffer: see class docstring.
+'''
+
+import hashlib
+from collections import OrderedDict
+
+
+def _digest(obj)-> bytes:
+    ''' Compact fingerprint of a (json-like) obj, used for
+        detecting exact repeats without keeping the whole
+        payload (e.g article html) in memory.
+    '''
+    if isinstance(obj, dict):
+        obj = sorted(obj.items())
+    return hashlib.blake2b(repr(obj).encode(), digest_size=16).digest()
+
+
+class WriteBuffer:
+    ''' Coalescing write-behind buffer. <n4jcomm> is the target;
+        pending nodes (edges) are flushed with push_nodes
+        (push_rels) once <batch_size> of them have accumulated
+        for the same label(s), and on flush(). <window> is how
+        many flushed keys are remembered for dropping repeats.
+
+        If <link> is given (a dict with the e_label, p_label,
+        p_e_label and hlink_key args of push_nodes_linked),
+        nodes are flushed with push_nodes_linked instead.
+
+        NOTE: Call flush() when done, or pending writes are lost.
+    '''
+    def __init__(self, n4jcomm, batch_size:int=50,
+                    window:int=100000, link:dict=None):
+        self.n4jcomm = n4jcomm
+        self.batch_size = batch_size
+        self.window = window
+        self.link = link
+        # // (label, key) -> {key val: props}
+        self.__nodes = {}
+        # // (v_label, w_label, e_label, key) -> {(v, w): e_props}
+        self.__rels = {}
+        # // Recently flushed; identity key -> digest.
+        self.__seen = OrderedDict()
+        self.__counts = {
+            'node_writes': 0, 'node_flushed': 0,
+            'rel_writes': 0, 'rel_flushed': 0,
+            'dropped': 0, 'coalesced': 0,
+        }
+
+
+    def __is_repeat(self, ident:tuple, digest:bytes)-> bool:
+        'Whether <ident> was last flushed with <digest>.'
+        if self.__seen.get(ident) != digest:
+            return False
+        self.__seen.move_to_end(ident)
+        return True
+
+
+    def __remember(self, ident:tuple, digest:bytes)-> None:
+        self.__seen[ident] = digest
+        self.__seen.move_to_end(ident)
+        while len(self.__seen) > self.window:
+            self.__seen.popitem(last=False)
+
+
+    def push_node(self, label:str, props:dict, key:str)-> None:
+        ''' Buffers a node write with <label> and <props>, where
+            props[<key>] identifies the node (see push_nodes).
+        '''
+        self.__counts['node_writes'] += 1
+        group = (label, key)
+        ident = (label, key, props[key])
+        pending = self.__nodes.setdefault(group, {})
+        # // A pending (other) version has to be replaced, even
+        # // if this one equals what was flushed before it.
+        if props[key] in pending:
+            self.__counts['coalesced'] += 1
+        elif self.__is_repeat(ident, _digest(props)):
+            self.__counts['dropped'] += 1
+            return
+        pending[props[key]] = props
+        if len(pending) >= self.batch_size:
+            self.__flush_nodes(group)
+
+
+    def push_rel(self, v_label:str, w_label:str, e_label:str,
+                    key:str, v, w, e_props:dict=None)-> None:
+        ''' Buffers an edge write (v)-[<e_label>]->(w), where <v>
+            and <w> are the vals of property <key> (see push_rels).
+        '''
+        self.__counts['rel_writes'] += 1
+        e_props = e_props or {}
+        group = (v_label, w_label, e_label, key)
+        ident = group + (v, w)
+        pending = self.__rels.setdefault(group, {})
+        # // See push_node.
+        if (v, w) in pending:
+            self.__counts['coalesced'] += 1
+        elif self.__is_repeat(ident, _digest(e_props)):
+            self.__counts['dropped'] += 1
+            return
+        pending[(v, w)] = e_props
+        if len(pending) >= self.batch_size:
+            self.__flush_rels(group)
+
+
+    def __flush_nodes(self, group:tuple)-> None:
+        pending = self.__nodes.pop(group, None)
+        if not pending:
+            return
+        label, key = group
+        batch = list(pending.values())
+        if self.link:
+            self.n4jcomm.push_nodes_linked(
+                label=label, props_list=batch, key=key, **self.link)
+        else:
+            self.n4jcomm.push_nodes(
+                label=label, props_list=batch, key=key)
+        # // Only remembered once actually written.
+        for props in batch:
+            self.__remember((label, key, props[key]), _digest(props))
+        self.__counts['node_flushed'] += len(batch)
+
+
+    def __flush_rels(self, group:tuple)-> None:
+        pending = self.__rels.pop(group, None)
+        if not pending:
+            return
+        # // Edges can point at buffered nodes; write those first.
+        self.flush_nodes()
+        v_label, w_label, e_label, key = group
+        self.n4jcomm.push_rels(
+            v_label=v_label,
+            w_label=w_label,
+            e_label=e_label,
+            key=key,
+            rels=[
+                {'v': v, 'w': w, 'e': e}
+                for (v, w), e in pending.items()
+            ]
+        )
+        for (v, w), e in pending.items():
+            self.__remember(group + (v, w), _digest(e))
+        self.__counts['rel_flushed'] += len(pending)
+
+
+    def flush_nodes(self)-> None:
+        'Flushes all pending node writes.'
+        for group in list(self.__nodes):
+            self.__flush_nodes(group)
+
+
+    def flush(self)-> None:
+        'Flushes all pending writes, nodes first.'
+        self.flush_nodes()
+        for group in list(self.__rels):
+            self.__flush_rels(group)
+
+
+    def stats(self)-> dict:
+        'Counters of buffered, flushed and saved writes.'
+        return dict(self.__counts)
@@ -0,0 +1,122 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.neo4j_tools.buffer import WriteBuffer
+
+# !! This test doesn't need Neo4j; writes are
+# !! recorded by a stand-in for Neo4jComm.
+
+
+class RecordingComm:
+    'Records batched writes instead of sending them.'
+    def __init__(self):
+        self.nodes = []
+        self.rels = []
+
+    def push_nodes(self, label, props_list, key=None):
+        self.nodes.append(list(props_list))
+
+    def push_rels(self, v_label, w_label, e_label, key, rels):
+        self.rels.append(list(rels))
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_coalesces_nodes():
+    comm = RecordingComm()
+    buf = WriteBuffer(comm, batch_size=10)
+    buf.push_node('UTest', {'title':'a', 'v':1}, key='title')
+    buf.push_node('UTest', {'title':'a', 'v':2}, key='title')
+    buf.push_node('UTest', {'title':'b', 'v':1}, key='title')
+    buf.flush()
+    flat = [p for batch in comm.nodes for p in batch]
+    ok = (
+        len(flat) == 2 and
+        {'title':'a', 'v':2} in flat and
+        buf.stats()['coalesced'] == 1
+    )
+    return fmt_msg(func=test_coalesces_nodes, status=ok)
+
+
+def test_drops_repeats_after_flush():
+    comm = RecordingComm()
+    buf = WriteBuffer(comm, batch_size=1)
+    for _ in range(5):
+        buf.push_node('UTest', {'title':'a'}, key='title')
+    buf.flush()
+    ok = len(comm.nodes) == 1 and buf.stats()['dropped'] == 4
+    return fmt_msg(func=test_drops_repeats_after_flush, status=ok)
+
+
+def test_window_is_bounded():
+    comm = RecordingComm()
+    buf = WriteBuffer(comm, batch_size=1, window=1)
+    buf.push_node('UTest', {'title':'a'}, key='title')
+    buf.push_node('UTest', {'title':'b'}, key='title')
+    # // 'a' fell out of the window, so it is written again.
+    buf.push_node('UTest', {'title':'a'}, key='title')
+    return fmt_msg(
+        func=test_window_is_bounded,
+        status=len(comm.nodes) == 3
+    )
+
+
+def test_rels_flush_after_nodes():
+    comm = RecordingComm()
+    order = []
+    comm.push_nodes = lambda **kw: order.append('n')
+    comm.push_rels = lambda **kw: order.append('r')
+    buf = WriteBuffer(comm, batch_size=2)
+    buf.push_node('UTest', {'title':'a'}, key='title')
+    buf.push_rel('UTest', 'UTest', 'UTestLink', 'title', 'a', 'b')
+    buf.push_rel('UTest', 'UTest', 'UTestLink', 'title', 'a', 'b')
+    buf.push_rel('UTest', 'UTest', 'UTestLink', 'title', 'a', 'c')
+    buf.flush()
+    return fmt_msg(
+        func=test_rels_flush_after_nodes,
+        status=order == ['n', 'r']
+    )
+
+
+def test_repeat_replaces_pending():
+    comm = RecordingComm()
+    buf = WriteBuffer(comm, batch_size=10)
+    buf.push_node('UTest', {'title':'a', 'v':1}, key='title')
+    buf.flush()
+    # // v1 equals the flushed version, but has to replace v2.
+    buf.push_node('UTest', {'title':'a', 'v':2}, key='title')
+    buf.push_node('UTest', {'title':'a', 'v':1}, key='title')
+    buf.push_rel('UTest', 'UTest', 'UTestLink', 'title', 'a', 'b')
+    buf.flush()
+    buf.push_rel('UTest', 'UTest', 'UTestLink', 'title', 'a', 'b',
+                    e_props={'w':2})
+    buf.push_rel('UTest', 'UTest', 'UTestLink', 'title', 'a', 'b')
+    buf.flush()
+    return fmt_msg(
+        func=test_repeat_replaces_pending,
+        status=(
+            comm.nodes[-1] == [{'title':'a', 'v':1}] and
+            comm.rels[-1] == [{'v':'a', 'w':'b', 'e':{}}]
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_coalesces_nodes,
+    test_drops_repeats_after_flush,
+    test_repeat_replaces_pending,
+    test_window_is_bounded,
+    test_rels_flush_after_nodes,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
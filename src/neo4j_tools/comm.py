@@ -1,5 +1,11 @@
 from neo4j import GraphDatabase as GDB
+from neo4j.exceptions import TransientError
 import types
+import time
+import random
+
+from src.sinks.base import GraphSink
+from src.neo4j_tools.trace import CountedResult
 
 '''
 Package containing Neo4jComm -- a class
@@ -28,16 +34,163 @@ def _SAFECHECK():
         ''')
 
 
-class Neo4jComm:
+# // Writes failing with a TransientError (deadlocks, lock
+# // timeouts, ..) are retried this many times, with a pause
+# // of _BACKOFF * 2^attempt (+ jitter) sec. Args which write
+# // to the same db can run at once (see cli.py), so their
+# // transactions can deadlock on shared nodes. This is the
+# // only retry layer for sync writes; callers (e.g
+# // PartitionedWriter in writers.py) don't retry on top.
+_RETRIES = 5
+_BACKOFF = 0.1
+
+
+def _construct_props(names:list, alias:str)-> str:
+    ''' Convenience hack for creating a str
+        which can be used to bind properties
+        to a neo4j node/rel. Returns the 
+        following fmt:
+            '{
+                <prop1>:$<alias><prop1>, 
+                <prop2>:$<alias><prop2>, 
+                ... 
+            }'
+    '''
+    p_str = '{'
+    # // Used to know when to stop putting commas
+    # // after each property id.
+    n = len(names) - 1
+    for i, k in enumerate(names):
+        p_str += f'{k}:${alias}{k}'
+        # // Do not add a comma after last prop.
+        if i < n:
+            p_str += ','
+    # // Close CQL.
+    p_str += '}'
+    return p_str
+
+
+def _construct_row_props(names:list, row:str)-> str:
+    ''' Like _construct_props, but binds properties to
+        keys of a map named <row> (as with UNWIND):
+            '{<prop1>:<row>.<prop1>, ...}'
+    '''
+    return '{' + ','.join(f'{k}:{row}.{k}' for k in names) + '}'
+
+
+def _cql_push_nodes(label:str, names:list, key:str)-> str:
+    'CQL for Neo4jComm.push_nodes; batch is bound to $batch.'
+    return f'''
+        UNWIND $batch AS row
+        MERGE (n:{label} {_construct_row_props(names, 'row')})
+        {'SET n += row' if key else ''}
+    '''
+
+
+def _cql_push_nodes_linked(label:str, e_label:str, p_label:str,
+                            p_e_label:str, key:str, hlink_key:str)-> str:
+    ''' CQL for Neo4jComm.push_nodes_linked; batch is bound to $batch.
+        Returns (key, [keys of v], [keys of w]) per row, for the
+        (v)->(row) and (row)->(w) relationships made.
+    '''
+    return f'''
+        UNWIND $batch AS row
+        MERGE (n:{label} {{{key}: row.{key}}})
+        SET n += row
+        WITH n, row
+
+        // Incoming; nodes waiting for this one.
+        OPTIONAL MATCH (v:{label})-[:{p_e_label}]->
+                       (:{p_label} {{{key}: row.{key}}})
+        FOREACH (_ IN CASE WHEN v IS NULL OR v = n
+                           THEN [] ELSE [1] END |
+            MERGE (v)-[:{e_label}]->(n))
+        WITH n, row, [x IN collect(v) WHERE x <> n | x.{key}] AS incoming
+        OPTIONAL MATCH (p:{p_label} {{{key}: row.{key}}})
+        DETACH DELETE p
+        WITH DISTINCT n, row, incoming
+
+        // Outgoing; link existing, placeholder the rest. Rows
+        // without links are kept (as null) for the RETURN.
+        WITH n, row, incoming, [l IN coalesce(row.{hlink_key}, [])
+                                WHERE l <> row.{key}] AS ls
+        UNWIND CASE WHEN ls = [] THEN [null] ELSE ls END AS l
+        OPTIONAL MATCH (w:{label} {{{key}: l}})
+        FOREACH (_ IN CASE WHEN w IS NULL 
+                           THEN [] ELSE [1] END |
+            MERGE (n)-[:{e_label}]->(w))
+        FOREACH (_ IN CASE WHEN w IS NULL AND l IS NOT NULL
+                           THEN [1] ELSE [] END |
+            MERGE (q:{p_label} {{{key}: l}})
+            MERGE (n)-[:{p_e_label}]->(q))
+        WITH row.{key} AS key, incoming, collect(DISTINCT w.{key}) AS outgoing
+        RETURN key, incoming, outgoing
+    '''
+
+
+def _linked_pairs(recs:list)-> list:
+    ''' (v key, w key) of rels made by _cql_push_nodes_linked,
+        given its records.
+    '''
+    return [(v, k) for k, vs, _ in recs for v in vs] + \
+           [(k, w) for k, _, ws in recs for w in ws]
+
+
+def _cql_create_ftindex(name:str, label:str, prop:str)-> str:
+    ''' Cypher for creating fulltext index <name> on <label>.<prop>
+        (Neo4j 4.3+ syntax; the db.index.fulltext.createNodeIndex
+        procedure is gone in 5.x). Shared with comm_async.py.
+    '''
+    return f'''
+        CREATE FULLTEXT INDEX {name} IF NOT EXISTS
+        FOR (n:{label}) ON EACH [n.{prop}]
+    '''
+
+
+def _cql_resolve_pending(label:str, e_label:str, p_label:str,
+                            p_e_label:str, key:str)-> str:
+    ''' CQL for Neo4jComm.resolve_pending; pages $n placeholders
+        by <key> after $last, resolved through the map $aliases,
+        and $drop removes unresolved ones too. Returns (key, key
+        of the node, [keys of nodes linked to it]).
+    '''
+    return f'''
+        MATCH (p:{p_label}) WHERE p.{key} > $last
+        WITH p ORDER BY p.{key} LIMIT $n
+        OPTIONAL MATCH (w:{label}
+            {{{key}: coalesce($aliases[p.{key}], p.{key})}})
+        OPTIONAL MATCH (v:{label})-[:{p_e_label}]->(p)
+        WITH p, p.{key} AS k, w, [x IN collect(v) WHERE x <> w] AS vs
+        FOREACH (x IN vs | MERGE (x)-[:{e_label}]->(w))
+        FOREACH (_ IN CASE WHEN w IS NOT NULL OR $drop
+                           THEN [1] ELSE [] END |
+            DETACH DELETE p)
+        RETURN k, w.{key}, [x IN vs | x.{key}]
+    '''
+
+
+class Neo4jComm(GraphSink):
     ''' Handles communication with neo4j.
         More info in method docstrings.
     '''
-    def __init__(self, uri:str, usr:str, pwd:str):
+    def __init__(self, uri:str, usr:str, pwd:str, tracer=None,
+                    feed=None, cache=None):
+        ''' <tracer> is an optional QueryTracer (see trace.py),
+            which then records every query sent by this obj.
+            <feed> is an optional ChangeFeed (see
+            sinks/changefeed.py), which then records every
+            write, once it went through. <cache> is an optional
+            ReadCache (see readcache.py) for pull_node and
+            pull_node_prop, invalidated by writes of this obj.
+        '''
         self.__driver = GDB.driver(
             uri=uri,
             auth=(usr, pwd),
             encrypted=False
         )
+        self.__tracer = tracer
+        self.__feed = feed
+        self.__cache = cache
 
     def __del__(self):
         'Close driver just 2 b sure.'
@@ -45,53 +198,146 @@ class Neo4jComm:
             self.__driver.close()
 
 
+    def __retried(self, run):
+        ''' Returns run() (which sends & consumes a query), run
+            again on transient errors; see _RETRIES. Safe since
+            a failed (autocommit) transaction is rolled back.
+        '''
+        for attempt in range(_RETRIES + 1):
+            try:
+                return run()
+            except TransientError:
+                if attempt == _RETRIES:
+                    raise
+                pause = _BACKOFF * 2 ** attempt
+                time.sleep(pause + random.uniform(0, pause))
+
+
     def __push(self, cql:str, **bindings)-> None:
-        'Generic pusher'
-        with self.__driver.session() as sess:
-            sess.run(cql, **bindings)
+        'Generic pusher; retries transient errors.'
+        def run():
+            # // Consumed here, so errors surface (and are
+            # // retried) before the session is closed.
+            for res in self.__push_get(cql, **bindings):
+                res.consume()
+        self.__retried(run)
 
 
     def __push_get(self, cql:str, **bindings)-> object:
-        'Generic pusher which yields results'
+        ''' Generic pusher which yields results. All queries go
+            through here, so this is where they are traced. Not
+            retried (records may be handed out already); the
+            pushers which consume everything are.
+        '''
         with self.__driver.session() as sess:
-            yield sess.run(cql, **bindings)
+            if self.__tracer is None:
+                yield sess.run(cql, **bindings)
+                return
+
+            run_cql, _ = self.__tracer.prepare(cql)
+            start = time.perf_counter()
+            res = CountedResult(sess.run(run_cql, **bindings))
+            try:
+                yield res
+            finally:
+                # // Rest of the records are discarded; the
+                # // caller is done with them at this point.
+                try:
+                    summary = res.consume()
+                except Exception:
+                    summary = None
+                self.__tracer.record(
+                    cql=cql,
+                    bindings=bindings,
+                    latency_ms=(time.perf_counter() - start) * 1000,
+                    rows=res.rows,
+                    summary=summary
+                )
+
+
+    def __written(self, hook:str, **kwargs)-> None:
+        ''' Tells the change feed & read cache (if any) about a
+            write; <hook> is the name of their method for it.
+        '''
+        for listener in (self.__feed, self.__cache):
+            if listener is not None:
+                getattr(listener, hook)(**kwargs)
+
+
+    def __cached(self, label:str, props:dict, projection, fetch):
+        'Result of fetch(), through the read cache if any.'
+        if self.__cache is None:
+            return fetch()
+        return self.__cache.get_or_fetch(label, props, projection, fetch)
+
 
+    def __push_list(self, cql:str, **bindings)-> list:
+        'Generic pusher which returns all records, as tuples'
+        def run():
+            for res in self.__push_get(cql, **bindings):
+                return [tuple(rec) for rec in res]
+        return self.__retried(run)
 
-    def clear(self, label:str=None)-> None:
+
+    def __push_count(self, cql:str, **bindings)-> int:
+        'Generic pusher for queries returning a single count'
+        def run():
+            for res in self.__push_get(cql, **bindings):
+                return res.single()[0]
+        return self.__retried(run)
+
+
+    def clear(self, label:str=None, batch_size:int=None,
+                                    progress=None)-> None:
         ''' Clear the database. Adding <label> will 
             narrow down what will be cleared by
             labels
+
+            Without <batch_size>, everything is deleted in one
+            transaction. With it, relationships and then nodes
+            are deleted in transactions of at most <batch_size>
+            items each, which keeps transaction state (heap)
+            bounded on large graphs and doesn't block other
+            writers for long. <progress> is an optional func
+            called after each chunk as:
+                progress(<'rels' or 'nodes'>, <deleted so far>)
         ''' 
-        cql = f'''
-            MATCH (x{':'+label if label else ''})
-            DETACH DELETE x
-        '''
-        self.__push(cql=cql)
+        match = f"(x{':'+label if label else ''})"
+        if not batch_size:
+            self.__push(cql=f'MATCH {match} DETACH DELETE x')
+            self.__written('clear', label=label)
+            return
+
+        # // Rels first, so that node deletes are cheap
+        # // (and never need DETACH on dense nodes).
+        for phase, cql in [
+            ('rels', f'''
+                MATCH {match}-[r]-()
+                WITH DISTINCT r LIMIT $n
+                DELETE r
+                RETURN count(r)
+            '''),
+            ('nodes', f'''
+                MATCH {match}
+                WITH x LIMIT $n
+                DETACH DELETE x
+                RETURN count(x)
+            '''),
+        ]:
+            total = 0
+            while True:
+                deleted = self.__push_count(cql=cql, n=batch_size)
+                total += deleted
+                if progress:
+                    progress(phase, total)
+                if deleted < batch_size:
+                    break
+        self.__written('clear', label=label)
 
 
     def __construct_props(self, names:list, alias:str)-> str:
-        ''' Convenience hack for creating a str
-            which can be used to bind properties
-            to a neo4j node/rel. Returns the 
-            following fmt:
-                '{
-                    <prop1>:$<alias><prop1>, 
-                    <prop2>:$<alias><prop2>, 
-                    ... 
-                }'
-        '''
-        p_str = '{'
-        # // Used to know when to stop putting commas
-        # // after each property id.
-        n = len(names) - 1
-        for i, k in enumerate(names):
-            p_str += f'{k}:${alias}{k}'
-            # // Do not add a comma after last prop.
-            if i < n:
-                p_str += ','
-        # // Close CQL.
-        p_str += '}'
-        return p_str
+        'See _construct_props (mod lvl).'
+        return _construct_props(names=names, alias=alias)
 
 
     def __extract_neo4j_node(self, n4j_res_gen)-> list:
@@ -140,6 +386,140 @@ class Neo4jComm:
         # // Close CQL and push.
         cql += ')'
         self.__push(cql=cql, **props)
+        self.__written('nodes', label=label, props_list=[props])
+
+
+    def push_nodes(self, label:str, props_list:list, 
+                            key:str=None)-> None:
+        ''' Batched equivalent of push_node; creates one node
+            per dict in <props_list>, all in one transaction.
+            The batch is sent as a parameter (UNWIND) so the
+            query itself stays small regardless of batch size.
+
+            If <key> is specified, nodes are merged on that
+            property only and the remaining props are set (i.e
+            updated if the node exists). Otherwise all props
+            are merged on, like push_node; this requires that
+            all dicts share the same keys.
+        '''
+        # // Crash if safety enabled.
+        _SAFECHECK()
+        if not props_list:
+            return
+        cql = _cql_push_nodes(
+            label=label,
+            names=[key] if key else props_list[0].keys(),
+            key=key
+        )
+        self.__push(cql=cql, batch=props_list)
+        self.__written('nodes', label=label, props_list=props_list, key=key)
+
+
+    def push_nodes_linked(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, props_list:list, key:str,
+                            hlink_key:str)-> None:
+        ''' Equivalent of push_nodes (with <key>), but also links
+            the nodes in the same transaction, so that a separate
+            linking pass is not needed:
+                (new)-[<e_label>]->(w) for all nodes w with <label>
+                    where w.<key> is in new.<hlink_key>.
+                (v)-[<e_label>]->(new) for all stored nodes v with
+                    <label> where new.<key> is in v.<hlink_key>.
+
+            The second case is resolved through placeholder nodes
+            (<p_label>, keyed by <key>): a hyperlink to a node which
+            doesn't exist yet is recorded as (v)-[<p_e_label>]->(p)
+            and swapped for a real relationship (then deleted) once
+            the node arrives. That keeps the lookup indexed instead
+            of scanning all <hlink_key> lists; see create_index.
+            Placeholders of nodes which never arrive are removed
+            with resolve_pending.
+        '''
+        # // Crash if safety enabled.
+        _SAFECHECK()
+        if not props_list:
+            return
+        cql = _cql_push_nodes_linked(
+            label=label, 
+            e_label=e_label,
+            p_label=p_label,
+            p_e_label=p_e_label,
+            key=key,
+            hlink_key=hlink_key
+        )
+        pairs = _linked_pairs(self.__push_list(cql=cql, batch=props_list))
+        self.__written('nodes', label=label, props_list=props_list,
+                        key=key, linked=True)
+        if pairs:
+            self.__written('rels', v_label=label, w_label=label,
+                            e_label=e_label, pairs=pairs)
+        # // Placeholders were created/deleted too.
+        if self.__cache:
+            self.__cache.clear(label=p_label)
+
+
+    def resolve_pending(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, key:str, drop:bool=False,
+                            batch_size:int=1000, progress=None,
+                            aliases:dict=None)-> int:
+        ''' Swaps placeholders of push_nodes_linked for real
+            relationships where the node exists by now (e.g it
+            was written by a transaction which ran at the same
+            time, so neither saw the other). <aliases> maps keys
+            of placeholders to the key of their node, e.g titles
+            of dropped duplicates (see -dedup). With <drop>, the
+            placeholders of nodes which were never written are
+            removed too; meant for the end of a load, since they
+            would otherwise pile up (hundreds per article).
+            Placeholders are paged by <key>, so batches don't
+            rescan those already seen. <progress> is an optional
+            func, called as progress(<placeholders seen>, <rels
+            made>). Returns the amount of rels made.
+        '''
+        # // Crash if safety enabled.
+        _SAFECHECK()
+        cql = _cql_resolve_pending(
+            label=label,
+            e_label=e_label,
+            p_label=p_label,
+            p_e_label=p_e_label,
+            key=key
+        )
+        last, seen, made = '', 0, 0
+        while True:
+            rows = self.__push_list(cql=cql, last=last, n=batch_size,
+                                    drop=drop, aliases=aliases or {})
+            pairs = [(v, w) for _, w, vs in rows for v in vs]
+            if pairs:
+                self.__written('rels', v_label=label, w_label=label,
+                                e_label=e_label, pairs=pairs)
+            seen += len(rows)
+            made += len(pairs)
+            if progress:
+                progress(seen, made)
+            if len(rows) < batch_size:
+                break
+            last = rows[-1][0]
+        if self.__cache:
+            self.__cache.clear(label=p_label)
+        return made
+
+
+    def update_nodes(self, label:str, props_list:list, key:str)-> None:
+        ''' Batched update of existing nodes with <label>, matched
+            on prop <key>; all other props in each dict are set.
+            Unlike push_nodes, missing nodes are not created.
+        '''
+        # // Crash if safety enabled.
+        _SAFECHECK()
+        if not props_list:
+            return
+        self.__push(cql=f'''
+            UNWIND $batch AS row
+            MATCH (n:{label} {{{key}: row.{key}}})
+            SET n += row
+        ''', batch=props_list)
+        self.__written('update', label=label, props_list=props_list, key=key)
 
 
     def pull_node(self, label:str, props:dict): # -> gen
@@ -156,8 +536,10 @@ class Neo4jComm:
         )
         cql += ') RETURN n'
 
-        res = self.__push_get(cql, **props)
-        return self.__extract_neo4j_node(n4j_res_gen=res)
+        def fetch()-> list:
+            res = self.__push_get(cql, **props)
+            return self.__extract_neo4j_node(n4j_res_gen=res)
+        return self.__cached(label, props, None, fetch)
 
 
     def pull_node_prop(self, label:str, 
@@ -176,11 +558,11 @@ class Neo4jComm:
         )
         cql += f') RETURN n.{prop}'
 
-        res = self.__push_get(cql, **props)
-        res = next(res)
-        
-        # // Unpack all items in all records in res.
-        return [itm for rec in res for itm in rec]
+        def fetch()-> list:
+            for res in self.__push_get(cql, **props):
+                # // Unpack all items in all records in res.
+                return [itm for rec in res for itm in rec]
+        return self.__cached(label, props, prop, fetch)
 
     
     def push_rel(self, v_label:str, w_label:str, e_label:str,
@@ -223,6 +605,38 @@ class Neo4jComm:
         
         # // send to db.
         self.__push(cql=cql, **{**v_props, **w_props, **e_props})
+        for listener in (self.__feed, self.__cache):
+            if listener is not None:
+                key = listener.key
+                listener.rels(v_label=v_label, w_label=w_label,
+                    e_label=e_label, pairs=[(v_props.get(v_al+key),
+                                             w_props.get(w_al+key))])
+
+
+    def push_rels(self, v_label:str, w_label:str, e_label:str,
+                            key:str, rels:list)-> None:
+        ''' Batched equivalent of push_rel, all in one transaction.
+            Nodes are matched on property <key> only; <rels> is a
+            list of dicts in the following fmt:
+                {'v': <v key val>, 'w': <w key val>, 'e': <e_props>}
+            Relationships are merged on (v)-[<e_label>]->(w) and
+            'e' props are set, so repeated pushes update props
+            instead of creating parallel relationships.
+        '''
+        # // Crash if safety enabled.
+        _SAFECHECK()
+        if not rels:
+            return
+        cql = f'''
+            UNWIND $batch AS row
+            MATCH (v:{v_label} {{{key}: row.v}}),
+                  (w:{w_label} {{{key}: row.w}})
+            MERGE (v)-[r:{e_label}]->(w)
+            SET r += coalesce(row.e, {{}})
+        '''
+        self.__push(cql=cql, batch=rels)
+        self.__written('rels', v_label=v_label, w_label=w_label,
+                e_label=e_label, pairs=[(r['v'], r['w']) for r in rels])
 
 
 # !! Not refactoring <pull_any_rel> even though its _very_ similar to 
@@ -280,13 +694,204 @@ class Neo4jComm:
         return self.__extract_neo4j_node(n4j_res_gen=res)
 
 
+    def pull_neighbours(self, v_label:str, w_label:str, e_label:str,
+                            key:str, v)-> list:
+        ''' Nodes w (as dicts) of (v)-[<e_label>]->(w), where v is
+            the node with <v_label> whose <key> prop is <v>. One
+            hop from an (indexed) lookup of v, like the server's
+            reads of article links; pull_rel matches v and w
+            apart, which scans all nodes with <w_label>.
+        '''
+        res = self.__push_get(cql=f'''
+            MATCH (v:{v_label} {{{key}: $v}})-[:{e_label}]->(w:{w_label})
+            RETURN w
+        ''', v=v)
+        return self.__extract_neo4j_node(n4j_res_gen=res)
+
+
+    def pull_props(self, label:str, props:list): # -> gen
+        ''' Streams the values of <props> (names) of all nodes
+            with <label>, one tuple per node. Like pull_edges,
+            records are pulled lazily; meant for passes over all
+            nodes which shouldn't hold everything in memory.
+        '''
+        ret = ', '.join(f'n.{p}' for p in props)
+        for res in self.__push_get(f'MATCH (n:{label}) RETURN {ret}'):
+            for rec in res:
+                yield tuple(rec)
+
+
+    def pull_sorted_prop(self, label:str, prop:str): # -> gen
+        ''' Streams the distinct vals of <prop> of all nodes with
+            <label>, ascending; pulled lazily, like pull_props.
+            With an index on <prop> (see create_index) Neo4j
+            reads them in index order instead of sorting.
+        '''
+        cql = f'''
+            MATCH (n:{label}) WHERE n.{prop} IS NOT NULL
+            RETURN DISTINCT n.{prop} AS v ORDER BY v
+        '''
+        for res in self.__push_get(cql):
+            for rec in res:
+                yield rec[0]
+
+
+    def pull_edges(self, v_label:str, w_label:str, e_label:str,
+                            key:str): # -> gen
+        ''' Streams all (v)-[<e_label>]->(w) relationships as
+            (v.<key>, w.<key>) tuples, where v and w have labels
+            <v_label> and <w_label>. Meant for exporting the
+            whole graph; records are pulled lazily, so the
+            session stays open until the generator is drained.
+        '''
+        cql = f'''
+            MATCH (v:{v_label})-[:{e_label}]->(w:{w_label})
+            RETURN v.{key}, w.{key}
+        '''
+        for res in self.__push_get(cql):
+            for rec in res:
+                yield rec[0], rec[1]
+
+
     def create_ftindex(self, name:str, label:str, prop:str):
-        ''' Creates a fulltext index unsafely (i.e doesn't check
-            if one exists and without parameterization). Only one
-            label & prop allowed.
+        ''' Creates a fulltext index (unless one named <name>
+            exists) without parameterization. Only one label &
+            prop allowed. Population continues in the background,
+            see await_ftindex.
+        '''
+        self.__push(cql=_cql_create_ftindex(name, label, prop))
+
+
+    def ftindex_state(self, name:str): # -> (str, float) or None
+        ''' Returns (state, population percentage) of the index
+            named <name>, e.g ('ONLINE', 100.0), or None if there
+            is no such index.
+        '''
+        for res in self.__push_get(cql='''
+            SHOW INDEXES YIELD name, state, populationPercent
+            WHERE name = $name
+            RETURN state, populationPercent
+        ''', name=name):
+            rec = res.single()
+            return (rec[0], rec[1]) if rec else None
+
+
+    def drop_ftindex(self, name:str)-> None:
+        'Drops the (fulltext) index named <name>, if it exists.'
+        self.__push(cql=f'DROP INDEX {name} IF EXISTS')
+
+
+    def await_ftindex(self, name:str, timeout:float=3600,
+                        progress=None, poll:float=2.0)-> None:
+        ''' Blocks until index <name> is ONLINE, polling every
+            <poll> seconds. <progress> is an optional func, called
+            as progress(<population %>) on each poll. Raises if the
+            index is missing or FAILED, or after <timeout> seconds.
+        '''
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self.ftindex_state(name=name)
+            assert state is not None, f'No index named {name}.'
+            if progress:
+                progress(state[1])
+            if state[0] == 'ONLINE':
+                return
+            assert state[0] != 'FAILED', f'Index {name} failed.'
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Index {name} not online in time.')
+            time.sleep(poll)
+
+
+    def __batched(self, cql:str, batch_size:int, progress)-> None:
+        ''' Runs <cql> (which binds $n as a LIMIT and $last as a
+            cursor, and returns a count and the last key) until
+            it affects less than <batch_size> items.
+        '''
+        total, last = 0, ''
+        while True:
+            n, last_key = self.__push_list(
+                cql=cql, n=batch_size, last=last)[0]
+            total += n
+            if progress:
+                progress(total)
+            if n < batch_size:
+                return
+            last = last_key
+
+
+    def remove_props(self, label:str, key:str, props:list,
+                        batch_size:int=1000, progress=None)-> None:
+        ''' Removes <props> (names) from all nodes with <label>,
+            in transactions of <batch_size> nodes. Nodes are paged
+            by their <key> prop (which should be indexed), so a
+            batch doesn't rescan the nodes before it. <progress>
+            is an optional func, called as progress(<updated so
+            far>).
+        '''
+        # // Crash if safety enabled.
+        _SAFECHECK()
+        has = ' OR '.join(f'n.{p} IS NOT NULL' for p in props)
+        rm = ', '.join(f'n.{p}' for p in props)
+        self.__batched(
+            cql=f'''
+                MATCH (n:{label}) WHERE n.{key} > $last AND ({has})
+                WITH n ORDER BY n.{key} LIMIT $n
+                REMOVE {rm}
+                RETURN count(n), max(n.{key})
+            ''',
+            batch_size=batch_size,
+            progress=progress
+        )
+        self.__written('props', label=label, props=props)
+
+
+    def move_props(self, label:str, key:str, props:list, side_label:str,
+                        batch_size:int=1000, progress=None)-> None:
+        ''' Equivalent of remove_props, but <props> are first copied
+            to a node with <side_label>, merged on the <key> prop of
+            the original node. Meant for keeping bulky, rarely read
+            props (e.g html) out of hot node records.
+        '''
+        # // Crash if safety enabled.
+        _SAFECHECK()
+        has = ' OR '.join(f'n.{p} IS NOT NULL' for p in props)
+        cp = ', '.join(f's.{p} = n.{p}' for p in props)
+        rm = ', '.join(f'n.{p}' for p in props)
+        self.__batched(
+            cql=f'''
+                MATCH (n:{label}) WHERE n.{key} > $last AND ({has})
+                WITH n ORDER BY n.{key} LIMIT $n
+                MERGE (s:{side_label} {{{key}: n.{key}}})
+                SET {cp}
+                REMOVE {rm}
+                RETURN count(n), max(n.{key})
+            ''',
+            batch_size=batch_size,
+            progress=progress
+        )
+        self.__written('props', label=label, props=props)
+        if self.__cache:
+            self.__cache.clear(label=side_label)
+
+
+    def query_ftindex(self, name:str, text:str, limit:int=10)-> list:
+        ''' Queries fulltext index <name> with <text> (Lucene
+            syntax) and returns up to <limit> matching nodes,
+            best match first.
+        '''
+        res = self.__push_get(cql='''
+            CALL db.index.fulltext.queryNodes($name, $text)
+            YIELD node
+            RETURN node LIMIT $limit
+        ''', name=name, text=text, limit=limit)
+        return self.__extract_neo4j_node(n4j_res_gen=res)
+
+
+    def create_index(self, label:str, prop:str):
+        ''' Creates a (btree) index on <label>.<prop> if it
+            does not exist already. Speeds up MATCH/MERGE on
+            that property considerably.
         '''
         self.__push(cql=f'''
-            CALL db.index.fulltext.createNodeIndex(
-                '{name}', ['{label}'], ['{prop}'])
+            CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.{prop})
         ''')
-
@@ -0,0 +1,361 @@
+from neo4j import AsyncGraphDatabase as AGDB
+import asyncio
+import time
+
+from src.neo4j_tools.comm import _SAFECHECK
+from src.neo4j_tools.comm import _construct_props
+from src.neo4j_tools.comm import _cql_create_ftindex
+from src.neo4j_tools.comm import _cql_push_nodes
+from src.neo4j_tools.comm import _cql_push_nodes_linked
+from src.neo4j_tools.comm import _cql_resolve_pending
+from src.neo4j_tools.comm import _linked_pairs
+
+'''
+Package containing AsyncNeo4jComm -- an asyncio
+variant of Neo4jComm (see comm.py), built on the
+async API of the neo4j driver (neo4j>=5).
+
+Method names and arguments mirror Neo4jComm, but
+all of them are coroutines. At most <max_inflight>
+transactions run at the same time; callers beyond
+that wait for a slot. push_stream() is meant as the
+glue between a (sync) ArticleData generator and the
+db, so that fetching and writing overlap.
+
+Writes run as managed transactions (execute_write),
+so the driver retries transient errors (deadlocks of
+concurrent MERGEs, lock timeouts, ..) with backoff.
+push_nodes_linked calls run one at a time; see there.
+
+NOTE:   Same disclaimer as comm.py applies.
+'''
+
+
+class AsyncNeo4jComm:
+    ''' Handles async communication with neo4j.
+        More info in method docstrings, or the
+        equivalent methods of Neo4jComm. <feed> is an
+        optional ChangeFeed, see Neo4jComm.
+    '''
+    def __init__(self, uri:str, usr:str, pwd:str, max_inflight:int=4,
+                    feed=None):
+        self.__feed = feed
+        self.__uri = uri
+        self.__auth = (usr, pwd)
+        self.__max_inflight = max_inflight
+        # // All are created lazily, inside the event
+        # // loop which ends up using them.
+        self.__driver = None
+        self.__slots = None
+        self.__linked = None
+
+
+    def __get_driver(self):
+        if self.__driver is None:
+            self.__driver = AGDB.driver(
+                uri=self.__uri,
+                auth=self.__auth,
+                encrypted=False
+            )
+            self.__slots = asyncio.Semaphore(self.__max_inflight)
+            self.__linked = asyncio.Lock()
+        return self.__driver
+
+
+    async def close(self)-> None:
+        'Close driver; the obj can be reused afterwards.'
+        if self.__driver is not None:
+            await self.__driver.close()
+            self.__driver = None
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+    async def __push(self, cql:str, **bindings)-> None:
+        'Generic pusher; a managed (retried) write transaction.'
+        await self.__push_list(cql, **bindings)
+
+
+    async def __push_list(self, cql:str, **bindings)-> list:
+        'Like __push, but returns all records.'
+        async def work(tx):
+            res = await tx.run(cql, bindings)
+            return [rec async for rec in res]
+
+        driver = self.__get_driver()
+        async with self.__slots:
+            async with driver.session() as sess:
+                return await sess.execute_write(work)
+
+
+    async def __push_get(self, cql:str, **bindings)-> list:
+        'Generic pusher which returns all records'
+        driver = self.__get_driver()
+        async with self.__slots:
+            async with driver.session() as sess:
+                res = await sess.run(cql, **bindings)
+                return [rec async for rec in res]
+
+
+    def __extract_neo4j_node(self, records:list)-> list:
+        'Attempt to extract neo4j records into a lst of dct'
+        res = []
+        for record in records:
+            for obj in record:
+                # // Only use nodes, see Neo4jComm.
+                name = obj.__class__.__name__
+                if 'Node' not in name:
+                    continue
+                res.append({k:v for k,v in obj.items()})
+        return res
+
+
+    async def clear(self, label:str=None)-> None:
+        'See Neo4jComm.clear'
+        await self.__push(cql=f'''
+            MATCH (x{':'+label if label else ''})
+            DETACH DELETE x
+        ''')
+        if self.__feed:
+            self.__feed.clear(label=label)
+
+
+    async def push_node(self, label:str, props:dict)-> None:
+        'See Neo4jComm.push_node'
+        _SAFECHECK()
+        props_str = _construct_props(names=props.keys(), alias='')
+        await self.__push(
+            cql=f'MERGE (_:{label}{props_str})',
+            **props
+        )
+        if self.__feed:
+            self.__feed.nodes(label=label, props_list=[props])
+
+
+    async def push_nodes(self, label:str, props_list:list,
+                            key:str=None)-> None:
+        'See Neo4jComm.push_nodes'
+        _SAFECHECK()
+        if not props_list:
+            return
+        cql = _cql_push_nodes(
+            label=label,
+            names=[key] if key else props_list[0].keys(),
+            key=key
+        )
+        await self.__push(cql=cql, batch=props_list)
+        if self.__feed:
+            self.__feed.nodes(label=label, props_list=props_list, key=key)
+
+
+    async def push_nodes_linked(self, label:str, e_label:str,
+                            p_label:str, p_e_label:str, props_list:list,
+                            key:str, hlink_key:str)-> None:
+        ''' See Neo4jComm.push_nodes_linked. Calls run one at a
+            time: two batches written at once don't see each
+            other's nodes & placeholders, so links between them
+            would be lost (and MERGEs on shared placeholders
+            deadlock).
+        '''
+        _SAFECHECK()
+        if not props_list:
+            return
+        cql = _cql_push_nodes_linked(
+            label=label,
+            e_label=e_label,
+            p_label=p_label,
+            p_e_label=p_e_label,
+            key=key,
+            hlink_key=hlink_key
+        )
+        self.__get_driver()
+        async with self.__linked:
+            recs = await self.__push_list(cql=cql, batch=props_list)
+        if self.__feed:
+            self.__feed.nodes(label=label, props_list=props_list,
+                                key=key, linked=True)
+            pairs = _linked_pairs(recs)
+            if pairs:
+                self.__feed.rels(v_label=label, w_label=label,
+                                    e_label=e_label, pairs=pairs)
+
+
+    async def resolve_pending(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, key:str, drop:bool=False,
+                            batch_size:int=1000, progress=None,
+                            aliases:dict=None)-> int:
+        'See Neo4jComm.resolve_pending'
+        _SAFECHECK()
+        cql = _cql_resolve_pending(
+            label=label,
+            e_label=e_label,
+            p_label=p_label,
+            p_e_label=p_e_label,
+            key=key
+        )
+        last, seen, made = '', 0, 0
+        while True:
+            rows = await self.__push_list(cql=cql, last=last,
+                        n=batch_size, drop=drop, aliases=aliases or {})
+            pairs = [(v, w) for _, w, vs in rows for v in vs]
+            if self.__feed and pairs:
+                self.__feed.rels(v_label=label, w_label=label,
+                                    e_label=e_label, pairs=pairs)
+            seen += len(rows)
+            made += len(pairs)
+            if progress:
+                progress(seen, made)
+            if len(rows) < batch_size:
+                return made
+            last = rows[-1][0]
+
+
+    async def pull_node(self, label:str, props:dict)-> list:
+        'See Neo4jComm.pull_node'
+        props_str = _construct_props(names=props.keys(), alias='')
+        records = await self.__push_get(
+            f'MATCH (n:{label}{props_str}) RETURN n',
+            **props
+        )
+        return self.__extract_neo4j_node(records)
+
+
+    async def pull_node_prop(self, label:str,
+                            props:dict, prop:str)-> list:
+        'See Neo4jComm.pull_node_prop'
+        props_str = _construct_props(names=props.keys(), alias='')
+        records = await self.__push_get(
+            f'MATCH (n:{label}{props_str}) RETURN n.{prop}',
+            **props
+        )
+        # // Unpack all items in all records.
+        return [itm for rec in records for itm in rec]
+
+
+    async def push_rel(self, v_label:str, w_label:str, e_label:str,
+                             v_props:dict, w_props:dict, e_props:dict):
+        'See Neo4jComm.push_rel'
+        # // Aliases to differentiate dict keys, see Neo4jComm.
+        v_al, w_al, e_al = 'v', 'w', 'e'
+        props = _construct_props
+        v_props_names = props(names=v_props.keys(), alias=v_al)
+        w_props_names = props(names=w_props.keys(), alias=w_al)
+        e_props_names = props(names=e_props.keys(), alias=e_al)
+
+        v_props = {v_al+k:v for k,v in v_props.items()}
+        w_props = {w_al+k:v for k,v in w_props.items()}
+        e_props = {e_al+k:v for k,v in e_props.items()}
+
+        cql = f'''
+            MATCH
+                (v:{v_label} {v_props_names}),
+                (w:{w_label} {w_props_names})
+
+            MERGE (v)-[_:{e_label} {e_props_names}]->(w)
+        '''
+        await self.__push(cql=cql, **{**v_props, **w_props, **e_props})
+        if self.__feed:
+            key = self.__feed.key
+            self.__feed.rels(v_label=v_label, w_label=w_label,
+                e_label=e_label, pairs=[(v_props.get(v_al+key),
+                                         w_props.get(w_al+key))])
+
+
+    async def create_ftindex(self, name:str, label:str, prop:str):
+        'See Neo4jComm.create_ftindex'
+        await self.__push(cql=_cql_create_ftindex(name, label, prop))
+
+
+    async def ftindex_state(self, name:str): # -> (str, float) or None
+        'See Neo4jComm.ftindex_state'
+        recs = await self.__push_get(cql='''
+            SHOW INDEXES YIELD name, state, populationPercent
+            WHERE name = $name
+            RETURN state, populationPercent
+        ''', name=name)
+        return (recs[0][0], recs[0][1]) if recs else None
+
+
+    async def await_ftindex(self, name:str, timeout:float=3600,
+                        progress=None, poll:float=2.0)-> None:
+        'See Neo4jComm.await_ftindex'
+        deadline = time.monotonic() + timeout
+        while True:
+            state = await self.ftindex_state(name=name)
+            assert state is not None, f'No index named {name}.'
+            if progress:
+                progress(state[1])
+            if state[0] == 'ONLINE':
+                return
+            assert state[0] != 'FAILED', f'Index {name} failed.'
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Index {name} not online in time.')
+            await asyncio.sleep(poll)
+
+
+    async def create_index(self, label:str, prop:str):
+        'See Neo4jComm.create_index'
+        await self.__push(cql=f'''
+            CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.{prop})
+        ''')
+
+
+    async def push_stream(self, gen, batch_size:int, push)-> int:
+        ''' Drains the (sync) generator <gen> in a worker thread
+            and hands the items, in lists of <batch_size>, to the
+            coroutine func <push> (e.g a lambda wrapping
+            push_nodes). Batches are written concurrently while
+            the next ones are fetched (except for push_nodes_linked,
+            which writes one at a time); at most <max_inflight> are
+            pending at once, which also bounds memory. Returns
+            the amount of items pushed.
+        '''
+        loop = asyncio.get_running_loop()
+        self.__get_driver()
+        # // Bounds pending (not just running) batches.
+        pending = asyncio.Semaphore(self.__max_inflight)
+        tasks = set()
+        errors = []
+        done = object()
+        count = 0
+
+        def on_done(task):
+            tasks.discard(task)
+            if not task.cancelled() and task.exception():
+                errors.append(task.exception())
+
+        async def write(batch):
+            try:
+                await push(batch)
+            finally:
+                pending.release()
+
+        batch = []
+        while True:
+            # // Generator does blocking I/O; keep it off the loop.
+            item = await loop.run_in_executor(None, next, gen, done)
+            if item is not done:
+                batch.append(item)
+                count += 1
+            if batch and (item is done or len(batch) >= batch_size):
+                await pending.acquire()
+                # // Fail fast if an earlier write failed.
+                if errors:
+                    pending.release()
+                    break
+                task = asyncio.create_task(write(batch))
+                tasks.add(task)
+                task.add_done_callback(on_done)
+                batch = []
+            if item is done:
+                break
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if errors:
+            raise errors[0]
+        return count
@@ -0,0 +1,159 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import asyncio
+
+from src.neo4j_tools.comm_async import AsyncNeo4jComm
+
+# !! This test doesn't need Neo4j; the driver is only
+# !! created (it connects lazily), writes go to fakes.
+
+
+class Failed(Exception):
+    pass
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def comm(max_inflight:int=4)-> AsyncNeo4jComm:
+    return AsyncNeo4jComm(uri='bolt://localhost:7687', usr='neo4j',
+                            pwd='neo4j', max_inflight=max_inflight)
+
+
+class FakePush:
+    ''' Coroutine func for push_stream; records batches and
+        the peak of concurrent calls. Fails the call number
+        <fail_at> (1-based), if any.
+    '''
+    def __init__(self, fail_at:int=None):
+        self.fail_at = fail_at
+        self.batches = []
+        self.active = self.peak = self.calls = 0
+
+    async def __call__(self, batch):
+        self.calls += 1
+        if self.calls == self.fail_at:
+            raise Failed()
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        # // Long enough for the next batches to be fetched.
+        await asyncio.sleep(0.01)
+        self.batches.append(list(batch))
+        self.active -= 1
+        return []
+
+
+class Counted:
+    'Generator of 0..<n>-1 which counts the items taken.'
+    def __init__(self, n:int):
+        self.n = n
+        self.taken = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.taken >= self.n:
+            raise StopIteration
+        self.taken += 1
+        return self.taken - 1
+
+
+def test_push_stream_batches():
+    async def run():
+        c, push = comm(), FakePush()
+        n = await c.push_stream(iter(range(10)), batch_size=3, push=push)
+        await c.close()
+        return n, push
+    n, push = asyncio.run(run())
+    return fmt_msg(
+        func=test_push_stream_batches,
+        status=(
+            n == 10 and
+            sorted(len(b) for b in push.batches) == [1, 3, 3, 3] and
+            sorted(i for b in push.batches for i in b) == list(range(10))
+        )
+    )
+
+
+def test_push_stream_bounded():
+    async def run():
+        c, push = comm(max_inflight=2), FakePush()
+        n = await c.push_stream(iter(range(40)), batch_size=2, push=push)
+        await c.close()
+        return n, push
+    n, push = asyncio.run(run())
+    return fmt_msg(
+        func=test_push_stream_bounded,
+        status=n == 40 and push.peak == 2 and len(push.batches) == 20
+    )
+
+
+def test_push_stream_fail_fast():
+    gen = Counted(10000)
+
+    async def run():
+        c, push = comm(max_inflight=2), FakePush(fail_at=2)
+        try:
+            await c.push_stream(gen, batch_size=5, push=push)
+            raised = False
+        except Failed:
+            raised = True
+        await c.close()
+        return raised
+    raised = asyncio.run(run())
+    # // Stops fetching soon after the failed batch.
+    return fmt_msg(
+        func=test_push_stream_fail_fast,
+        status=raised and gen.taken < 100
+    )
+
+
+def test_push_nodes_linked_serialised():
+    async def run():
+        c = comm(max_inflight=4)
+        linked, plain = FakePush(), FakePush()
+        # // Stand-in for the driver round trip.
+        c._AsyncNeo4jComm__push_list = lambda cql, batch: linked(batch)
+        await asyncio.gather(*(
+            c.push_nodes_linked(label='UTest', e_label='UTestLink',
+                p_label='UTestPending', p_e_label='UTestPends',
+                props_list=[{'title': f't{i}', 'links': []}],
+                key='title', hlink_key='links')
+            for i in range(6)))
+        # // Other writes aren't serialised.
+        c._AsyncNeo4jComm__push_list = lambda cql, batch: plain(batch)
+        await asyncio.gather(*(
+            c.push_nodes(label='UTest', props_list=[{'title': f't{i}'}],
+                            key='title')
+            for i in range(6)))
+        await c.close()
+        return linked, plain
+    linked, plain = asyncio.run(run())
+    return fmt_msg(
+        func=test_push_nodes_linked_serialised,
+        status=(
+            linked.peak == 1 and len(linked.batches) == 6 and
+            plain.peak > 1
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_push_stream_batches,
+    test_push_stream_bounded,
+    test_push_stream_fail_fast,
+    test_push_nodes_linked_serialised,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -239,6 +239,70 @@ def test_pull_rel():
 
 
 
+def test_push_nodes_linked():
+    kw = {
+        'label':'UTest', 'e_label':'UTestLink', 'p_label':'UTestPending',
+        'p_e_label':'UTestPends', 'key':'title'
+    }
+    N4JC.clear(label='UTest')
+    N4JC.clear(label='UTestPending')
+    # // 'a' links to 'b' before 'b' exists (placeholder),
+    # // 'b' links back to the stored 'a'.
+    N4JC.push_nodes_linked(props_list=[
+        {'title':'a', 'links':['b', 'a', 'zzz']}], hlink_key='links', **kw)
+    N4JC.push_nodes_linked(props_list=[
+        {'title':'b', 'links':['a']}, {'title':'c', 'links':['b']}],
+        hlink_key='links', **kw)
+    edges = set(N4JC.pull_edges(
+        v_label='UTest', w_label='UTest', e_label='UTestLink', key='title'))
+    # // Only the placeholder of 'zzz' is left, and dropped.
+    pending = N4JC.pull_node_prop(
+        label='UTestPending', props={}, prop='title')
+    N4JC.resolve_pending(drop=True, **kw)
+    dropped = N4JC.pull_node_prop(
+        label='UTestPending', props={}, prop='title')
+
+    # // Cleanup.
+    N4JC.clear(label='UTest')
+    N4JC.clear(label='UTestPending')
+    return fmt_msg(
+        func=test_push_nodes_linked,
+        status=(
+            edges == {('a', 'b'), ('b', 'a'), ('c', 'b')} and
+            pending == ['zzz'] and dropped == []
+        )
+    )
+
+
+def test_resolve_pending():
+    kw = {
+        'label':'UTest', 'e_label':'UTestLink', 'p_label':'UTestPending',
+        'p_e_label':'UTestPends', 'key':'title'
+    }
+    N4JC.clear(label='UTest')
+    N4JC.clear(label='UTestPending')
+    # // 'b' is written as if by a transaction which ran at the
+    # // same time as the one of 'a', so neither saw the other.
+    N4JC.push_nodes_linked(props_list=[
+        {'title':'a', 'links':['b', 'x']}], hlink_key='links', **kw)
+    N4JC.push_nodes(label='UTest', key='title', props_list=[
+        {'title':'b', 'links':[]}])
+    made = N4JC.resolve_pending(drop=False, batch_size=1, **kw)
+    edges = set(N4JC.pull_edges(
+        v_label='UTest', w_label='UTest', e_label='UTestLink', key='title'))
+    pending = N4JC.pull_node_prop(
+        label='UTestPending', props={}, prop='title')
+
+    # // Cleanup.
+    N4JC.clear(label='UTest')
+    N4JC.clear(label='UTestPending')
+    return fmt_msg(
+        func=test_resolve_pending,
+        status=made == 1 and edges == {('a', 'b')} and pending == ['x']
+    )
+
+
+
 
 # // --------------Run all--------------// #
 tests = [
@@ -246,7 +310,9 @@ tests = [
     test_pull_node,
     test_pull_node_prop,
     test_push_rel,
-    test_pull_rel
+    test_pull_rel,
+    test_push_nodes_linked,
+    test_resolve_pending,
 ]
 
 print('Running all tests:')
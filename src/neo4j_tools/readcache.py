@@ -0,0 +1,196 @@
+'''
+Client-side read cache for Neo4jComm, so repeated
+reads of the same nodes within a run (e.g linkers &
+analysis stages pulling the same titles) don't cost a
+session round trip each.
+
+Entries are keyed by (label, props, projection), where
+projection is the prop name of pull_node_prop or None
+for pull_node. Writes through the same Neo4jComm
+invalidate what they may have changed:
+    -   Entries filtered on the key prop (e.g title)
+        are dropped when a node with that key val of
+        the same label is written.
+    -   Other entries of the label (e.g all nodes) are
+        dropped on any write to the label.
+Writes by other clients are not seen; the cache is
+for batch jobs which own the db while they run.
+
+Impl:
+    -   ReadCache: see class docstring. Its write hooks
+        (nodes, update, rels, clear, props) take the
+        same args as those of ChangeFeed.
+'''
+
+import threading
+from collections import OrderedDict
+
+
+def _freeze(val): # -> hashable
+    'Hashable equivalent of prop vals (lists/dicts).'
+    if isinstance(val, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in val.items()))
+    if isinstance(val, (list, tuple)):
+        return tuple(_freeze(v) for v in val)
+    return val
+
+
+class ReadCache:
+    ''' Bounded LRU of read results (at most <capacity>
+        entries). <key> is the prop which identifies nodes
+        (see module docstring). Thread safe.
+
+        Results are returned as shallow copies; the dicts
+        of nodes are shared, so don't modify them.
+    '''
+    def __init__(self, capacity:int=10000, key:str='title'):
+        assert capacity > 0, 'ReadCache needs a capacity of 1+.'
+        self.capacity = capacity
+        self.key = key
+        self.__lock = threading.Lock()
+        # // (label, props, projection) -> result
+        self.__entries = OrderedDict()
+        # // label -> key val -> entry keys.
+        self.__by_key = {}
+        # // label -> entry keys not filtered on <key>.
+        self.__scans = {}
+        # // label -> write count, & count of writes to all
+        # // labels; reads which started before a write
+        # // aren't stored.
+        self.__gens = {}
+        self.__epoch = 0
+        self.__counts = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+
+    def __entry_key(self, label:str, props:dict, projection)-> tuple:
+        return (label, _freeze(props), projection)
+
+
+    def __unlink(self, ekey:tuple)-> None:
+        'Removes the index refs of entry <ekey>.'
+        label, props, _ = ekey
+        keyval = dict(props).get(self.key)
+        if keyval is None:
+            refs = self.__scans.get(label)
+        else:
+            refs = self.__by_key.get(label, {}).get(keyval)
+        if refs:
+            refs.discard(ekey)
+            if not refs and keyval is not None:
+                del self.__by_key[label][keyval]
+
+
+    def __drop(self, ekeys)-> None:
+        for ekey in list(ekeys):
+            if ekey in self.__entries:
+                del self.__entries[ekey]
+                self.__unlink(ekey)
+                self.__counts['invalidations'] += 1
+
+
+    def get_or_fetch(self, label:str, props:dict, projection,
+                        fetch): # -> result of fetch()
+        ''' Cached result of a read of nodes with <label> and
+            <props>, projected to prop <projection> (None for
+            whole nodes); calls fetch() on a miss.
+        '''
+        ekey = self.__entry_key(label, props, projection)
+        with self.__lock:
+            if ekey in self.__entries:
+                self.__entries.move_to_end(ekey)
+                self.__counts['hits'] += 1
+                res = self.__entries[ekey]
+                return list(res) if res is not None else None
+            self.__counts['misses'] += 1
+            gen = (self.__epoch, self.__gens.get(label, 0))
+
+        res = fetch()
+
+        with self.__lock:
+            # // Written to meanwhile; might be stale.
+            if (self.__epoch, self.__gens.get(label, 0)) != gen:
+                return res
+            if ekey not in self.__entries:
+                keyval = props.get(self.key)
+                if keyval is None:
+                    self.__scans.setdefault(label, set()).add(ekey)
+                else:
+                    self.__by_key.setdefault(label, {}).setdefault(
+                        _freeze(keyval), set()).add(ekey)
+            self.__entries[ekey] = list(res) if res is not None else None
+            self.__entries.move_to_end(ekey)
+            while len(self.__entries) > self.capacity:
+                old, _ = self.__entries.popitem(last=False)
+                self.__unlink(old)
+                self.__counts['evictions'] += 1
+        return res
+
+
+    def invalidate(self, label:str, keyvals:list=None)-> None:
+        ''' Drops entries of nodes with <label> (all labels if
+            None) which have one of <keyvals> as key val, and
+            all entries not filtered on the key. Without
+            <keyvals> (or with an unknown (None) one), all
+            entries of the label are dropped.
+        '''
+        with self.__lock:
+            if label is None:
+                self.__epoch += 1
+                labels = {ekey[0] for ekey in self.__entries}
+            else:
+                self.__gens[label] = self.__gens.get(label, 0) + 1
+                labels = [label]
+            for l in labels:
+                by_key = self.__by_key.get(l, {})
+                if keyvals is None or None in keyvals:
+                    self.__drop([e for refs in list(by_key.values())
+                                    for e in refs])
+                else:
+                    for keyval in {_freeze(k) for k in keyvals}:
+                        self.__drop(by_key.get(keyval, ()))
+                self.__drop(self.__scans.get(l, ()))
+
+
+    # // Write hooks; same args as ChangeFeed's.
+
+    def nodes(self, label:str, props_list:list, key:str=None,
+                linked:bool=False)-> None:
+        'Invalidates for nodes written by push_node(s)(_linked).'
+        if key not in (None, self.key):
+            return self.invalidate(label)
+        self.invalidate(label, [p.get(self.key) for p in props_list])
+
+
+    def update(self, label:str, props_list:list, key:str)-> None:
+        'Invalidates for props set by update_nodes.'
+        self.nodes(label=label, props_list=props_list, key=key)
+
+
+    def rels(self, v_label:str, w_label:str, e_label:str,
+                pairs:list)-> None:
+        ''' Invalidates both ends of merged rels. Cached reads
+            don't include rels, so this is only conservative.
+        '''
+        self.invalidate(v_label, [v for v, _ in pairs])
+        self.invalidate(w_label, [w for _, w in pairs])
+
+
+    def clear(self, label:str=None)-> None:
+        'Invalidates all of <label> (everything if None).'
+        self.invalidate(label)
+
+
+    def props(self, label:str, props:list)-> None:
+        'Invalidates all of <label>; props changed on every node.'
+        self.invalidate(label)
+
+
+    def stats(self)-> dict:
+        'Counters of hits, misses, evictions & invalidations, plus hit rate.'
+        with self.__lock:
+            counts = dict(self.__counts)
+            counts['entries'] = len(self.__entries)
+        reads = counts['hits'] + counts['misses']
+        counts['hit_rate'] = counts['hits'] / reads if reads else 0.0
+        return counts
@@ -0,0 +1,105 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.neo4j_tools.readcache import ReadCache
+
+# !! Fetches are counted instead of sent to a db;
+# !! Neo4jComm only routes its reads & writes here.
+
+FETCHED = []
+
+
+def fetcher(res):
+    def fetch():
+        FETCHED.extend(res)
+        return res
+    return fetch
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_hits_lru():
+    FETCHED.clear()
+    cache = ReadCache(capacity=2)
+    get = cache.get_or_fetch
+    a1 = get('L', {'title': 'a'}, None, fetcher([{'title': 'a'}]))
+    a2 = get('L', {'title': 'a'}, None, fetcher(['unused']))
+    # // Projection & unhashable vals are part of the key.
+    get('L', {'title': 'a'}, 'links', fetcher([['x']]))
+    get('L', {'tags': ['x']}, None, fetcher([{'tags': ['x']}]))
+    # // Capacity 2; 'a' (whole node) was evicted.
+    get('L', {'title': 'a'}, None, fetcher([{'title': 'a'}]))
+    stats = cache.stats()
+    return fmt_msg(
+        func=test_hits_lru,
+        status=(
+            a1 == a2 and a1 is not a2 and
+            len(FETCHED) == 4 and
+            stats['hits'] == 1 and stats['misses'] == 4 and
+            stats['evictions'] == 2 and stats['entries'] == 2 and
+            stats['hit_rate'] == 0.2
+        )
+    )
+
+
+def test_invalidation():
+    FETCHED.clear()
+    cache = ReadCache(capacity=100)
+    get = cache.get_or_fetch
+    def warm():
+        get('L', {'title': 'a'}, None, fetcher(['a']))
+        get('L', {'title': 'b'}, None, fetcher(['b']))
+        get('L', {}, 'title', fetcher(['all']))
+        get('M', {'title': 'a'}, None, fetcher(['Ma']))
+    warm()
+    # // Drops 'a' & the scan of L; 'b' & M stay.
+    cache.nodes(label='L', props_list=[{'title': 'a', 'x': 1}], key='title')
+    warm()
+    after_nodes = FETCHED[4:]
+    # // Written without key vals; all of L.
+    cache.update(label='L', props_list=[{'name': 'n'}], key='name')
+    warm()
+    after_update = FETCHED[6:]
+    cache.clear()
+    warm()
+    return fmt_msg(
+        func=test_invalidation,
+        status=(
+            after_nodes == ['a', 'all'] and
+            after_update == ['a', 'b', 'all'] and
+            FETCHED[9:] == ['a', 'b', 'all', 'Ma']
+        )
+    )
+
+
+def test_stale_fetch():
+    cache = ReadCache(capacity=100)
+    # // A write lands while the read is in flight;
+    # // its (maybe stale) result isn't cached.
+    def fetch():
+        cache.rels(v_label='L', w_label='L', e_label='E', pairs=[('z', 'y')])
+        return 'old'
+    cache.get_or_fetch('L', {'title': 'a'}, None, fetch)
+    return fmt_msg(
+        func=test_stale_fetch,
+        status=cache.stats()['entries'] == 0
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_hits_lru,
+    test_invalidation,
+    test_stale_fetch,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
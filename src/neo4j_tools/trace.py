@@ -0,0 +1,270 @@
+import re
+import json
+import time
+import zlib
+import threading
+
+'''
+Module containing QueryTracer -- a recorder for queries
+which go through Neo4jComm (see comm.py), meant for
+finding slow or scanning statement shapes.
+
+Per query, the following is recorded:
+    - template (CQL with whitespace collapsed and inline
+      literals replaced by '?'; a.k.a 'shape').
+    - parameter sizes (len of list/str/dict params).
+    - rows returned.
+    - server timings (result available/consumed after).
+    - client latency (wall time of the whole call).
+    - update counters (nodes created, ..).
+
+Calls slower than <slow_ms> are appended to a JSONL
+slow-query log. With <profile_top> > 0, the slowest
+shapes are re-run once with a 'PROFILE' prefix (the
+next time they're used anyway, no extra queries), and
+their plans (db hits, rows, scanning operators) are
+kept and logged.
+'''
+
+# // Inline literals; strings then numbers. Labels
+# // and names with digits are kept intact.
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"' + r"|'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r'(?<![\w$])\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+
+# // Statements which can be prefixed with PROFILE (not
+# // schema commands or procedures like SHOW/DROP/CALL).
+_PROFILABLE = re.compile(
+    r'^(MATCH|OPTIONAL|MERGE|UNWIND|WITH|CREATE (?!INDEX|FULLTEXT))')
+
+# // Operators which touch every node (with a label).
+_SCANS = ('AllNodesScan', 'NodeByLabelScan')
+
+# // Names of SummaryCounters attributes which are kept.
+_COUNTERS = (
+    'nodes_created', 'nodes_deleted', 'relationships_created',
+    'relationships_deleted', 'properties_set', 'labels_added',
+    'labels_removed', 'indexes_added', 'indexes_removed',
+)
+
+
+def normalize(cql:str)-> str:
+    ''' Template (shape) of <cql>; literals become '?' and
+        whitespace is collapsed, so calls which only differ
+        in inlined vals are grouped together.
+    '''
+    cql = _STRING.sub('?', cql)
+    cql = _NUMBER.sub('?', cql)
+    return _SPACE.sub(' ', cql).strip()
+
+
+def param_sizes(bindings:dict)-> dict:
+    'Size of each param; len for containers/str, else 1.'
+    return {
+        k: len(v) if isinstance(v, (list, tuple, dict, str)) else 1
+        for k, v in bindings.items()
+    }
+
+
+def summary_info(summary)-> dict:
+    ''' Extracts server timings (ms), nonzero update counters
+        and the PROFILE plan (if any) from a neo4j
+        ResultSummary. Missing attributes are skipped.
+    '''
+    counters = getattr(summary, 'counters', None)
+    return {
+        'server_ms': [
+            getattr(summary, 'result_available_after', None),
+            getattr(summary, 'result_consumed_after', None),
+        ],
+        'counters': {
+            k: getattr(counters, k) for k in _COUNTERS
+            if getattr(counters, k, 0)
+        },
+        'plan': getattr(summary, 'profile', None),
+    }
+
+
+def plan_summary(plan:dict)-> dict:
+    ''' Flattens a PROFILE plan (dict, as given by the driver)
+        into total db hits & a list of operators as
+            [<operatorType>, <dbHits>, <rows>]
+        in depth first order, plus the ones which scan.
+    '''
+    ops = []
+    stack = [plan]
+    while stack:
+        op = stack.pop()
+        ops.append([
+            op.get('operatorType'),
+            op.get('dbHits', 0),
+            op.get('rows', 0)
+        ])
+        stack.extend(reversed(op.get('children') or []))
+    return {
+        'db_hits': sum(op[1] for op in ops),
+        'operators': ops,
+        'scans': [op[0] for op in ops if str(op[0]).startswith(_SCANS)],
+    }
+
+
+class CountedResult:
+    ''' Wraps a neo4j Result and counts the records which are
+        consumed through it (iteration or single()); all else
+        is passed through.
+    '''
+    def __init__(self, result):
+        self.rows = 0
+        self.__result = result
+
+
+    def __iter__(self):
+        for rec in self.__result:
+            self.rows += 1
+            yield rec
+
+
+    def single(self, *args, **kwargs):
+        rec = self.__result.single(*args, **kwargs)
+        self.rows += rec is not None
+        return rec
+
+
+    def __getattr__(self, name:str):
+        return getattr(self.__result, name)
+
+
+class QueryTracer:
+    ''' Recorder for queries. Neo4jComm calls prepare() before
+        running a query and record() once it's consumed. Thread
+        safe (-writers shares one comm between workers). More
+        info in mod docstring.
+    '''
+    def __init__(self, slow_ms:float=100, log_path:str=None,
+                    profile_top:int=0, clock=time.time):
+        ''' <slow_ms>: latency above which calls are logged to
+            <log_path> (JSONL, appended; None = not logged).
+            <profile_top>: amount of slowest shapes (by max
+            latency) to capture a PROFILE plan for; 0 = never.
+        '''
+        self.__slow_ms = slow_ms
+        self.__log = open(log_path, 'a') if log_path else None
+        self.__profile_top = profile_top
+        self.__clock = clock
+        # // shape -> aggregated stats.
+        self.__shapes = {}
+        # // shape -> plan_summary; None while pending.
+        self.__profiles = {}
+        # // Guards the dicts above & the log.
+        self.__lock = threading.Lock()
+
+
+    def close(self)-> None:
+        'Closes the slow-query log (if any).'
+        with self.__lock:
+            if self.__log:
+                self.__log.close()
+                self.__log = None
+
+
+    def prepare(self, cql:str): # -> (str, bool)
+        ''' Returns (cql to run, whether it's profiled). A
+            query is profiled if its shape is pending a plan.
+        '''
+        shape = normalize(cql)
+        with self.__lock:
+            pending = (shape in self.__profiles
+                        and self.__profiles[shape] is None)
+        if pending:
+            return 'PROFILE ' + cql, True
+        return cql, False
+
+
+    def record(self, cql:str, bindings:dict, latency_ms:float,
+                    rows:int, summary=None)-> dict:
+        ''' Records one call of <cql> (as given to prepare, i.e
+            without PROFILE); <summary> is the neo4j
+            ResultSummary (or None). Returns the record.
+        '''
+        shape = normalize(cql)
+        info = summary_info(summary) if summary is not None else {
+            'server_ms': [None, None], 'counters': {}, 'plan': None}
+        rec = {
+            'ts': self.__clock(),
+            'shape': shape,
+            'id': f'{zlib.crc32(shape.encode()):08x}',
+            'params': param_sizes(bindings),
+            'rows': rows,
+            'latency_ms': round(latency_ms, 3),
+            'server_ms': info['server_ms'],
+            'counters': info['counters'],
+        }
+        plan = plan_summary(info['plan']) if info['plan'] else None
+        with self.__lock:
+            if plan:
+                rec['plan'] = self.__profiles[shape] = plan
+
+            agg = self.__shapes.setdefault(shape, {
+                'id': rec['id'], 'shape': shape, 'calls': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'slow': 0,
+            })
+            agg['calls'] += 1
+            agg['total_ms'] += latency_ms
+            agg['max_ms'] = max(agg['max_ms'], latency_ms)
+            agg['rows'] += rows
+            slow = latency_ms >= self.__slow_ms
+            agg['slow'] += slow
+
+            # // Plans are always logged (once per shape).
+            if (slow or 'plan' in rec) and self.__log:
+                self.__log.write(json.dumps(rec, default=str) + '\n')
+                self.__log.flush()
+            self.__pick_profiled()
+        return rec
+
+
+    def __pick_profiled(self)-> None:
+        ''' Marks the slowest shapes (not yet profiled) as
+            pending. Caller holds the lock.
+        '''
+        if self.__profile_top <= 0:
+            return
+        slowest = sorted(
+            self.__shapes.values(), key=lambda a: -a['max_ms']
+        )[:self.__profile_top]
+        for agg in slowest:
+            if _PROFILABLE.match(agg['shape']):
+                self.__profiles.setdefault(agg['shape'], None)
+
+
+    def stats(self)-> list:
+        ''' Aggregated stats per shape, slowest (total time)
+            first. Profiled shapes include 'plan'.
+        '''
+        with self.__lock:
+            aggs = [dict(agg) for agg in self.__shapes.values()]
+            plans = dict(self.__profiles)
+        res = []
+        for agg in sorted(aggs, key=lambda a: -a['total_ms']):
+            agg['avg_ms'] = agg['total_ms'] / agg['calls']
+            if plans.get(agg['shape']):
+                agg['plan'] = plans[agg['shape']]
+            res.append(agg)
+        return res
+
+
+    def report(self, top:int=10)-> str:
+        'Human readable summary of the <top> shapes of stats().'
+        lines = []
+        for agg in self.stats()[:top]:
+            plan = agg.get('plan')
+            lines.append(
+                f"[{agg['id']}] calls: {agg['calls']}, "
+                f"total: {agg['total_ms']:.1f}ms, "
+                f"max: {agg['max_ms']:.1f}ms, rows: {agg['rows']}"
+                + (f", db hits: {plan['db_hits']}" if plan else '')
+                + (f", scans: {plan['scans']}" if plan and plan['scans']
+                    else '')
+            )
+            lines.append(f"\t{agg['shape'][:200]}")
+        return '\n'.join(lines)
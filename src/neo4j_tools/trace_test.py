@@ -0,0 +1,130 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import os
+import json
+import tempfile
+import types
+import threading
+
+from src.neo4j_tools.trace import QueryTracer
+from src.neo4j_tools.trace import normalize
+
+# !! This test doesn't need Neo4j; summaries are
+# !! stand-ins for neo4j ResultSummary objs.
+
+
+def summary(plan=None, created=0):
+    return types.SimpleNamespace(
+        result_available_after=1,
+        result_consumed_after=2,
+        counters=types.SimpleNamespace(nodes_created=created),
+        profile=plan
+    )
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_normalize():
+    a = normalize("MATCH (n:UTest2 {name:'abc'})\n  RETURN n LIMIT 10")
+    b = normalize('MATCH (n:UTest2 {name:"x"}) RETURN n LIMIT 5')
+    return fmt_msg(
+        func=test_normalize,
+        status=a == b == 'MATCH (n:UTest2 {name:?}) RETURN n LIMIT ?'
+    )
+
+
+def test_slow_log():
+    path = os.path.join(tempfile.mkdtemp(), 'slow.jsonl')
+    tracer = QueryTracer(slow_ms=50, log_path=path)
+    tracer.record('MATCH (n) RETURN n', {}, 10, rows=3, summary=summary())
+    tracer.record('UNWIND $batch AS row MERGE (n:UTest {t: row.t})',
+                    {'batch': [1, 2]}, 80, rows=0, summary=summary(created=2))
+    tracer.close()
+    with open(path) as f:
+        recs = [json.loads(line) for line in f]
+    stats = tracer.stats()
+    return fmt_msg(
+        func=test_slow_log,
+        status=(
+            len(recs) == 1 and
+            recs[0]['params'] == {'batch': 2} and
+            recs[0]['counters'] == {'nodes_created': 2} and
+            recs[0]['server_ms'] == [1, 2] and
+            stats[0]['max_ms'] == 80 and
+            stats[1]['rows'] == 3
+        )
+    )
+
+
+def test_profile_slowest():
+    tracer = QueryTracer(slow_ms=1000, profile_top=1)
+    merge = 'MERGE (n:UTest {t: $t})'
+    tracer.record(merge, {'t': 1}, 30, rows=0, summary=summary())
+    tracer.record('MATCH (n) RETURN n', {}, 5, rows=0, summary=summary())
+    # // Slowest shape is pending a plan, other one isn't.
+    cql, profiled = tracer.prepare(merge)
+    _, other = tracer.prepare('MATCH (n) RETURN n')
+    plan = {
+        'operatorType': 'Merge', 'dbHits': 3, 'rows': 1, 'children': [
+            {'operatorType': 'NodeByLabelScan@neo4j', 'dbHits': 40,
+                'rows': 20, 'children': []}
+        ]
+    }
+    tracer.record(merge, {'t': 2}, 25, rows=0, summary=summary(plan))
+    _, again = tracer.prepare(merge)
+    plan = tracer.stats()[0]['plan']
+    return fmt_msg(
+        func=test_profile_slowest,
+        status=(
+            cql == 'PROFILE ' + merge and profiled and
+            not other and not again and
+            plan['db_hits'] == 43 and
+            plan['scans'] == ['NodeByLabelScan@neo4j']
+        )
+    )
+
+
+def test_record_threads():
+    tracer = QueryTracer(slow_ms=1000, profile_top=2)
+    cqls = [f'MATCH (n:UTest{i}) RETURN n' for i in range(4)]
+
+    def work(i):
+        for _ in range(500):
+            tracer.record(cqls[i % 4], {}, i, rows=1, summary=summary())
+            tracer.prepare(cqls[i % 4])
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = tracer.stats()
+    return fmt_msg(
+        func=test_record_threads,
+        status=(
+            len(stats) == 4 and
+            sum(s['calls'] for s in stats) == 8 * 500 and
+            sum(s['rows'] for s in stats) == 8 * 500
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_normalize,
+    test_slow_log,
+    test_profile_slowest,
+    test_record_threads,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -0,0 +1,198 @@
+'''
+Parallel writers which sit in front of Neo4jComm (or
+any GraphSink), for saturating the db during bulk
+loads (see -writers in cli.py).
+
+Node writes are partitioned by a hash of their key
+(e.g title), and each partition is written by its own
+thread; so the same node is always written by the same
+worker and concurrent MERGEs never contend on one key.
+Linked node writes (push_nodes_linked) are the exception;
+they all go to one worker, since a batch only sees the
+nodes & placeholders of batches committed before it (see
+PartitionedWriter).
+Every write opens its own session (Neo4jComm does so
+per call; the driver is thread safe). Transient errors
+(deadlocks, lock timeouts, ..) are retried by Neo4jComm
+itself (see _RETRIES in comm.py), not here; one layer,
+so retries don't multiply.
+
+Impl:
+    -   PartitionedWriter: see class docstring.
+'''
+
+import zlib
+import queue
+import threading
+
+# // Queue item which stops a worker.
+_STOP = object()
+
+
+def _partition(val, n:int)-> int:
+    'Stable partition (0..n-1) of key val <val>.'
+    return zlib.crc32(str(val).encode()) % n
+
+
+class PartitionedWriter:
+    ''' Writes nodes to <n4jcomm> on <writers> threads. Has the
+        push_nodes/push_nodes_linked/push_rels methods of
+        Neo4jComm, so it can be the target of a WriteBuffer.
+
+        Rows are queued to the worker of their partition (at
+        most <max_queued> batches per worker, after which
+        callers wait), and each worker writes batches of
+        <batch_size> rows. Rows of push_nodes_linked are all
+        queued to the first worker: two linked batches which
+        run at once don't see each other's nodes, so links
+        between them would be left as placeholders (or lost
+        in a race on the same placeholder). Failed writes
+        aren't retried here; <n4jcomm> does that.
+
+        The first error of a worker is raised by the next call
+        to this obj; from then on, all queued and pending rows
+        are dropped (not written), by every worker. Rows
+        written before the error stay written. NOTE: Call
+        close() when done, or pending writes are lost.
+    '''
+    def __init__(self, n4jcomm, writers:int=4, batch_size:int=500,
+                    max_queued:int=8):
+        assert writers > 0, 'PartitionedWriter needs 1+ writers.'
+        self.n4jcomm = n4jcomm
+        self.batch_size = batch_size
+        self.__error = None
+        self.__counts = {'rows': 0, 'batches': 0, 'dropped': 0}
+        self.__lock = threading.Lock()
+        self.__queues = [queue.Queue(max_queued) for _ in range(writers)]
+        self.__threads = [
+            threading.Thread(target=self.__work, args=(q,), daemon=True)
+            for q in self.__queues
+        ]
+        for t in self.__threads:
+            t.start()
+
+
+    def __count(self, k:str, n:int=1)-> None:
+        with self.__lock:
+            self.__counts[k] += n
+
+
+    def __write(self, method:str, label:str, key:str, link:tuple,
+                    rows:list)-> None:
+        'Writes <rows> with n4jcomm.<method> (unless failed).'
+        if self.__error is not None:
+            self.__count('dropped', len(rows))
+            return
+        getattr(self.n4jcomm, method)(
+            label=label, props_list=rows, key=key, **dict(link))
+        self.__count('rows', len(rows))
+        self.__count('batches')
+
+
+    def __work(self, q:queue.Queue)-> None:
+        'Worker loop; re-batches rows of one partition.'
+        # // (method, label, key, link) -> rows
+        pending = {}
+        while True:
+            item = q.get()
+            try:
+                if item is _STOP:
+                    return
+                if isinstance(item, threading.Event):
+                    # // Flush request.
+                    for group, rows in pending.items():
+                        self.__write(*group, rows)
+                    pending = {}
+                    item.set()
+                    continue
+                group, rows = item
+                batch = pending.setdefault(group, [])
+                batch.extend(rows)
+                if len(batch) >= self.batch_size:
+                    self.__write(*group, pending.pop(group))
+            except Exception as e:
+                # // Raised to the caller; rows of this and later
+                # // items are dropped (see __write).
+                self.__error = self.__error or e
+                self.__count('dropped', sum(map(len, pending.values())))
+                pending = {}
+                if isinstance(item, threading.Event):
+                    item.set()
+            finally:
+                q.task_done()
+
+
+    def __check(self)-> None:
+        if self.__error is not None:
+            raise self.__error
+
+
+    def __push(self, method:str, label:str, props_list:list, key:str,
+                    link:dict)-> None:
+        self.__check()
+        assert key, 'PartitionedWriter needs a <key> to partition by.'
+        # // Linked writes are serialised, see class docstring.
+        n = 1 if method == 'push_nodes_linked' else len(self.__queues)
+        parts = {}
+        for props in props_list:
+            i = _partition(props[key], n)
+            parts.setdefault(i, []).append(props)
+        group = (method, label, key, tuple(sorted(link.items())))
+        for i, rows in parts.items():
+            self.__queues[i].put((group, rows))
+
+
+    def push_nodes(self, label:str, props_list:list, key:str=None)-> None:
+        'See Neo4jComm.push_nodes; written asynchronously.'
+        self.__push('push_nodes', label, props_list, key, {})
+
+
+    def push_nodes_linked(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, props_list:list, key:str,
+                            hlink_key:str)-> None:
+        ''' See Neo4jComm.push_nodes_linked; written asynchronously,
+            by one worker only.
+        '''
+        self.__push('push_nodes_linked', label, props_list, key, {
+            'e_label': e_label, 'p_label': p_label,
+            'p_e_label': p_e_label, 'hlink_key': hlink_key
+        })
+
+
+    def push_rels(self, v_label:str, w_label:str, e_label:str,
+                    key:str, rels:list)-> None:
+        ''' See Neo4jComm.push_rels. Waits for pending node writes
+            (edges can point at them), then writes directly.
+        '''
+        self.flush()
+        self.n4jcomm.push_rels(v_label=v_label, w_label=w_label,
+                                e_label=e_label, key=key, rels=rels)
+
+
+    def flush(self)-> None:
+        'Writes everything pending and waits for it.'
+        self.__check()
+        events = []
+        for q in self.__queues:
+            events.append(threading.Event())
+            q.put(events[-1])
+        for e in events:
+            e.wait()
+        self.__check()
+
+
+    def close(self)-> None:
+        'flush(), then stops the workers.'
+        try:
+            self.flush()
+        finally:
+            for q in self.__queues:
+                q.put(_STOP)
+            for t in self.__threads:
+                t.join()
+
+
+    def stats(self)-> dict:
+        'Counters of written rows & batches, and dropped rows.'
+        with self.__lock:
+            return dict(self.__counts)
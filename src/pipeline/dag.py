@@ -0,0 +1,88 @@
+'''
+Dependency graph & executor for CLI stages (args, see
+cli.py), so that stages which don't depend on each
+other can run at the same time.
+
+Each stage declares which (state) keys it reads and
+writes. Stage B depends on an earlier stage A if
+    - B reads a key A writes (read after write),
+    - B writes a key A reads (write after read),
+    - or both write the same key.
+Key '*' matches all keys (barrier stages). Otherwise,
+stages run concurrently as soon as what they depend
+on is done, in argument order where it matters.
+
+Impl:
+    -   stage_deps: indexes of stages each stage needs.
+    -   run_stages: runs stages on a thread pool.
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait, FIRST_COMPLETED
+
+# // Matches every key.
+ALL = '*'
+
+
+def _overlaps(a:set, b:set)-> bool:
+    if not a or not b:
+        return False
+    return ALL in a or ALL in b or not a.isdisjoint(b)
+
+
+def stage_deps(stages:list)-> list:
+    ''' <stages> is a list of (reads, writes) key collections,
+        in argument order. Returns a set per stage with the
+        indexes of earlier stages it depends on.
+    '''
+    stages = [(set(r), set(w)) for r, w in stages]
+    deps = []
+    for j, (r_j, w_j) in enumerate(stages):
+        deps.append({
+            i for i, (r_i, w_i) in enumerate(stages[:j])
+            if _overlaps(w_i, r_j | w_j) or _overlaps(r_i, w_j)
+        })
+    return deps
+
+
+def run_stages(deps:list, run, workers:int=None)-> None:
+    ''' Calls run(<stage index>) for all stages of <deps> (see
+        stage_deps), each once all of its deps are done, on
+        up to <workers> threads (default: as many as stages;
+        1 = strictly in order). On the first error, no more
+        stages are started; the ones running are waited for,
+        then the error is raised as (stage index, exception)
+        in the args of a StageError.
+    '''
+    n = len(deps)
+    if workers == 1:
+        for i in range(n):
+            try:
+                run(i)
+            except Exception as e:
+                raise StageError(i, e) from e
+        return
+
+    done, running, failed = set(), {}, None
+    with ThreadPoolExecutor(max_workers=workers or max(n, 1)) as pool:
+        while len(done) < n and failed is None:
+            for i in range(n):
+                ready = i not in done and i not in running.values() \
+                            and deps[i] <= done
+                if ready:
+                    running[pool.submit(run, i)] = i
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            # // Lowest index first, so errors are reported in
+            # // argument order if several fail at once.
+            for fut in sorted(finished, key=running.get):
+                i = running.pop(fut)
+                if fut.exception() is not None and failed is None:
+                    failed = StageError(i, fut.exception())
+                done.add(i)
+        # // Let running stages finish (pool shutdown waits).
+    if failed is not None:
+        raise failed from failed.args[1]
+
+
+class StageError(Exception):
+    'Raised by run_stages; args are (stage index, exception).'
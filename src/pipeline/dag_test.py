@@ -0,0 +1,87 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import time
+import threading
+
+from src.pipeline.dag import stage_deps
+from src.pipeline.dag import run_stages
+from src.pipeline.dag import StageError
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_stage_deps():
+    deps = stage_deps([
+        ([], ['-db']),                      # 0
+        (['-db'], ['db:edges']),            # 1 link
+        (['-db'], ['db:index']),            # 2 searchindex
+        (['-db', 'db:edges'], []),          # 3 snapshot
+        (['*'], ['*']),                     # 4 barrier
+        (['-db'], ['db:edges']),            # 5
+    ])
+    return fmt_msg(
+        func=test_stage_deps,
+        status=deps == [set(), {0}, {0}, {0, 1}, {0, 1, 2, 3}, {0, 1, 3, 4}]
+    )
+
+
+def test_run_concurrent():
+    deps = [set(), {0}, {0}, {1, 2}]
+    log, lock = [], threading.Lock()
+    both = threading.Barrier(2, timeout=5)
+
+    def run(i):
+        # // 1 & 2 only get past this together.
+        if i in (1, 2):
+            both.wait()
+        with lock:
+            log.append(i)
+
+    run_stages(deps, run)
+    return fmt_msg(
+        func=test_run_concurrent,
+        status=log[0] == 0 and set(log[1:3]) == {1, 2} and log[3] == 3
+    )
+
+
+def test_run_error():
+    ran = []
+
+    def run(i):
+        if i == 1:
+            time.sleep(0.05)
+            raise ValueError('boom')
+        ran.append(i)
+
+    try:
+        run_stages([set(), set(), {1}], run)
+        err = None
+    except StageError as e:
+        err = e
+    return fmt_msg(
+        func=test_run_error,
+        status=(
+            err is not None and err.args[0] == 1 and
+            isinstance(err.args[1], ValueError) and ran == [0]
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_stage_deps,
+    test_run_concurrent,
+    test_run_error,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -0,0 +1,89 @@
+from array import array
+
+from src.sinks.base import GraphSink
+from src.data_gen.textclean import clean_content
+# // Namings
+import src.typehelpers as typehelpers
+
+'''
+Module for precomputing article previews on wiki
+nodes, so that rendering an article with its linked
+neighbours reads one small node instead of the full
+content of every neighbour.
+
+Specifically; For all wiki nodes N, set
+    N.snippet           cleaned start of N.content.
+    N.preview_titles    titles of (up to <k>) nodes
+                        which N links to, most linked
+                        to (in-degree) first.
+    N.preview_snippets  short snippets of those, in
+                        the same order.
+Props are parallel lists since node props can't hold
+maps. Run after linking (-link, -pagelinks, ..).
+'''
+
+
+def build(n4jcomm:GraphSink, title_key:str, content_key:str,
+            k:int=10, snippet_chars:int=300, neighbour_chars:int=120,
+            batch_size:int=500, progress=None)-> None:
+    ''' Computes & writes previews (see mod docstring) for all
+        WikiData nodes. Snippets are cut to <snippet_chars>,
+        neighbour snippets to <neighbour_chars>. Written with
+        update_nodes in batches of <batch_size>; <progress> is
+        an optional func, called as progress(<updated so far>).
+    '''
+    assert isinstance(n4jcomm, GraphSink), '''
+        Tried building previews but did not get a valid
+        graph comminication object <n4jcomm> (see
+        src/sinks/base.py).
+    '''
+    label = typehelpers.db_spec_wikidata_label
+    # // Only snippets are kept, never full content.
+    titles, snippets = [], []
+    for title, content in n4jcomm.pull_props(
+            label=label, props=[title_key, content_key]):
+        titles.append(title)
+        snippets.append(clean_content(content, max_chars=snippet_chars))
+    index = {title: i for i, title in enumerate(titles)}
+
+    # // Edges as int pairs; in-degree ranks neighbours.
+    vs, ws = array('I'), array('I')
+    indeg = array('I', bytes(4 * len(titles)))
+    for v, w in n4jcomm.pull_edges(
+            v_label=label, w_label=label,
+            e_label=typehelpers.db_spec_wikidata_link, key=title_key):
+        if v in index and w in index:
+            vs.append(index[v])
+            ws.append(index[w])
+            indeg[index[w]] += 1
+
+    out = {}
+    for v, w in zip(vs, ws):
+        out.setdefault(v, []).append(w)
+    del vs, ws
+
+    batch, done = [], 0
+    for i, title in enumerate(titles):
+        top = sorted(out.pop(i, []), key=lambda w: (-indeg[w], titles[w]))
+        top = top[:k]
+        batch.append({
+            title_key: title,
+            'snippet': snippets[i],
+            'preview_titles': [titles[w] for w in top],
+            'preview_snippets': [
+                clean_content(snippets[w], max_chars=neighbour_chars)
+                for w in top
+            ],
+        })
+        if len(batch) >= batch_size:
+            n4jcomm.update_nodes(label=label, props_list=batch, key=title_key)
+            done += len(batch)
+            batch = []
+            if progress:
+                progress(done)
+    # // Remainder.
+    if batch:
+        n4jcomm.update_nodes(label=label, props_list=batch, key=title_key)
+        done += len(batch)
+    if progress:
+        progress(done)
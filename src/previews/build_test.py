@@ -0,0 +1,56 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.sinks.sqlite import SQLiteSink
+from src.previews.build import build
+
+# !! Runs against an in-memory SQLite db
+# !! (no services needed).
+
+SINK = SQLiteSink(':memory:')
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_build():
+    SINK.clear()
+    SINK.push_nodes(label='WikiData', key='title', props_list=[
+        {'title': 'a', 'content': '== A ==\nalpha   text here'},
+        {'title': 'b', 'content': 'bravo text'},
+        {'title': 'c', 'content': 'charlie text'},
+    ])
+    # // c is linked to twice, so it ranks before b.
+    SINK.push_rels(v_label='WikiData', w_label='WikiData',
+        e_label='HYPERLINKS', key='title', rels=[
+            {'v': 'a', 'w': 'b'}, {'v': 'a', 'w': 'c'},
+            {'v': 'b', 'w': 'c'}])
+    build(SINK, title_key='title', content_key='content',
+            k=5, snippet_chars=10, neighbour_chars=5, batch_size=2)
+    a = SINK.pull_node(label='WikiData', props={'title': 'a'})[0]
+    c = SINK.pull_node(label='WikiData', props={'title': 'c'})[0]
+    return fmt_msg(
+        func=test_build,
+        status=(
+            a['snippet'] == 'alpha text' and
+            a['preview_titles'] == ['c', 'b'] and
+            a['preview_snippets'] == ['charl', 'bravo'] and
+            c['preview_titles'] == [] and c['content'] == 'charlie text'
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_build,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import types
+import pstats
+import cProfile
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # // Not available on Windows; max RSS is skipped.
+    resource = None
+
+'''
+Module containing StageProfiler -- per-stage CPU and
+memory profiling of CLI args (see cli.py), written
+to a dir as:
+    <nn>_<stage>.pstats      cProfile stats (pstats fmt).
+    <nn>_<stage>_alloc.txt   top allocation sites.
+    summary.json             wall/cpu time & memory.
+Stage names are the args without '-', prefixed with
+their position, e.g '02_createdb'.
+
+Attribution of lazy work:
+    Args like -titles & -wikiapi only put generators
+    into state; the work happens when a later stage
+    (e.g -createdb) consumes them. Such generators are
+    wrapped, so that CPU time spent inside them goes to
+    the profile of the stage which created them, while
+    the consuming stage gets the rest. Allocations are
+    not split like this (tracemalloc is process-wide),
+    but the alloc sites show where they come from.
+
+Memory columns of summary.json:
+    tracemalloc_peak    Peak of traced (Python) allocations
+                        during the stage; reset per stage.
+    rss_kb_before,
+    rss_kb_after        Current RSS as the stage starts and
+                        ends (Linux only, else None).
+    max_rss_kb          Peak RSS of the process so far; i.e
+                        cumulative, not per stage.
+    max_rss_growth_kb   How much the stage raised max_rss_kb;
+                        0 if an earlier stage peaked higher.
+'''
+
+
+def _rss_kb(): # -> int or None
+    'Current resident set size of this process (KB).'
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def _max_rss_kb(): # -> int or None
+    'Peak resident set size of this process so far (KB).'
+    if resource is None:
+        return None
+    # // KB on Linux; bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+class StageProfiler:
+    ''' Profiles stages run through run(); call finish() once
+        all are done to write stats. More info in mod docstring.
+    '''
+    def __init__(self, path:str, top:int=25):
+        ''' <path> is the output dir (created if missing), <top>
+            is the amount of allocation sites kept per stage.
+        '''
+        os.makedirs(path, exist_ok=True)
+        self.__path = path
+        self.__top = top
+        self.__stages = []
+        # // Profilers which are on, innermost last; only the
+        # // last one is enabled at any time.
+        self.__active = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+    def __enter(self, prof)-> None:
+        if self.__active:
+            self.__active[-1].disable()
+        self.__active.append(prof)
+        prof.enable()
+
+
+    def __exit(self)-> None:
+        self.__active.pop().disable()
+        if self.__active:
+            self.__active[-1].enable()
+
+
+    def __attributed(self, gen, stage:dict): # -> gen
+        'Yields from <gen>, profiling its work into <stage>.'
+        while True:
+            start = time.perf_counter()
+            self.__enter(stage['prof'])
+            try:
+                item = next(gen)
+            except StopIteration:
+                return
+            finally:
+                self.__exit()
+                stage['lazy_sec'] += time.perf_counter() - start
+            yield item
+
+
+    def __allocs(self, before, after)-> list:
+        'Top allocation sites (str) grown between snapshots.'
+        ignore = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        )
+        diff = after.filter_traces(ignore).compare_to(
+            before.filter_traces(ignore), 'lineno')
+        return [str(stat) for stat in diff[:self.__top]]
+
+
+    def run(self, arg_id:str, func, arg_val, state:dict):
+        ''' Runs a CLI action (func(arg_id, arg_val, state)) as a
+            profiled stage. Generators it puts into <state> are
+            wrapped (see mod docstring).
+        '''
+        name = f"{len(self.__stages):02d}_{arg_id.lstrip('-')}"
+        stage = {
+            'name': name, 'prof': cProfile.Profile(),
+            'wall_sec': 0.0, 'lazy_sec': 0.0,
+        }
+        self.__stages.append(stage)
+        before_state = dict(state)
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        stage['rss_kb_before'] = _rss_kb()
+        max_rss = _max_rss_kb()
+        start = time.perf_counter()
+        self.__enter(stage['prof'])
+        try:
+            return func(arg_id, arg_val, state)
+        finally:
+            self.__exit()
+            stage['wall_sec'] = time.perf_counter() - start
+            stage['tracemalloc_peak'] = tracemalloc.get_traced_memory()[1]
+            stage['rss_kb_after'] = _rss_kb()
+            stage['max_rss_kb'] = _max_rss_kb()
+            stage['max_rss_growth_kb'] = None if max_rss is None else (
+                stage['max_rss_kb'] - max_rss)
+            allocs = self.__allocs(before, tracemalloc.take_snapshot())
+            with open(os.path.join(self.__path, f'{name}_alloc.txt'),
+                        'w') as f:
+                f.write('\n'.join(allocs) + '\n')
+
+            for k, v in state.items():
+                new = before_state.get(k) is not v
+                if new and isinstance(v, types.GeneratorType):
+                    state[k] = self.__attributed(v, stage)
+
+
+    def finish(self)-> list:
+        ''' Writes pstats of all stages and summary.json, stops
+            tracemalloc. Returns the summary (list of dicts).
+        '''
+        summary = []
+        for stage in self.__stages:
+            prof = stage['prof']
+            prof.dump_stats(
+                os.path.join(self.__path, f"{stage['name']}.pstats"))
+            # // Empty profiles can't be loaded by pstats.
+            cpu = pstats.Stats(prof).total_tt if prof.getstats() else 0.0
+            summary.append({
+                'stage': stage['name'],
+                'wall_sec': round(stage['wall_sec'], 4),
+                'lazy_sec': round(stage['lazy_sec'], 4),
+                'cpu_sec': round(cpu, 4),
+                'tracemalloc_peak': stage['tracemalloc_peak'],
+                'rss_kb_before': stage['rss_kb_before'],
+                'rss_kb_after': stage['rss_kb_after'],
+                'max_rss_kb': stage['max_rss_kb'],
+                'max_rss_growth_kb': stage['max_rss_growth_kb'],
+            })
+        with open(os.path.join(self.__path, 'summary.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+        tracemalloc.stop()
+        return summary
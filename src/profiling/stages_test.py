@@ -0,0 +1,100 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import os
+import pstats
+import tempfile
+
+from src.profiling.stages import StageProfiler
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def produce_work(n:int)-> int:
+    return sum(i * i for i in range(n))
+
+
+def consume_work(n:int)-> int:
+    return sum(i + i for i in range(n))
+
+
+def producer(arg_id, arg_val, state):
+    # // Lazy; nothing is done in this stage itself.
+    state[arg_id] = (produce_work(20000) for _ in range(5))
+
+
+def consumer(arg_id, arg_val, state):
+    for _ in state['-producer']:
+        consume_work(20000)
+
+
+def allocate(arg_id, arg_val, state):
+    state[arg_id] = bytearray(8 * 1024 * 1024)
+
+
+def funcs(path:str)-> set:
+    return {fn for _, _, fn in pstats.Stats(path).stats}
+
+
+def test_lazy_attribution():
+    path = tempfile.mkdtemp()
+    prof = StageProfiler(path=path)
+    state = {}
+    prof.run('-producer', producer, None, state)
+    prof.run('-consumer', consumer, None, state)
+    summary = prof.finish()
+    p = funcs(os.path.join(path, '00_producer.pstats'))
+    c = funcs(os.path.join(path, '01_consumer.pstats'))
+    return fmt_msg(
+        func=test_lazy_attribution,
+        status=(
+            'produce_work' in p and 'consume_work' not in p and
+            'consume_work' in c and 'produce_work' not in c and
+            [s['stage'] for s in summary] == ['00_producer', '01_consumer']
+            and summary[0]['lazy_sec'] > 0 and
+            os.path.exists(os.path.join(path, '01_consumer_alloc.txt'))
+        )
+    )
+
+
+def test_memory_per_stage():
+    path = tempfile.mkdtemp()
+    prof = StageProfiler(path=path)
+    state = {}
+    prof.run('-allocate', allocate, None, state)
+    prof.run('-producer', producer, None, state)
+    summary = prof.finish()
+    a, p = summary
+    # // RSS is only read on Linux (see _rss_kb); tracemalloc
+    # // peaks include what's still alive, so not checked here.
+    if a['rss_kb_after'] is None:
+        rss = a['max_rss_kb'] is None or p['max_rss_kb'] >= a['max_rss_kb']
+    else:
+        rss = (
+            a['rss_kb_after'] - a['rss_kb_before'] >= 4 * 1024 and
+            a['max_rss_growth_kb'] >= 4 * 1024 and
+            p['max_rss_growth_kb'] < 1024 and
+            p['max_rss_kb'] >= a['max_rss_kb']
+        )
+    return fmt_msg(
+        func=test_memory_per_stage,
+        status=rss and a['tracemalloc_peak'] >= 8 * 1024 * 1024
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_lazy_attribution,
+    test_memory_per_stage,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -0,0 +1,191 @@
+'''
+Interface for graph storage backends ('sinks').
+
+Everything which writes or reads the article graph
+(cli.py, linkers, ..) goes through these methods, so
+backends are interchangeable. Implementations:
+    - src/neo4j_tools/comm.py   Neo4jComm (Neo4j)
+    - src/sinks/sqlite.py       SQLiteSink (embedded)
+
+Docstrings here describe the contract; see Neo4jComm
+for the reference behaviour.
+'''
+
+
+class GraphSink:
+    ''' Base class of graph backends. All methods raise
+        NotImplementedError until overridden.
+    '''
+
+    def clear(self, label:str=None, batch_size:int=None,
+                                    progress=None)-> None:
+        ''' Removes all nodes (with <label>) and their relationships.
+            With <batch_size>, deletes in chunks (rels first, then
+            nodes) of that many items per transaction, calling
+            progress(<'rels'|'nodes'>, <deleted so far>) after each.
+        '''
+        raise NotImplementedError
+
+
+    def push_node(self, label:str, props:dict)-> None:
+        'Merges a node with <label>, identified by all <props>.'
+        raise NotImplementedError
+
+
+    def push_nodes(self, label:str, props_list:list,
+                            key:str=None)-> None:
+        ''' Batched push_node. With <key>, nodes are identified
+            by that prop only and the other props are updated.
+        '''
+        raise NotImplementedError
+
+
+    def push_nodes_linked(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, props_list:list, key:str,
+                            hlink_key:str)-> None:
+        ''' push_nodes (with <key>) which also creates <e_label>
+            relationships from/to stored nodes according to the
+            lists in prop <hlink_key>. <p_label>/<p_e_label> name
+            the placeholders for not-yet-stored targets.
+        '''
+        raise NotImplementedError
+
+
+    def resolve_pending(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, key:str, drop:bool=False,
+                            batch_size:int=1000, progress=None,
+                            aliases:dict=None)-> int:
+        ''' Swaps placeholders left by push_nodes_linked for real
+            <e_label> relationships where the target node exists
+            by now, <batch_size> placeholders per transaction.
+            <aliases> maps placeholder keys to the key of the
+            node they resolve to (e.g titles of duplicates, see
+            data_gen/dedup.py); others resolve to themselves.
+            With <drop>, the other placeholders are removed too.
+            Calls progress(<placeholders seen>, <rels made>) after
+            each batch. Returns the amount of rels made.
+        '''
+        raise NotImplementedError
+
+
+    def update_nodes(self, label:str, props_list:list, key:str)-> None:
+        ''' Batched update of existing nodes with <label>, which are
+            identified by prop <key>; other props are set. Dicts
+            without a matching node are ignored (never created).
+        '''
+        raise NotImplementedError
+
+
+    def pull_node(self, label:str, props:dict)-> list:
+        'All nodes with <label> matching <props>, as dicts.'
+        raise NotImplementedError
+
+
+    def pull_node_prop(self, label:str, props:dict, prop:str)-> list:
+        'Like pull_node, but only the value of <prop> per node.'
+        raise NotImplementedError
+
+
+    def push_rel(self, v_label:str, w_label:str, e_label:str,
+                    v_props:dict, w_props:dict, e_props:dict)-> None:
+        'Merges (v)-[<e_label>]->(w) between matching nodes.'
+        raise NotImplementedError
+
+
+    def push_rels(self, v_label:str, w_label:str, e_label:str,
+                    key:str, rels:list)-> None:
+        ''' Batched push_rel; <rels> is a list of
+            {'v': <v key val>, 'w': <w key val>, 'e': <e_props>}.
+        '''
+        raise NotImplementedError
+
+
+    def pull_rel(self, v_label:str, w_label:str, e_label:str,
+                    v_props:dict, w_props:dict, e_props:dict)-> list:
+        ''' Nodes connected by matching relationships, as a flat
+            list alternating 'from' and 'to' node dicts.
+        '''
+        raise NotImplementedError
+
+
+    def pull_neighbours(self, v_label:str, w_label:str, e_label:str,
+                            key:str, v)-> list:
+        ''' Nodes w (as dicts) of (v)-[<e_label>]->(w), where v is
+            the node with <v_label> whose <key> prop is <v>.
+        '''
+        raise NotImplementedError
+
+
+    def pull_props(self, label:str, props:list): # -> gen
+        'Streams a tuple of the <props> vals of each node.'
+        raise NotImplementedError
+
+
+    def pull_sorted_prop(self, label:str, prop:str): # -> gen
+        ''' Streams the distinct vals of <prop> of all <label>
+            nodes, ascending (strings by code point); nodes
+            without it are skipped. E.g a title source for
+            TitleDict.from_sorted.
+        '''
+        raise NotImplementedError
+
+
+    def pull_edges(self, v_label:str, w_label:str, e_label:str,
+                    key:str): # -> gen
+        'Streams (v.<key>, w.<key>) of all <e_label> relationships.'
+        raise NotImplementedError
+
+
+    def remove_props(self, label:str, key:str, props:list,
+                        batch_size:int=1000, progress=None)-> None:
+        ''' Removes <props> (names) from all nodes with <label>, in
+            transactions of <batch_size> nodes, calling
+            progress(<updated so far>) after each. Nodes may be
+            paged by their (indexed) <key> prop.
+        '''
+        raise NotImplementedError
+
+
+    def move_props(self, label:str, key:str, props:list, side_label:str,
+                        batch_size:int=1000, progress=None)-> None:
+        ''' Like remove_props, but the removed <props> are first
+            copied to a side node with <side_label>, identified by
+            (and holding a copy of) the <key> prop of the node.
+        '''
+        raise NotImplementedError
+
+
+    def create_ftindex(self, name:str, label:str, prop:str)-> None:
+        'Creates fulltext index <name> on <label>.<prop>.'
+        raise NotImplementedError
+
+
+    def ftindex_state(self, name:str): # -> (str, float) or None
+        ''' (state, population %) of fulltext index <name>, e.g
+            ('POPULATING', 42.0), or None if it doesn't exist.
+        '''
+        raise NotImplementedError
+
+
+    def drop_ftindex(self, name:str)-> None:
+        'Drops fulltext index <name> if it exists.'
+        raise NotImplementedError
+
+
+    def await_ftindex(self, name:str, timeout:float=3600,
+                        progress=None)-> None:
+        ''' Blocks until fulltext index <name> is online, calling
+            progress(<population %>) while waiting. Raises on
+            failure or after <timeout> seconds.
+        '''
+        raise NotImplementedError
+
+
+    def query_ftindex(self, name:str, text:str, limit:int=10)-> list:
+        'Nodes (dicts) matching <text> in fulltext index <name>.'
+        raise NotImplementedError
+
+
+    def create_index(self, label:str, prop:str)-> None:
+        'Creates a lookup index on <label>.<prop> if missing.'
+        raise NotImplementedError
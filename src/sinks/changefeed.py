@@ -0,0 +1,221 @@
+'''
+Append-only change feed of graph writes, so downstream
+caches (e.g the wikinodes server) can invalidate or
+refresh only what an ingest run changed instead of
+flushing everything.
+
+Sinks (Neo4jComm, AsyncNeo4jComm, SQLiteSink) take an
+optional ChangeFeed and record every successful write
+on it; one record per call (batch), holding keys, not
+values.
+
+Files in a feed dir:
+    <offset>.jsonl  Segments; <offset> (20 digits) is the
+                    offset of the first record in it. A
+                    new segment is started once the current
+                    one exceeds <segment_bytes>.
+
+Records are JSON objs, one per line:
+    offset  Position in the feed; 0, 1, 2, .. across
+            segments, so a consumer only has to keep the
+            offset it has read up to (see read()).
+    ts      Unix time of the write.
+    op      One of:
+                nodes       Nodes created/replaced.
+                linked      Nodes created/replaced, and
+                            linked to (or by) others;
+                            the rels made are in a
+                            'rels' record right after.
+                update      Props set on existing nodes.
+                rels        Relationships merged.
+                clear       Nodes (with label) deleted.
+                props       Props removed from (or moved
+                            off) all nodes of a label.
+    label   Node label (v label for 'rels', None for an
+            unlabeled 'clear').
+    keys    Key vals of the nodes (e.g titles), or None if
+            all nodes of <label> are affected.
+    props   Names of the props written/removed.
+    e_label, w_label, pairs
+            'rels' only; pairs are [v key, w key].
+
+Impl:
+    -   ChangeFeed: writer & reader; see class docstring.
+'''
+
+import os
+import json
+import time
+import threading
+
+_SEGMENT_FMT = '{:020d}.jsonl'
+
+
+def _dumps(obj)-> str:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+class ChangeFeed:
+    ''' Writes (and reads) a feed dir at <path>. Appends are
+        thread safe and continue after the last record of an
+        existing feed. Node keys are read from the prop named
+        <key> when a write has no key of its own (e.g
+        push_node, push_rel). With <fsync>, segments are
+        synced on every append (slow, but crash safe).
+    '''
+    def __init__(self, path:str, key:str='title',
+                    segment_bytes:int=64*1024*1024, fsync:bool=False):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.key = key
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.__lock = threading.Lock()
+        self.__file = None
+        self.__next = 0
+        segments = self.segments()
+        if segments:
+            # // Continue from the last record of the feed.
+            self.__next = segments[-1]
+            for rec in self.__read_segment(segments[-1]):
+                self.__next = rec['offset'] + 1
+
+
+    def segments(self)-> list:
+        'First offsets of all segments, ascending.'
+        return sorted(
+            int(name[:-len('.jsonl')]) for name in os.listdir(self.path)
+            if name.endswith('.jsonl') and name[:-len('.jsonl')].isdigit()
+        )
+
+
+    def __segment_path(self, first:int)-> str:
+        return os.path.join(self.path, _SEGMENT_FMT.format(first))
+
+
+    def __read_segment(self, first:int): # -> gen
+        with open(self.__segment_path(first), encoding='utf-8') as f:
+            for line in f:
+                # // A torn last line (crash mid write) is
+                # // dropped; it was never acknowledged.
+                if line.endswith('\n'):
+                    yield json.loads(line)
+
+
+    def append(self, op:str, label:str, keys:list=None,
+                    props:list=None, **extra)-> int:
+        'Appends a record (see module docstring); returns its offset.'
+        with self.__lock:
+            if self.__file is None or \
+                    self.__file.tell() >= self.segment_bytes:
+                self.__roll()
+            offset = self.__next
+            rec = {
+                'offset': offset,
+                'ts': round(time.time(), 3),
+                'op': op,
+                'label': label,
+                'keys': keys,
+                'props': sorted(props) if props is not None else None,
+                **extra,
+            }
+            self.__file.write(_dumps(rec) + '\n')
+            self.__file.flush()
+            if self.fsync:
+                os.fsync(self.__file.fileno())
+            self.__next += 1
+            return offset
+
+
+    def __roll(self)-> None:
+        'Starts a new segment at the next offset.'
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        # // A segment at the next offset can only exist if
+        # // it has no complete records (e.g a torn line of
+        # // a crashed run), so it's overwritten.
+        self.__file = open(
+            self.__segment_path(self.__next), 'w', encoding='utf-8')
+
+
+    def __keys(self, props_list:list, key:str)-> list:
+        key = key or self.key
+        return [props.get(key) for props in props_list]
+
+
+    def nodes(self, label:str, props_list:list, key:str=None,
+                linked:bool=False)-> int:
+        'Records nodes written by push_node(s)(_linked).'
+        return self.append(
+            op='linked' if linked else 'nodes',
+            label=label,
+            keys=self.__keys(props_list, key),
+            props=list({p for props in props_list for p in props})
+        )
+
+
+    def update(self, label:str, props_list:list, key:str)-> int:
+        'Records props set by update_nodes.'
+        return self.append(
+            op='update',
+            label=label,
+            keys=self.__keys(props_list, key),
+            props=list({p for props in props_list for p in props
+                        if p != key})
+        )
+
+
+    def rels(self, v_label:str, w_label:str, e_label:str,
+                pairs:list)-> int:
+        'Records relationships (pairs of key vals) merged.'
+        return self.append(
+            op='rels',
+            label=v_label,
+            keys=sorted({v for v, _ in pairs}, key=str),
+            w_label=w_label,
+            e_label=e_label,
+            pairs=[list(p) for p in pairs]
+        )
+
+
+    def clear(self, label:str=None)-> int:
+        'Records a clear (of nodes with <label>).'
+        return self.append(op='clear', label=label)
+
+
+    def props(self, label:str, props:list)-> int:
+        'Records props removed from all nodes of <label>.'
+        return self.append(op='props', label=label, props=list(props))
+
+
+    def last_offset(self)-> int:
+        'Offset of the last record, -1 if the feed is empty.'
+        with self.__lock:
+            return self.__next - 1
+
+
+    def read(self, since:int=0): # -> gen
+        ''' Yields records with offset >= <since>, in order.
+            Segments before the one holding <since> are
+            skipped without being read.
+        '''
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.flush()
+        segments = self.segments()
+        start = max([s for s in segments if s <= since], default=None)
+        for first in segments:
+            if start is not None and first < start:
+                continue
+            for rec in self.__read_segment(first):
+                if rec['offset'] >= since:
+                    yield rec
+
+
+    def close(self)-> None:
+        'Closes the current segment; appends reopen one.'
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
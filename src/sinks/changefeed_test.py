@@ -0,0 +1,123 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import os
+import tempfile
+
+from src.sinks.changefeed import ChangeFeed
+from src.sinks.sqlite import SQLiteSink
+
+# !! Feeds are written to temp dirs, and the sink
+# !! is an in-memory db (no services needed).
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_segments_offsets():
+    path = tempfile.mkdtemp()
+    # // Tiny segments; one record each.
+    feed = ChangeFeed(path=path, segment_bytes=1)
+    for i in range(3):
+        feed.clear(label=f'L{i}')
+    feed.close()
+    # // Reopened feeds continue after the last record.
+    feed = ChangeFeed(path=path, segment_bytes=1)
+    feed.props(label='L3', props=['b', 'a'])
+    since = [r['offset'] for r in feed.read(since=2)]
+    last = list(feed.read())[-1]
+    return fmt_msg(
+        func=test_segments_offsets,
+        status=(
+            feed.segments() == [0, 1, 2, 3] and
+            since == [2, 3] and
+            feed.last_offset() == 3 and
+            last['op'] == 'props' and last['props'] == ['a', 'b']
+        )
+    )
+
+
+def test_torn_line():
+    path = tempfile.mkdtemp()
+    feed = ChangeFeed(path=path)
+    feed.clear(label='A')
+    feed.close()
+    # // Crash mid write of offset 1.
+    with open(os.path.join(path, f'{0:020d}.jsonl'), 'a') as f:
+        f.write('{"offset":1,"op"')
+    feed = ChangeFeed(path=path)
+    offset = feed.clear(label='B')
+    return fmt_msg(
+        func=test_torn_line,
+        status=(
+            offset == 1 and
+            [r['label'] for r in feed.read()] == ['A', 'B']
+        )
+    )
+
+
+def test_sink_writes():
+    feed = ChangeFeed(path=tempfile.mkdtemp())
+    sink = SQLiteSink(':memory:', feed=feed)
+    sink.push_nodes(label='UTest', key='title', props_list=[
+        {'title': 'a', 'content': 'x'}, {'title': 'b', 'content': 'y'}])
+    sink.update_nodes(label='UTest', key='title', props_list=[
+        {'title': 'a', 'snippet': 'x'}, {'title': 'missing', 'snippet': 'z'}])
+    sink.push_rels(v_label='UTest', w_label='UTest', e_label='LINKS',
+        key='title', rels=[{'v': 'a', 'w': 'b'}, {'v': 'a', 'w': 'missing'}])
+    sink.remove_props(label='UTest', key='title', props=['content'])
+    sink.clear(label='UTest')
+    recs = list(feed.read())
+    return fmt_msg(
+        func=test_sink_writes,
+        status=(
+            [r['op'] for r in recs] == [
+                'nodes', 'update', 'rels', 'props', 'clear'] and
+            recs[0]['keys'] == ['a', 'b'] and
+            recs[0]['props'] == ['content', 'title'] and
+            # // Only nodes/rels which were written.
+            recs[1]['keys'] == ['a'] and recs[1]['props'] == ['snippet'] and
+            recs[2]['pairs'] == [['a', 'b']] and
+            recs[4]['label'] == 'UTest' and recs[4]['keys'] is None
+        )
+    )
+
+
+def test_linked_rels():
+    feed = ChangeFeed(path=tempfile.mkdtemp())
+    sink = SQLiteSink(':memory:', feed=feed)
+    link = {'e_label': 'LINKS', 'p_label': 'UTestPending',
+            'p_e_label': 'PENDS', 'key': 'title', 'hlink_key': 'links'}
+    # // 'b' isn't stored yet, so a->b is made by the second push.
+    sink.push_nodes_linked(label='UTest', **link, props_list=[
+        {'title': 'a', 'links': ['b']}])
+    sink.push_nodes_linked(label='UTest', **link, props_list=[
+        {'title': 'b', 'links': ['a', 'b', 'c']}])
+    recs = list(feed.read())
+    return fmt_msg(
+        func=test_linked_rels,
+        status=(
+            [r['op'] for r in recs] == ['linked', 'linked', 'rels'] and
+            recs[2]['e_label'] == 'LINKS' and
+            sorted(recs[2]['pairs']) == [['a', 'b'], ['b', 'a']]
+        )
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_segments_offsets,
+    test_torn_line,
+    test_sink_writes,
+    test_linked_rels,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
@@ -0,0 +1,699 @@
+'''
+Embedded SQLite implementation of GraphSink (see
+base.py), for dev runs, tests and small deployments
+which shouldn't need a running Neo4j.
+
+Storage:
+    nodes       (id, label, props); props is a JSON obj.
+                Prop lookups use json_extract, which
+                create_index can back with an expression
+                index (e.g on 'title').
+    rels        (src, label, dst, props); one relationship
+                per (src, label, dst), unlike Neo4j where
+                the rel props are part of its identity.
+    pending     Hyperlinks to not-yet-stored nodes, see
+                push_nodes_linked (stands in for the
+                placeholder nodes used with Neo4j).
+    ft_<name>   FTS5 tables, one per create_ftindex call,
+                kept in sync on every node write.
+
+The db runs in WAL mode, and all methods are guarded
+by a lock so one obj can be shared between threads.
+
+Writes are recorded on an optional ChangeFeed (see
+changefeed.py) once committed.
+'''
+
+import re
+import json
+import sqlite3
+import threading
+
+from src.sinks.base import GraphSink
+
+# // Labels & prop names are interpolated into SQL
+# // (json paths can't be bound), so keep them plain.
+_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+# // Max bound params per statement (SQLite default is
+# // 999 on older builds).
+_CHUNK = 500
+
+
+def _name(name:str)-> str:
+    assert _NAME.match(name), f'''
+        Invalid label/prop name for SQLiteSink: '{name}'
+    '''
+    return name
+
+
+def _dumps(obj)-> str:
+    'JSON as the SQLite json funcs produce it (minified).'
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _extract(col:str, prop:str)-> str:
+    ''' SQL for reading <prop> out of JSON column <col>. Has
+        to be spelled the same everywhere for the expression
+        index (see create_index) to be used.
+    '''
+    return f"json_extract({col}, '$.{_name(prop)}')"
+
+
+def _where(col:str, props:dict): # -> (str, list)
+    ''' SQL conditions (and params) matching all <props>
+        against JSON column <col>.
+    '''
+    sql, params = [], []
+    for k, v in props.items():
+        if v is None:
+            sql.append(f'{_extract(col, k)} IS NULL')
+            continue
+        sql.append(f'{_extract(col, k)} = ?')
+        if isinstance(v, bool):
+            v = int(v)
+        elif isinstance(v, (list, dict)):
+            v = _dumps(v)
+        params.append(v)
+    return ' AND '.join(sql) or '1', params
+
+
+def _chunks(lst:list): # -> gen
+    for i in range(0, len(lst), _CHUNK):
+        yield lst[i:i+_CHUNK]
+
+
+class SQLiteSink(GraphSink):
+    ''' GraphSink backed by an SQLite file at <path>
+        (':memory:' works too). More info in the module
+        docstring and in base.py. <feed> is an optional
+        ChangeFeed, which then records all writes.
+    '''
+    def __init__(self, path:str, feed=None):
+        self.__feed = feed
+        self.__lock = threading.RLock()
+        self.__conn = sqlite3.connect(path, check_same_thread=False)
+        self.__conn.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA foreign_keys = OFF;
+
+            CREATE TABLE IF NOT EXISTS nodes (
+                id      INTEGER PRIMARY KEY,
+                label   TEXT NOT NULL,
+                props   TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS nodes_label ON nodes(label, id);
+
+            CREATE TABLE IF NOT EXISTS rels (
+                src     INTEGER NOT NULL,
+                label   TEXT NOT NULL,
+                dst     INTEGER NOT NULL,
+                props   TEXT NOT NULL DEFAULT '{}',
+                PRIMARY KEY (src, label, dst)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS rels_dst ON rels(dst, label);
+
+            CREATE TABLE IF NOT EXISTS pending (
+                label   TEXT NOT NULL,
+                target  TEXT NOT NULL,
+                src     INTEGER NOT NULL,
+                e_label TEXT NOT NULL,
+                PRIMARY KEY (label, target, src, e_label)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS pending_src ON pending(src);
+
+            CREATE TABLE IF NOT EXISTS ftindexes (
+                name    TEXT PRIMARY KEY,
+                label   TEXT NOT NULL,
+                prop    TEXT NOT NULL
+            );
+        ''')
+
+
+    def close(self)-> None:
+        with self.__lock:
+            self.__conn.close()
+
+
+    def __ftindexes(self, label:str)-> list:
+        'Names & props of fulltext indexes on <label>.'
+        return self.__conn.execute(
+            'SELECT name, prop FROM ftindexes WHERE label = ?',
+            (label,)
+        ).fetchall()
+
+
+    def __ft_sync(self, label:str, ids:list)-> None:
+        'Refreshes fulltext rows of node <ids>.'
+        for name, prop in self.__ftindexes(label):
+            rows = [(i,) for i in ids]
+            self.__conn.executemany(
+                f'DELETE FROM "ft_{name}" WHERE rowid = ?', rows)
+            self.__conn.executemany(f'''
+                INSERT INTO "ft_{name}"(rowid, body)
+                SELECT id, {_extract('props', prop)}
+                FROM nodes WHERE id = ?
+            ''', rows)
+
+
+    def __ids_by_key(self, label:str, key:str, vals:list)-> dict:
+        'Maps vals of prop <key> to node ids (if stored).'
+        res = {}
+        for chunk in _chunks(list(vals)):
+            marks = ','.join('?' * len(chunk))
+            res.update(self.__conn.execute(f'''
+                SELECT {_extract('props', key)}, id FROM nodes
+                WHERE label = ? AND {_extract('props', key)} IN ({marks})
+            ''', [label, *chunk]).fetchall())
+        return res
+
+
+    def __ids_by_props(self, label:str, props:dict)-> list:
+        where, params = _where('props', props)
+        return [r[0] for r in self.__conn.execute(
+            f'SELECT id FROM nodes WHERE label = ? AND {where}',
+            [label, *params]
+        )]
+
+
+    def __upsert(self, label:str, props_list:list, key:str)-> dict:
+        ''' Inserts/updates nodes identified by prop <key>.
+            Returns {key val: id} of all of them.
+        '''
+        # // Last write wins within a batch.
+        merged = {}
+        for props in props_list:
+            merged.setdefault(props[key], {}).update(props)
+
+        ids = self.__ids_by_key(label, key, merged.keys())
+        self.__conn.executemany(
+            'UPDATE nodes SET props = json_patch(props, ?) WHERE id = ?',
+            [(_dumps(merged[k]), i) for k, i in ids.items()]
+        )
+        new = [k for k in merged if k not in ids]
+        self.__conn.executemany(
+            'INSERT INTO nodes(label, props) VALUES (?, ?)',
+            [(label, _dumps(merged[k])) for k in new]
+        )
+        ids.update(self.__ids_by_key(label, key, new))
+        self.__ft_sync(label, list(ids.values()))
+        return ids
+
+
+    def clear(self, label:str=None, batch_size:int=None,
+                                    progress=None)-> None:
+        ''' See GraphSink.clear. Without <batch_size>, each
+            phase (rels, nodes) is a single statement.
+        '''
+        where, params = ('label = ?', [label]) if label else ('1', [])
+        ids = f'SELECT id FROM nodes WHERE {where}'
+        limit = f'LIMIT {int(batch_size)}' if batch_size else ''
+
+        total = 0
+        while True:
+            with self.__lock, self.__conn:
+                deleted = self.__conn.execute(f'''
+                    DELETE FROM rels WHERE (src, label, dst) IN (
+                        SELECT src, label, dst FROM rels
+                        WHERE src IN ({ids}) OR dst IN ({ids})
+                        {limit})
+                ''', params * 2).rowcount
+            total += deleted
+            if progress:
+                progress('rels', total)
+            if not batch_size or deleted < batch_size:
+                break
+
+        total = 0
+        while True:
+            with self.__lock, self.__conn:
+                chunk = self.__conn.execute(
+                    f'{ids} {limit}', params).fetchall()
+                names = self.__conn.execute(
+                    f'SELECT name FROM ftindexes WHERE {where}',
+                    params).fetchall()
+                for name, in names:
+                    self.__conn.executemany(
+                        f'DELETE FROM "ft_{name}" WHERE rowid = ?', chunk)
+                self.__conn.executemany(
+                    'DELETE FROM pending WHERE src = ?', chunk)
+                self.__conn.executemany(
+                    'DELETE FROM nodes WHERE id = ?', chunk)
+            total += len(chunk)
+            if progress:
+                progress('nodes', total)
+            if not batch_size or len(chunk) < batch_size:
+                break
+
+        # // Placeholders for links to nodes with <label>.
+        with self.__lock, self.__conn:
+            self.__conn.execute(f'DELETE FROM pending WHERE {where}', params)
+        if self.__feed:
+            self.__feed.clear(label=label)
+
+
+    def push_node(self, label:str, props:dict)-> None:
+        'See GraphSink.push_node'
+        self.push_nodes(label=label, props_list=[props])
+
+
+    def push_nodes(self, label:str, props_list:list,
+                            key:str=None)-> None:
+        'See GraphSink.push_nodes'
+        _name(label)
+        with self.__lock, self.__conn:
+            if key:
+                self.__upsert(label, props_list, key)
+            else:
+                # // Merge on all props; only insert if missing.
+                new = [
+                    props for props in props_list
+                    if not self.__ids_by_props(label, props)
+                ]
+                cur = self.__conn.cursor()
+                ids = []
+                for props in new:
+                    cur.execute(
+                        'INSERT INTO nodes(label, props) VALUES (?, ?)',
+                        (label, _dumps(props)))
+                    ids.append(cur.lastrowid)
+                self.__ft_sync(label, ids)
+        if self.__feed:
+            self.__feed.nodes(label=label, props_list=props_list, key=key)
+
+
+    def push_nodes_linked(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, props_list:list, key:str,
+                            hlink_key:str)-> None:
+        ''' See GraphSink.push_nodes_linked. Placeholders are rows
+            in the 'pending' table, so <p_label> and <p_e_label>
+            are not used.
+        '''
+        _name(e_label)
+        pairs = []
+        with self.__lock, self.__conn:
+            ids = self.__upsert(label, props_list, key)
+
+            # // Incoming; stored nodes waiting for these.
+            for k, i in ids.items():
+                waiting = self.__conn.execute(f'''
+                    SELECT p.src, p.e_label, {_extract('v.props', key)}
+                    FROM pending p JOIN nodes v ON v.id = p.src
+                    WHERE p.label = ? AND p.target = ?
+                ''', (label, k)).fetchall()
+                self.__conn.executemany('''
+                    INSERT OR IGNORE INTO rels(src, label, dst)
+                    VALUES (?, ?, ?)
+                ''', [(src, e, i) for src, e, _ in waiting if src != i])
+                pairs += [(v, k) for src, e, v in waiting
+                            if src != i and e == e_label]
+                self.__conn.execute(
+                    'DELETE FROM pending WHERE label = ? AND target = ?',
+                    (label, k))
+
+            # // Outgoing; link existing, placeholder the rest.
+            for props in props_list:
+                i = ids[props[key]]
+                links = [
+                    l for l in (props.get(hlink_key) or [])
+                    if l != props[key]
+                ]
+                found = self.__ids_by_key(label, key, set(links))
+                self.__conn.executemany('''
+                    INSERT OR IGNORE INTO rels(src, label, dst)
+                    VALUES (?, ?, ?)
+                ''', [(i, e_label, w) for w in set(found.values())])
+                pairs += [(props[key], w) for w in found if found[w] != i]
+                self.__conn.executemany('''
+                    INSERT OR IGNORE INTO pending(label, target, src, e_label)
+                    VALUES (?, ?, ?, ?)
+                ''', [
+                    (label, l, i, e_label)
+                    for l in set(links) if l not in found
+                ])
+        if self.__feed:
+            self.__feed.nodes(label=label, props_list=props_list,
+                                key=key, linked=True)
+            if pairs:
+                self.__feed.rels(v_label=label, w_label=label,
+                                    e_label=e_label, pairs=pairs)
+
+
+    def resolve_pending(self, label:str, e_label:str, p_label:str,
+                            p_e_label:str, key:str, drop:bool=False,
+                            batch_size:int=1000, progress=None,
+                            aliases:dict=None)-> int:
+        ''' See GraphSink.resolve_pending. Placeholders are rows
+            in the 'pending' table (see push_nodes_linked), paged
+            by target.
+        '''
+        _name(e_label)
+        aliases = aliases or {}
+        last, seen, made = '', 0, 0
+        while True:
+            pairs = []
+            with self.__lock, self.__conn:
+                targets = [r[0] for r in self.__conn.execute('''
+                    SELECT DISTINCT target FROM pending
+                    WHERE label = ? AND e_label = ? AND target > ?
+                    ORDER BY target LIMIT ?
+                ''', (label, e_label, last, batch_size))]
+                ids = self.__ids_by_key(
+                    label, key, {aliases.get(t, t) for t in targets})
+                found = {
+                    t: ids[aliases.get(t, t)] for t in targets
+                    if aliases.get(t, t) in ids
+                }
+                for target, w in found.items():
+                    waiting = self.__conn.execute(f'''
+                        SELECT p.src, {_extract('v.props', key)}
+                        FROM pending p JOIN nodes v ON v.id = p.src
+                        WHERE p.label = ? AND p.target = ?
+                          AND p.e_label = ?
+                    ''', (label, target, e_label)).fetchall()
+                    self.__conn.executemany('''
+                        INSERT OR IGNORE INTO rels(src, label, dst)
+                        VALUES (?, ?, ?)
+                    ''', [(src, e_label, w) for src, _ in waiting
+                            if src != w])
+                    pairs += [(v, aliases.get(target, target))
+                                for src, v in waiting if src != w]
+                self.__conn.executemany('''
+                    DELETE FROM pending
+                    WHERE label = ? AND target = ? AND e_label = ?
+                ''', [
+                    (label, t, e_label)
+                    for t in (targets if drop else found)
+                ])
+            if self.__feed and pairs:
+                self.__feed.rels(v_label=label, w_label=label,
+                                    e_label=e_label, pairs=pairs)
+            seen += len(targets)
+            made += len(pairs)
+            if progress:
+                progress(seen, made)
+            if len(targets) < batch_size:
+                return made
+            last = targets[-1]
+
+
+    def update_nodes(self, label:str, props_list:list, key:str)-> None:
+        'See GraphSink.update_nodes'
+        with self.__lock, self.__conn:
+            ids = self.__ids_by_key(
+                label, key, {p[key] for p in props_list})
+            self.__conn.executemany(
+                'UPDATE nodes SET props = json_patch(props, ?) WHERE id = ?',
+                [
+                    (_dumps(p), ids[p[key]])
+                    for p in props_list if p[key] in ids
+                ]
+            )
+            self.__ft_sync(label, list(ids.values()))
+        if self.__feed:
+            self.__feed.update(label=label, props_list=[
+                p for p in props_list if p[key] in ids], key=key)
+
+
+    def pull_node(self, label:str, props:dict)-> list:
+        'See GraphSink.pull_node'
+        where, params = _where('props', props)
+        with self.__lock:
+            return [json.loads(r[0]) for r in self.__conn.execute(
+                f'SELECT props FROM nodes WHERE label = ? AND {where}',
+                [label, *params]
+            )]
+
+
+    def pull_node_prop(self, label:str, props:dict, prop:str)-> list:
+        'See GraphSink.pull_node_prop'
+        return [n.get(prop) for n in self.pull_node(label, props)]
+
+
+    def push_rel(self, v_label:str, w_label:str, e_label:str,
+                    v_props:dict, w_props:dict, e_props:dict)-> None:
+        ''' See GraphSink.push_rel. Merges on (v, <e_label>, w)
+            and sets <e_props>.
+        '''
+        _name(e_label)
+        with self.__lock, self.__conn:
+            vs = self.__ids_by_props(v_label, v_props)
+            ws = self.__ids_by_props(w_label, w_props)
+            self.__conn.executemany('''
+                INSERT INTO rels(src, label, dst, props)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(src, label, dst)
+                DO UPDATE SET props = json_patch(props, excluded.props)
+            ''', [(v, e_label, w, _dumps(e_props)) for v in vs for w in ws])
+        if self.__feed and vs and ws:
+            key = self.__feed.key
+            self.__feed.rels(v_label=v_label, w_label=w_label,
+                e_label=e_label, pairs=[(v_props.get(key), w_props.get(key))])
+
+
+    def push_rels(self, v_label:str, w_label:str, e_label:str,
+                    key:str, rels:list)-> None:
+        'See GraphSink.push_rels'
+        _name(e_label)
+        with self.__lock, self.__conn:
+            vs = self.__ids_by_key(v_label, key, {r['v'] for r in rels})
+            ws = self.__ids_by_key(w_label, key, {r['w'] for r in rels})
+            self.__conn.executemany('''
+                INSERT INTO rels(src, label, dst, props)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(src, label, dst)
+                DO UPDATE SET props = json_patch(props, excluded.props)
+            ''', [
+                (vs[r['v']], e_label, ws[r['w']], _dumps(r.get('e') or {}))
+                for r in rels
+                if r['v'] in vs and r['w'] in ws
+            ])
+        if self.__feed:
+            pairs = [(r['v'], r['w']) for r in rels
+                        if r['v'] in vs and r['w'] in ws]
+            if pairs:
+                self.__feed.rels(v_label=v_label, w_label=w_label,
+                                    e_label=e_label, pairs=pairs)
+
+
+    def pull_rel(self, v_label:str, w_label:str, e_label:str,
+                    v_props:dict, w_props:dict, e_props:dict)-> list:
+        'See GraphSink.pull_rel'
+        v_where, v_params = _where('v.props', v_props)
+        w_where, w_params = _where('w.props', w_props)
+        e_where, e_params = _where('r.props', e_props)
+        res = []
+        with self.__lock:
+            for v, w in self.__conn.execute(f'''
+                SELECT v.props, w.props FROM rels r
+                JOIN nodes v ON v.id = r.src
+                JOIN nodes w ON w.id = r.dst
+                WHERE r.label = ? AND v.label = ? AND w.label = ?
+                  AND {v_where} AND {w_where} AND {e_where}
+            ''', [e_label, v_label, w_label,
+                    *v_params, *w_params, *e_params]):
+                res += [json.loads(v), json.loads(w)]
+        return res
+
+
+    def pull_neighbours(self, v_label:str, w_label:str, e_label:str,
+                            key:str, v)-> list:
+        'See GraphSink.pull_neighbours'
+        with self.__lock:
+            src = self.__ids_by_key(v_label, key, [v]).get(v)
+            return [json.loads(r[0]) for r in self.__conn.execute('''
+                SELECT w.props FROM rels r
+                JOIN nodes w ON w.id = r.dst
+                WHERE r.src = ? AND r.label = ? AND w.label = ?
+            ''', (src, e_label, w_label))]
+
+
+    def pull_props(self, label:str, props:list): # -> gen
+        ''' See GraphSink.pull_props. Paged by node id, so the
+            lock isn't held while the caller consumes.
+        '''
+        last = 0
+        while True:
+            with self.__lock:
+                page = self.__conn.execute('''
+                    SELECT id, props FROM nodes
+                    WHERE label = ? AND id > ?
+                    ORDER BY id LIMIT ?
+                ''', (label, last, _CHUNK)).fetchall()
+            if not page:
+                return
+            last = page[-1][0]
+            for _, p in page:
+                p = json.loads(p)
+                yield tuple(p.get(k) for k in props)
+
+
+    def pull_sorted_prop(self, label:str, prop:str): # -> gen
+        ''' See GraphSink.pull_sorted_prop. Paged by val, like
+            pull_props by id; TEXT compares as UTF-8 bytes, i.e
+            by code point. Reads the index of create_index (if
+            any) instead of sorting.
+        '''
+        col = _extract('props', prop)
+        last = None
+        while True:
+            after, params = '', [label]
+            if last is not None:
+                after, params = f'AND {col} > ?', [label, last]
+            with self.__lock:
+                page = [r[0] for r in self.__conn.execute(f'''
+                    SELECT DISTINCT {col} FROM nodes
+                    WHERE label = ? AND {col} IS NOT NULL {after}
+                    ORDER BY {col} LIMIT ?
+                ''', [*params, _CHUNK])]
+            if not page:
+                return
+            last = page[-1]
+            yield from page
+
+
+    def pull_edges(self, v_label:str, w_label:str, e_label:str,
+                    key:str): # -> gen
+        'See GraphSink.pull_edges; paged like pull_props.'
+        last = 0
+        while True:
+            with self.__lock:
+                ids = [r[0] for r in self.__conn.execute('''
+                    SELECT id FROM nodes
+                    WHERE label = ? AND id > ?
+                    ORDER BY id LIMIT ?
+                ''', (v_label, last, _CHUNK))]
+                if not ids:
+                    return
+                last = ids[-1]
+                page = self.__conn.execute(f'''
+                    SELECT {_extract('v.props', key)},
+                           {_extract('w.props', key)}
+                    FROM rels r
+                    JOIN nodes v ON v.id = r.src
+                    JOIN nodes w ON w.id = r.dst
+                    WHERE r.src BETWEEN ? AND ? AND v.label = ?
+                      AND r.label = ? AND w.label = ?
+                ''', (ids[0], last, v_label, e_label, w_label)).fetchall()
+            yield from page
+
+
+    def __compact(self, label:str, key:str, props:list, side_label:str,
+                        batch_size:int, progress)-> None:
+        ''' Shared impl of remove_props & move_props. Nodes are
+            paged by id, so batches don't rescan earlier nodes.
+        '''
+        has = ' OR '.join(
+            f'{_extract("props", p)} IS NOT NULL' for p in props)
+        paths = ', '.join(f"'$.{_name(p)}'" for p in props)
+        total, last = 0, 0
+        while True:
+            with self.__lock, self.__conn:
+                chunk = self.__conn.execute(f'''
+                    SELECT id, props FROM nodes
+                    WHERE label = ? AND id > ? AND ({has})
+                    ORDER BY id LIMIT ?
+                ''', (label, last, batch_size)).fetchall()
+                if side_label:
+                    rows = []
+                    for _, p in chunk:
+                        p = json.loads(p)
+                        rows.append({k: p.get(k) for k in [key, *props]})
+                    self.__upsert(side_label, rows, key)
+                self.__conn.executemany(
+                    f'UPDATE nodes SET props = json_remove(props, {paths}) '
+                    'WHERE id = ?', [(i,) for i, _ in chunk])
+                if any(p in props for _, p in self.__ftindexes(label)):
+                    self.__ft_sync(label, [i for i, _ in chunk])
+            total += len(chunk)
+            if progress:
+                progress(total)
+            if len(chunk) < batch_size:
+                return
+            last = chunk[-1][0]
+
+
+    def remove_props(self, label:str, key:str, props:list,
+                        batch_size:int=1000, progress=None)-> None:
+        'See GraphSink.remove_props; paged by node id, not <key>.'
+        self.__compact(label, None, props, None, batch_size, progress)
+        if self.__feed:
+            self.__feed.props(label=label, props=props)
+
+
+    def move_props(self, label:str, key:str, props:list, side_label:str,
+                        batch_size:int=1000, progress=None)-> None:
+        'See GraphSink.move_props'
+        self.__compact(label, key, props, side_label, batch_size, progress)
+        if self.__feed:
+            self.__feed.props(label=label, props=props)
+
+
+    def create_ftindex(self, name:str, label:str, prop:str)-> None:
+        'See GraphSink.create_ftindex; uses FTS5.'
+        _name(name)
+        with self.__lock, self.__conn:
+            self.__conn.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS "ft_{name}" '
+                'USING fts5(body)')
+            added = self.__conn.execute(
+                'INSERT OR IGNORE INTO ftindexes VALUES (?, ?, ?)',
+                (name, label, prop)).rowcount
+            if added:
+                self.__conn.execute(f'''
+                    INSERT INTO "ft_{name}"(rowid, body)
+                    SELECT id, {_extract('props', prop)}
+                    FROM nodes WHERE label = ?
+                ''', (label,))
+
+
+    def ftindex_state(self, name:str): # -> (str, float) or None
+        ''' See GraphSink.ftindex_state. FTS5 tables are filled
+            when created, so they are always online.
+        '''
+        with self.__lock:
+            found = self.__conn.execute(
+                'SELECT 1 FROM ftindexes WHERE name = ?', (name,)
+            ).fetchone()
+        return ('ONLINE', 100.0) if found else None
+
+
+    def drop_ftindex(self, name:str)-> None:
+        'See GraphSink.drop_ftindex'
+        _name(name)
+        with self.__lock, self.__conn:
+            self.__conn.execute(f'DROP TABLE IF EXISTS "ft_{name}"')
+            self.__conn.execute(
+                'DELETE FROM ftindexes WHERE name = ?', (name,))
+
+
+    def await_ftindex(self, name:str, timeout:float=3600,
+                        progress=None)-> None:
+        'See GraphSink.await_ftindex'
+        state = self.ftindex_state(name)
+        assert state is not None, f'No index named {name}.'
+        if progress:
+            progress(state[1])
+
+
+    def query_ftindex(self, name:str, text:str, limit:int=10)-> list:
+        'See GraphSink.query_ftindex; <text> is FTS5 syntax.'
+        _name(name)
+        with self.__lock:
+            return [json.loads(r[0]) for r in self.__conn.execute(f'''
+                SELECT n.props FROM "ft_{name}" f
+                JOIN nodes n ON n.id = f.rowid
+                WHERE "ft_{name}" MATCH ?
+                ORDER BY f.rank LIMIT ?
+            ''', (text, limit))]
+
+
+    def create_index(self, label:str, prop:str)-> None:
+        ''' See GraphSink.create_index. The index covers
+            (label, prop) so one per prop is enough.
+        '''
+        with self.__lock, self.__conn:
+            self.__conn.execute(f'''
+                CREATE INDEX IF NOT EXISTS "nodes_{_name(prop)}"
+                ON nodes(label, {_extract('props', prop)})
+            ''')
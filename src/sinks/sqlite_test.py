@@ -0,0 +1,238 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+from src.sinks.sqlite import SQLiteSink
+
+# !! Mirrors neo4j_tools/comm_test.py, but runs
+# !! against an in-memory db (no services needed).
+
+SINK = SQLiteSink(':memory:')
+
+
+def fmt_msg(func, status:bool)-> str:
+    fn_name = func.__name__
+    ok_msg  = f'\t status: ok ({fn_name})'
+    err_msg = f'\t status: fail ({fn_name})'
+    return ok_msg if status else err_msg
+
+
+def test_push_pull_node():
+    SINK.clear()
+    SINK.push_node(label='UTest', props={'name':'abc', 'tags':['x']})
+    # // MERGE semantics; no duplicate.
+    SINK.push_node(label='UTest', props={'name':'abc', 'tags':['x']})
+    res = SINK.pull_node(label='UTest', props={'name':'abc'})
+    return fmt_msg(
+        func=test_push_pull_node,
+        status=res == [{'name':'abc', 'tags':['x']}]
+    )
+
+
+def test_push_nodes_keyed():
+    SINK.clear()
+    SINK.create_index(label='UTest', prop='title')
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':'a', 'v':1}, {'title':'b', 'v':1}])
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':'a', 'v':2}])
+    res = SINK.pull_node_prop(label='UTest', props={'title':'a'}, prop='v')
+    n = len(SINK.pull_node(label='UTest', props={}))
+    return fmt_msg(func=test_push_nodes_keyed, status=res == [2] and n == 2)
+
+
+def test_push_pull_rel():
+    SINK.clear()
+    for name in ['aaa', 'bbb']:
+        SINK.push_node(label='UTest', props={'name':name})
+    SINK.push_rel(
+        v_label='UTest', w_label='UTest', e_label='UTestLink',
+        v_props={'name':'aaa'}, w_props={'name':'bbb'},
+        e_props={'data':'ccc'}
+    )
+    res = SINK.pull_rel(
+        v_label='UTest', w_label='UTest', e_label='UTestLink',
+        v_props={'name':'aaa'}, w_props={'name':'bbb'},
+        e_props={'data':'ccc'}
+    )
+    return fmt_msg(
+        func=test_push_pull_rel,
+        status=(
+            len(res) == 2 and
+            res[0].get('name') == 'aaa' and
+            res[1].get('name') == 'bbb'
+        )
+    )
+
+
+def test_push_nodes_linked():
+    SINK.clear()
+    kw = {
+        'label':'UTest', 'e_label':'UTestLink', 'p_label':'UTestPending',
+        'p_e_label':'UTestPends', 'key':'title', 'hlink_key':'links'
+    }
+    # // 'a' links to 'b' before 'b' exists, 'b' links back.
+    SINK.push_nodes_linked(props_list=[
+        {'title':'a', 'links':['b', 'a', 'zzz']}], **kw)
+    SINK.push_nodes_linked(props_list=[
+        {'title':'b', 'links':['a']}, {'title':'c', 'links':['b']}], **kw)
+    edges = set(SINK.pull_edges(
+        v_label='UTest', w_label='UTest', e_label='UTestLink', key='title'))
+    return fmt_msg(
+        func=test_push_nodes_linked,
+        status=edges == {('a', 'b'), ('b', 'a'), ('c', 'b')}
+    )
+
+
+def test_resolve_pending():
+    SINK.clear()
+    kw = {
+        'label':'UTest', 'e_label':'UTestLink', 'p_label':'UTestPending',
+        'p_e_label':'UTestPends', 'key':'title'
+    }
+    # // 'b' is written as if by a transaction which ran at the
+    # // same time as the one of 'a' (so it didn't see the
+    # // placeholder 'a' left for it).
+    SINK.push_nodes_linked(props_list=[
+        {'title':'a', 'links':['b', 'x', 'y']}], hlink_key='links', **kw)
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':'b', 'links':[]}])
+    seen = []
+    made = SINK.resolve_pending(drop=True, batch_size=1,
+                progress=lambda s, m: seen.append((s, m)), **kw)
+    edges = set(SINK.pull_edges(
+        v_label='UTest', w_label='UTest', e_label='UTestLink', key='title'))
+    left = SINK._SQLiteSink__conn.execute(
+        'SELECT count(*) FROM pending').fetchone()[0]
+    return fmt_msg(
+        func=test_resolve_pending,
+        status=(
+            made == 1 and edges == {('a', 'b')} and left == 0 and
+            seen[-1] == (3, 1)
+        )
+    )
+
+
+def test_ftindex():
+    SINK.clear()
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':'a', 'content':'the omphalos hypothesis'},
+        {'title':'b', 'content':'last thursdayism'}])
+    SINK.create_ftindex(name='UTestIndex', label='UTest', prop='content')
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':'c', 'content':'thursdayism again'}])
+    res = SINK.query_ftindex(name='UTestIndex', text='thursdayism')
+    return fmt_msg(
+        func=test_ftindex,
+        status=sorted(n['title'] for n in res) == ['b', 'c']
+    )
+
+
+def test_update_nodes_ftindex_rebuild():
+    SINK.clear()
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':'a', 'content':'the omphalos hypothesis'}])
+    SINK.create_ftindex(name='UTestIndex', label='UTest', prop='content')
+    SINK.drop_ftindex(name='UTestIndex')
+    dropped = SINK.ftindex_state(name='UTestIndex') is None
+    # // Only existing nodes are updated.
+    SINK.update_nodes(label='UTest', key='title', props_list=[
+        {'title':'a', 'short':'omphalos'}, {'title':'zzz', 'short':'x'}])
+    SINK.create_ftindex(name='UTestIndex', label='UTest', prop='short')
+    SINK.await_ftindex(name='UTestIndex')
+    res = SINK.query_ftindex(name='UTestIndex', text='omphalos')
+    n = len(SINK.pull_node(label='UTest', props={}))
+    return fmt_msg(
+        func=test_update_nodes_ftindex_rebuild,
+        status=dropped and n == 1 and [r['title'] for r in res] == ['a']
+    )
+
+
+def test_remove_props():
+    SINK.clear()
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':str(i), 'links':['x'], 'content':'c'} for i in range(5)])
+    done = []
+    # // Batches smaller than the node count; paged by key.
+    SINK.remove_props(label='UTest', key='title', props=['links'],
+                        batch_size=2, progress=done.append)
+    nodes = SINK.pull_node(label='UTest', props={})
+    return fmt_msg(
+        func=test_remove_props,
+        status=(
+            len(nodes) == 5 and done[-1] == 5 and
+            all('links' not in n and n['content'] == 'c' for n in nodes)
+        )
+    )
+
+
+def test_move_props():
+    SINK.clear()
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':str(i), 'html':f'<p>{i}</p>'} for i in range(5)])
+    SINK.move_props(label='UTest', key='title', props=['html'],
+                        side_label='UTestHtml', batch_size=2)
+    nodes = SINK.pull_node(label='UTest', props={})
+    side = SINK.pull_node(label='UTestHtml', props={})
+    return fmt_msg(
+        func=test_move_props,
+        status=(
+            all('html' not in n for n in nodes) and
+            sorted((n['title'], n['html']) for n in side) ==
+                [(str(i), f'<p>{i}</p>') for i in range(5)]
+        )
+    )
+
+
+def test_pull_neighbours():
+    SINK.clear()
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':t} for t in 'abc'])
+    SINK.push_rels(v_label='UTest', w_label='UTest', e_label='UTestLink',
+        key='title', rels=[{'v':'a', 'w':'b'}, {'v':'a', 'w':'c'},
+                           {'v':'b', 'w':'c'}])
+    res = SINK.pull_neighbours(v_label='UTest', w_label='UTest',
+                                e_label='UTestLink', key='title', v='a')
+    none = SINK.pull_neighbours(v_label='UTest', w_label='UTest',
+                                e_label='UTestLink', key='title', v='zzz')
+    return fmt_msg(
+        func=test_pull_neighbours,
+        status=sorted(n['title'] for n in res) == ['b', 'c'] and none == []
+    )
+
+
+def test_pull_sorted_prop():
+    SINK.clear()
+    SINK.create_index(label='UTest', prop='title')
+    # // Spans pages (see _CHUNK); 'Ø' sorts after ASCII.
+    titles = [f't{i:04}' for i in range(1200)] + ['Ø', 'a']
+    SINK.push_nodes(label='UTest', key='title', props_list=[
+        {'title':t} for t in titles])
+    SINK.push_node(label='UTest', props={'other':1})
+    SINK.push_node(label='UTestOther', props={'title':'b'})
+    res = list(SINK.pull_sorted_prop(label='UTest', prop='title'))
+    return fmt_msg(
+        func=test_pull_sorted_prop,
+        status=res == sorted(titles)
+    )
+
+
+# // --------------Run all--------------// #
+tests = [
+    test_push_pull_node,
+    test_push_nodes_keyed,
+    test_push_pull_rel,
+    test_pull_neighbours,
+    test_pull_sorted_prop,
+    test_push_nodes_linked,
+    test_resolve_pending,
+    test_remove_props,
+    test_move_props,
+    test_ftindex,
+    test_update_nodes_ftindex_rebuild,
+]
+
+print('Running all tests:')
+for t in tests:
+    print(t())
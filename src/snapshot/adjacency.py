@@ -0,0 +1,172 @@
+'''
+Compact, memory-mappable snapshot of the HYPERLINKS
+graph, for serving neighbour lookups without a db
+round trip.
+
+Files in a snapshot dir (all arrays are flat, native
+byte order, see meta.json):
+    titles.bin,
+    title_offsets.bin,
+    title_hash.bin      Title dict (title <-> node id),
+                        see titledict.py.
+    offsets.bin         uint64[n+1]; CSR row offsets.
+    neighbours.bin      uint32[e]; CSR neighbour ids,
+                        sorted per row.
+    meta.json           Counts and format info.
+
+Impl:
+    -   write_snapshot: writes the files above.
+    -   AdjacencySnapshot: mmaps a snapshot dir and does
+        O(1) (expected) title->neighbours lookups.
+'''
+
+import os
+import sys
+import json
+import mmap
+from array import array
+
+from src.snapshot.titledict import TitleDict
+
+# // Bumped on incompatible format changes.
+FORMAT_VERSION = 1
+
+
+def _write_array(path:str, arr:array)-> None:
+    with open(path, 'wb') as f:
+        arr.tofile(f)
+
+
+def write_snapshot(path:str, titles, edges)-> dict:
+    ''' Writes a snapshot into dir <path>. <titles> is an
+        iterable of all node titles, <edges> an iterable of
+        (from title, to title) tuples; edges which refer to
+        unknown titles are skipped. Returns the meta dict.
+    '''
+    os.makedirs(path, exist_ok=True)
+
+    # // Interned title table; ids are sorted positions.
+    ids = TitleDict.from_titles(titles)
+    n = len(ids)
+
+    # // Edges as two flat arrays, then counting sort
+    # // by source id into CSR.
+    src, dst = array('I'), array('I')
+    for v, w in edges:
+        vi, wi = ids.id(v), ids.id(w)
+        if vi is None or wi is None:
+            continue
+        src.append(vi)
+        dst.append(wi)
+
+    offsets = array('Q', bytes(8 * (n + 1)))
+    for vi in src:
+        offsets[vi + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    neighbours = array('I', bytes(4 * len(src)))
+    fill = array('Q', offsets[:n])
+    for vi, wi in zip(src, dst):
+        neighbours[fill[vi]] = wi
+        fill[vi] += 1
+    del src, dst, fill
+
+    # // Sorted rows; lets readers binary search / merge.
+    for i in range(n):
+        a, b = offsets[i], offsets[i + 1]
+        if b - a > 1:
+            neighbours[a:b] = array('I', sorted(neighbours[a:b]))
+
+    ids.write(path)
+    _write_array(os.path.join(path, 'offsets.bin'), offsets)
+    _write_array(os.path.join(path, 'neighbours.bin'), neighbours)
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'nodes': n,
+        'edges': len(neighbours),
+        'hash_slots': ids.hash_slots(),
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+class AdjacencySnapshot:
+    ''' Read-only view of a snapshot dir written by
+        write_snapshot. Files are memory-mapped, so opening
+        is near-instant and pages are shared between
+        processes serving the same snapshot.
+    '''
+    def __init__(self, path:str):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        assert self.meta['version'] == FORMAT_VERSION, f'''
+            Snapshot at '{path}' has an unsupported version.
+        '''
+        assert self.meta['byteorder'] == sys.byteorder, f'''
+            Snapshot at '{path}' was written on a machine
+            with a different byte order.
+        '''
+        self.__maps = []
+        self.titles = TitleDict.open(path)
+        self.__offsets = self.__map(path, 'offsets.bin', 'Q')
+        self.__neighbours = self.__map(path, 'neighbours.bin', 'I')
+
+
+    def __map(self, path:str, name:str, fmt:str)-> memoryview:
+        with open(os.path.join(path, name), 'rb') as f:
+            # // mmap refuses empty files.
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b'').cast(fmt)
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__maps.append(mm)
+        return memoryview(mm).cast(fmt)
+
+
+    def close(self)-> None:
+        'Releases the mmaps; the obj is unusable afterwards.'
+        self.titles.close()
+        for view in (self.__offsets, self.__neighbours):
+            view.release()
+        for mm in self.__maps:
+            mm.close()
+        self.__maps = []
+
+
+    def __len__(self)-> int:
+        return self.meta['nodes']
+
+
+    def title(self, i:int)-> str:
+        'Title of node id <i>.'
+        return self.titles.title(i)
+
+
+    def id(self, title:str)-> int:
+        'Id of <title>, or None if it is not in the snapshot.'
+        return self.titles.id(title)
+
+
+    def neighbour_ids(self, i:int)-> memoryview:
+        'Ids of nodes which node id <i> links to (sorted).'
+        return self.__neighbours[self.__offsets[i]:self.__offsets[i + 1]]
+
+
+    def neighbours(self, title:str)-> list:
+        ''' Titles which <title> links to; empty if <title>
+            is unknown or has no outgoing links.
+        '''
+        i = self.id(title)
+        if i is None:
+            return []
+        return [self.title(j) for j in self.neighbour_ids(i)]
+
+
+    def degree(self, title:str)-> int:
+        'Out-degree of <title> (0 if unknown).'
+        i = self.id(title)
+        if i is None:
+            return 0
+        return self.__offsets[i + 1] - self.__offsets[i]
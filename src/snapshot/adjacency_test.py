@@ -0,0 +1,61 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import tempfile
+from src.snapshot.adjacency import write_snapshot
+from src.snapshot.adjacency import AdjacencySnapshot
+
+
+TITLES = ['Last Thursdayism', 'Solipsism', 'Omphalos hypothesis', 'Ø']
+EDGES = [
+    ('Last Thursdayism', 'Omphalos hypothesis'),
+    ('Last Thursdayism', 'Solipsism'),
+    ('Solipsism', 'Ø'),
+    # // Unknown target; should be skipped.
+    ('Solipsism', 'Not a node'),
+]
+
+
+def msg_fmt(func, status, extra='')-> str:
+    'Formatter for err msg'
+    msg = f"\tstatus: {'ok' if status else 'fail'} {extra}."
+    return msg + f' (func: {func.__name__})'
+
+
+def test_roundtrip():
+    with tempfile.TemporaryDirectory() as d:
+        meta = write_snapshot(path=d, titles=TITLES, edges=EDGES)
+        snap = AdjacencySnapshot(d)
+        ok = (
+            meta['edges'] == 3 and
+            len(snap) == len(TITLES) and
+            snap.neighbours('Last Thursdayism') == [
+                'Omphalos hypothesis', 'Solipsism'] and
+            snap.neighbours('Solipsism') == ['Ø'] and
+            snap.neighbours('Ø') == [] and
+            snap.neighbours('Not a node') == [] and
+            all(snap.title(snap.id(t)) == t for t in TITLES)
+        )
+        snap.close()
+    return msg_fmt(func=test_roundtrip, status=ok)
+
+
+def test_empty():
+    with tempfile.TemporaryDirectory() as d:
+        write_snapshot(path=d, titles=[], edges=[])
+        snap = AdjacencySnapshot(d)
+        ok = len(snap) == 0 and snap.neighbours('x') == []
+        snap.close()
+    return msg_fmt(func=test_empty, status=ok)
+
+
+# ------------------test all------------------ #
+tests = [
+    test_roundtrip,
+    test_empty,
+]
+
+for t in tests:
+    print(t())
@@ -0,0 +1,220 @@
+'''
+Compact, immutable title dictionary (title <-> id),
+for resolving titles at Wikipedia scale without a
+Python str per title (roughly 16 + len(utf-8) bytes
+per title, instead of ~80 + len for a str in a set).
+
+Ids are positions in the sorted set of titles. Files
+(same layout as in a snapshot dir, see adjacency.py):
+    titles.bin          UTF-8 titles, sorted, concatenated.
+    title_offsets.bin   uint64[n+1]; title i is
+                        titles.bin[off[i]:off[i+1]].
+    title_hash.bin      uint32[m]; open addressing table
+                        (m is a power of 2, >= 2n) of
+                        title id + 1, 0 being empty.
+
+Impl:
+    -   TitleDict: see class docstring; built from sorted
+        titles (from_sorted, streamed, in memory or into a
+        dir), any titles (from_titles) or memory-mapped (open).
+'''
+
+import io
+import os
+import mmap
+import zlib
+from array import array
+
+
+def _hash(b:bytes)-> int:
+    'Stable hash of encoded title (unlike built-in hash()).'
+    return zlib.crc32(b)
+
+
+def _table_size(n:int)-> int:
+    'Smallest power of 2 which keeps load factor <= 0.5.'
+    m = 1
+    while m < 2 * n:
+        m *= 2
+    return m
+
+
+def _table(hashes:array)-> array:
+    ''' Open addressing table (see module docstring) of title
+        hashes <hashes>, in id order; linear probing.
+    '''
+    table = array('I', bytes(4 * _table_size(len(hashes))))
+    mask = len(table) - 1
+    for i, h in enumerate(hashes, 1):
+        slot = h & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = i
+    return table
+
+
+class TitleDict:
+    ''' Read-only title <-> id mapping over three flat
+        buffers (see module docstring); title -> id is O(1)
+        (expected) through the hash table, id -> title is a
+        slice of the blob. Titles are only decoded when
+        asked for.
+
+        Opened dicts are memory-mapped, so opening is near
+        instant and pages are shared between processes.
+    '''
+    def __init__(self, blob, offsets, table, maps:list=None):
+        self.__blob = memoryview(blob).cast('B')
+        self.__offsets = memoryview(offsets).cast('B').cast('Q')
+        self.__table = memoryview(table).cast('B').cast('I')
+        self.__mask = len(self.__table) - 1
+        self.__maps = maps or []
+
+
+    @classmethod
+    def from_sorted(cls, titles, path:str=None): # -> TitleDict
+        ''' Builds a dict of the iterable <titles>, which has to
+            be ascending (by code point, e.g GraphSink
+            .pull_sorted_prop); repeats next to each other are
+            dropped. Titles are streamed; only offsets and
+            hashes (12 bytes per title) are held while building.
+            With <path>, titles are written into dir <path> as
+            they come and the dict is opened (memory-mapped)
+            from there, else it's built in memory.
+        '''
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            blob = open(os.path.join(path, 'titles.bin'), 'wb')
+        else:
+            blob = io.BytesIO()
+        offsets = array('Q', [0])
+        hashes = array('I')
+        prev = None
+        with blob:
+            for t in titles:
+                b = t.encode('utf-8')
+                if prev is not None and b <= prev:
+                    if b == prev:
+                        continue
+                    raise ValueError(
+                        f'TitleDict.from_sorted got unsorted titles '
+                        f'({prev.decode()!r} before {t!r}).')
+                prev = b
+                blob.write(b)
+                offsets.append(offsets[-1] + len(b))
+                hashes.append(_hash(b))
+            if path is None:
+                return cls(blob.getvalue(), offsets, _table(hashes))
+        for name, arr in (('title_offsets.bin', offsets),
+                          ('title_hash.bin', _table(hashes))):
+            with open(os.path.join(path, name), 'wb') as f:
+                arr.tofile(f)
+        return cls.open(path)
+
+
+    @classmethod
+    def from_titles(cls, titles): # -> TitleDict
+        ''' Builds a dict of the iterable <titles>, in memory.
+            Repeats are dropped. Holds all titles while sorting;
+            prefer from_sorted for sorted sources.
+        '''
+        return cls.from_sorted(sorted(set(titles)))
+
+
+    @classmethod
+    def open(cls, path:str): # -> TitleDict
+        'Memory-maps the dict files in dir <path>.'
+        maps = []
+        def map_file(name:str):
+            with open(os.path.join(path, name), 'rb') as f:
+                # // mmap refuses empty files.
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b''
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            maps.append(mm)
+            return mm
+        return cls(
+            map_file('titles.bin'),
+            map_file('title_offsets.bin') or array('Q', [0]),
+            map_file('title_hash.bin'),
+            maps
+        )
+
+
+    def write(self, path:str)-> None:
+        'Writes the dict files into dir <path>.'
+        os.makedirs(path, exist_ok=True)
+        for name, view in (('titles.bin', self.__blob),
+                           ('title_offsets.bin', self.__offsets),
+                           ('title_hash.bin', self.__table)):
+            with open(os.path.join(path, name), 'wb') as f:
+                f.write(view)
+
+
+    def close(self)-> None:
+        'Releases buffers (and mmaps); the obj is unusable afterwards.'
+        for view in (self.__blob, self.__offsets, self.__table):
+            view.release()
+        for mm in self.__maps:
+            mm.close()
+        self.__maps = []
+
+
+    def __len__(self)-> int:
+        return len(self.__offsets) - 1
+
+
+    def __contains__(self, title:str)-> bool:
+        return self.id(title) is not None
+
+
+    def __iter__(self): # -> gen
+        'Titles, in id (sorted) order.'
+        for i in range(len(self)):
+            yield self.title(i)
+
+
+    def nbytes(self)-> int:
+        'Size of the buffers.'
+        return sum(v.nbytes for v in
+                    (self.__blob, self.__offsets, self.__table))
+
+
+    def hash_slots(self)-> int:
+        'Size of the hash table.'
+        return len(self.__table)
+
+
+    def __title_bytes(self, i:int)-> memoryview:
+        a, b = self.__offsets[i], self.__offsets[i + 1]
+        return self.__blob[a:b]
+
+
+    def title(self, i:int)-> str:
+        'Title of id <i>.'
+        return bytes(self.__title_bytes(i)).decode('utf-8')
+
+
+    def id(self, title:str)-> int:
+        'Id of <title>, or None if it is not in the dict.'
+        if not self.__table:
+            return None
+        b = title.encode('utf-8')
+        slot = _hash(b) & self.__mask
+        while True:
+            entry = self.__table[slot]
+            if entry == 0:
+                return None
+            if self.__title_bytes(entry - 1) == b:
+                return entry - 1
+            slot = (slot + 1) & self.__mask
+
+
+    def ids(self, titles)-> list:
+        'Ids of the iterable <titles>; None for unknown ones.'
+        return [self.id(t) for t in titles]
+
+
+    def contains(self, titles)-> list:
+        'Batch membership; a bool per title in <titles>.'
+        return [i is not None for i in self.ids(titles)]
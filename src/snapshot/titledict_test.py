@@ -0,0 +1,79 @@
+# // Fixing python's absurd pathing so this
+# // file can be ran from this folder.
+import sys
+sys.path.append('../../')
+
+import tempfile
+from src.snapshot.titledict import TitleDict
+
+
+TITLES = ['Last Thursdayism', 'Solipsism', 'Omphalos hypothesis', 'Ø', 'Ø']
+
+
+def msg_fmt(func, status, extra='')-> str:
+    'Formatter for err msg'
+    msg = f"\tstatus: {'ok' if status else 'fail'} {extra}."
+    return msg + f' (func: {func.__name__})'
+
+
+def test_lookup():
+    td = TitleDict.from_titles(TITLES)
+    ok = (
+        len(td) == 4 and
+        list(td) == sorted(set(TITLES)) and
+        all(td.title(td.id(t)) == t for t in TITLES) and
+        td.id('Not a title') is None and
+        'Solipsism' in td and
+        td.contains(['Ø', 'x', 'Solipsism']) == [True, False, True]
+    )
+    return msg_fmt(func=test_lookup, status=ok)
+
+
+def test_persisted():
+    with tempfile.TemporaryDirectory() as d:
+        TitleDict.from_titles(TITLES).write(d)
+        td = TitleDict.open(d)
+        ok = (
+            td.ids(['Ø', 'Last Thursdayism', 'x']) == [3, 0, None] and
+            list(td) == sorted(set(TITLES))
+        )
+        td.close()
+        # // Empty dicts have empty files, which can't be mmaped.
+        TitleDict.from_titles([]).write(d)
+        td = TitleDict.open(d)
+        ok = ok and len(td) == 0 and td.id('x') is None
+        td.close()
+    return msg_fmt(func=test_persisted, status=ok)
+
+
+def test_from_sorted():
+    titles = sorted(TITLES)
+    with tempfile.TemporaryDirectory() as d:
+        # // Written into <d> as streamed, then opened.
+        td = TitleDict.from_sorted(iter(titles), path=d)
+        reopened = TitleDict.open(d)
+        ok = (
+            list(td) == list(reopened) == sorted(set(TITLES)) and
+            reopened.id('Ø') == 3 and
+            td.contains(['Ø', 'x']) == [True, False]
+        )
+        td.close()
+        reopened.close()
+    ok = ok and list(TitleDict.from_sorted(titles)) == sorted(set(TITLES))
+    try:
+        TitleDict.from_sorted(['b', 'a'])
+        ok = False
+    except ValueError:
+        pass
+    return msg_fmt(func=test_from_sorted, status=ok)
+
+
+# ------------------test all------------------ #
+tests = [
+    test_lookup,
+    test_persisted,
+    test_from_sorted,
+]
+
+for t in tests:
+    print(t())
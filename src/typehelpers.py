@@ -8,8 +8,21 @@ for the purpose of convenience in this project
 db_spec_wikidata_label = 'WikiData'
 # // 'Label' of links between wiki article nodes.
 db_spec_wikidata_link = 'HYPERLINKS'
+# // 'Label' of links between textually similar wiki
+# // article nodes (has a 'score' property).
+db_spec_wikidata_similar = 'SIMILAR'
+# // Label of side nodes holding the raw html of wiki
+# // article nodes after compaction (see -compact).
+db_spec_html_label = 'WikiDataHtml'
 # // Name of fulltext index.
 db_spec_fulltext_index = 'ArticleContentIndex'
+# // Label of placeholder nodes for hyperlinks which point
+# // to articles not (yet) in the db. Used when linking
+# // at ingest time; see Neo4jComm.push_nodes_linked.
+db_spec_pending_label = 'WikiDataPending'
+# // 'Label' of links from wiki article nodes to pending
+# // placeholder nodes.
+db_spec_pending_link = 'PENDS'
 
 
 class ArticleData: